@@ -0,0 +1,26 @@
+# Общие хелперы для бенчмарков: запуск из корня репозитория без установки пакета
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(ROOT / "src"))
+
+
+def timed(fn: Callable[[], object]) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def summarize(samples: List[float]) -> str:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (
+        f"n={len(ordered)} mean={statistics.fmean(ordered) * 1e6:.1f}us "
+        f"p50={ordered[len(ordered) // 2] * 1e6:.1f}us p95={p95 * 1e6:.1f}us "
+        f"max={ordered[-1] * 1e6:.1f}us"
+    )
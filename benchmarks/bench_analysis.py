@@ -0,0 +1,88 @@
+"""Item analysis: векторный проход статистик и разбор сохранённых ответов в матрицу.
+
+Матрица 10⁶ попыток × 100 вопросов генерируется сразу в numpy блоками (столько
+dict-ответов в памяти не поместится); encode() меряется на --encode-sample результатах
+и пересчитывается на полный объём; новые попытки добавляются к кешированным суммам.
+
+Запуск: python benchmarks/bench_analysis.py [--submissions 1000000] [--questions 100]
+"""
+
+import argparse
+import time
+
+import numpy as np
+from _util import ROOT  # noqa: F401  (sys.path)
+
+from app import analysis
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--submissions", type=int, default=1_000_000)
+    ap.add_argument("--questions", type=int, default=100)
+    ap.add_argument("--choices", type=int, default=4)
+    ap.add_argument("--encode-sample", type=int, default=20_000)
+    args = ap.parse_args()
+
+    nq, k = args.questions, args.choices
+    questions, cid = [], 1
+    for qid in range(1, nq + 1):
+        choices = [{"id": cid + j, "is_correct": j == 0} for j in range(k)]
+        questions.append((qid, "single", choices))
+        cid += k
+    layout = analysis.Layout(questions)
+    rng = np.random.default_rng(1)
+    ability = rng.normal(size=args.submissions)
+    easiness = rng.normal(size=nq)
+
+    def block(lo: int, hi: int) -> np.ndarray:
+        # ответ верный с вероятностью sigmoid(способность + лёгкость), иначе случайный дистрактор
+        p = 1 / (1 + np.exp(-(ability[lo:hi, None] + easiness)))
+        right = rng.random(p.shape) < p
+        pick = np.where(right, 0, rng.integers(1, k, size=p.shape))
+        m = np.zeros((hi - lo, nq * k), dtype=bool)
+        rows = np.repeat(np.arange(hi - lo), nq)
+        m[rows, (np.arange(nq) * k + pick).ravel()] = True
+        return m
+
+    sums = analysis.Sums(layout)
+    stats_time = 0.0
+    for lo in range(0, args.submissions, analysis.CHUNK_ROWS):
+        m = block(lo, min(args.submissions, lo + analysis.CHUNK_ROWS))
+        t0 = time.perf_counter()
+        sums.add(m)
+        stats_time += time.perf_counter() - t0
+    t0 = time.perf_counter()
+    out = sums.finish()
+    finish_time = time.perf_counter() - t0
+    disc = [q["discrimination"] for q in out["questions"]]
+    print(
+        f"stats: {args.submissions:,} × {nq} questions ({nq * k} choices): "
+        f"{stats_time:.2f}s vectorized + {finish_time * 1000:.1f}ms finish; "
+        f"discrimination mean={np.mean(disc):.3f}"
+    )
+
+    n = args.encode_sample
+    m = block(0, n)
+    ids = np.argwhere(m)
+    per_row = np.split(ids[:, 1], np.cumsum(m.sum(axis=1))[:-1])
+    results = [
+        {"answers": [{"question_id": int(c) // k + 1, "choice_id": int(c) + 1} for c in row]}
+        for row in per_row
+    ]
+    t0 = time.perf_counter()
+    for i in range(0, n, analysis.CHUNK_ROWS):
+        analysis.encode(layout, results[i : i + analysis.CHUNK_ROWS])
+    dt = time.perf_counter() - t0
+    print(
+        f"encode: {n:,} stored results in {dt:.2f}s ({n / dt:,.0f}/s) -> "
+        f"~{dt * args.submissions / n:.0f}s for {args.submissions:,} (полный пересчёт)"
+    )
+
+    t0 = time.perf_counter()
+    analysis.analyze(layout, results[:10], sums.copy()).finish()
+    print(f"incremental: +10 results over {sums.n:,}: {(time.perf_counter() - t0) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Сессии прохождения: память на активную сессию и пропускная способность start/submit.
+
+Запуск: python benchmarks/bench_attempts.py [--sessions 100000] [--questions 30]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from _util import ROOT  # noqa: F401  (sys.path)
+
+from app import attempts, storage
+from app.routers.quizzes import public_attempt_submit, public_start
+from app.schemas.quiz import Answer, AttemptCreate, SubmitRequest
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", type=int, default=100_000)
+    ap.add_argument("--questions", type=int, default=30)
+    ap.add_argument("--sample", type=int, default=10)
+    args = ap.parse_args()
+
+    quiz = storage.create_quiz(owner_id=1, title="bench")
+    for i in range(args.questions):
+        q = storage.create_question(quiz["id"], f"question {i}", "single")
+        for j in range(4):
+            storage.create_choice(q["id"], f"choice {j}", is_correct=j == 0)
+
+    attempts.ATTEMPT_MAX_SESSIONS = args.sessions * 2
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    ids = [
+        attempts.start(quiz["id"], quiz["version"], args.sample, True)[0]
+        for _ in range(args.sessions)
+    ]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"{args.sessions} sessions: {used / 2**20:.1f} MiB, {used / args.sessions:.0f} B/session")
+
+    body = AttemptCreate(count=args.sample)
+    n = min(args.sessions, 20_000)
+    t0 = time.perf_counter()
+    started = [public_start(quiz["id"], body) for _ in range(n)]
+    dt = time.perf_counter() - t0
+    print(f"start (endpoint fn):  {n / dt:,.0f}/s with {attempts.active_count()} active sessions")
+
+    rnd = random.Random(1)
+    payloads = [
+        SubmitRequest(
+            answers=[
+                Answer(question_id=q.id, choice_id=rnd.choice(q.choices).id) for q in a.questions
+            ]
+        )
+        for a in started
+    ]
+    t0 = time.perf_counter()
+    for a, p in zip(started, payloads):
+        public_attempt_submit(a.session_id, p)
+    dt = time.perf_counter() - t0
+    print(f"submit (endpoint fn): {n / dt:,.0f}/s")
+
+    t0 = time.perf_counter()
+    for sid in ids[:n]:
+        attempts.get(sid)
+    dt = time.perf_counter() - t0
+    print(f"session lookup:       {n / dt:,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Правка 200 вопросов: по одному PATCH на вопрос против одного bulk-запроса.
+
+В хранилище заранее лежат --background вопросов других квизов: поштучная замена вариантов
+каждый раз пересобирает глобальный список CHOICES, bulk — один раз.
+
+Запуск: python benchmarks/bench_bulk.py [--edits 200] [--background 20000]
+"""
+
+import argparse
+import time
+import uuid
+
+from _util import ROOT  # noqa: F401  (sys.path)
+from fastapi.testclient import TestClient
+
+from app import storage
+from app.main import app
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--edits", type=int, default=200)
+    ap.add_argument("--background", type=int, default=20_000)
+    ap.add_argument("--rounds", type=int, default=3)
+    args = ap.parse_args()
+
+    client = TestClient(app)
+    creds = {"username": f"bench_{uuid.uuid4().hex[:8]}", "password": "secret123"}
+    client.post("/api/v1/auth/register", json=creds)
+    token = client.post("/api/v1/auth/login", json=creds).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    other = storage.create_quiz(owner_id=10**6, title="background")
+    for i in range(args.background):
+        q = storage.create_question(other["id"], f"background {i}", "single")
+        for j in range(4):
+            storage.create_choice(q["id"], f"c{j}", is_correct=j == 0)
+
+    quiz = client.post("/api/v1/quizzes", json={"title": "bulk"}, headers=headers).json()
+    ids = []
+    for i in range(args.edits):
+        body = {
+            "quiz_id": quiz["id"],
+            "text": f"question {i}",
+            "type": "single",
+            "choices": [{"text": "a", "is_correct": True}, {"text": "b"}],
+        }
+        ids.append(client.post("/api/v1/questions", json=body, headers=headers).json()["id"])
+
+    def edit(qid: int, n: int) -> dict:
+        choices = [{"text": f"new {n}", "is_correct": True}, {"text": "other"}, {"text": "third"}]
+        return {"text": f"edited {n} {qid}", "choices": choices}
+
+    for n in range(args.rounds):
+        t0 = time.perf_counter()
+        for qid in ids:
+            r = client.patch(f"/api/v1/questions/{qid}", json=edit(qid, n), headers=headers)
+            assert r.status_code == 200
+        single = time.perf_counter() - t0
+
+        body = {"update": [{"id": qid, **edit(qid, n)} for qid in ids]}
+        t0 = time.perf_counter()
+        r = client.post(f"/api/v1/quizzes/{quiz['id']}/questions/bulk", json=body, headers=headers)
+        assert r.status_code == 200
+        bulk = time.perf_counter() - t0
+        print(
+            f"round {n}: {args.edits} x PATCH {single * 1000:8.1f}ms   "
+            f"bulk {bulk * 1000:7.1f}ms   ({single / bulk:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Сжатие ответов: размер и CPU по уровням gzip для тяжёлых эндпоинтов.
+
+Для каждого эндпоинта: байты без сжатия и с gzip 1/4/6/9, время сжатия одного ответа и время
+передачи при --mbit; в конце — публичный preview из кеша против сжатия на каждый запрос.
+
+Запуск: python benchmarks/bench_compression.py [--questions 200] [--results 5000] [--mbit 20]
+"""
+
+import argparse
+import time
+import uuid
+import zlib
+
+from _util import ROOT  # noqa: F401  (sys.path)
+from fastapi.testclient import TestClient
+
+from app import storage
+from app.main import app
+
+LEVELS = (1, 4, 6, 9)
+
+
+def _timeit(fn, rounds: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - t0) / rounds
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--questions", type=int, default=200)
+    ap.add_argument("--results", type=int, default=5000)
+    ap.add_argument("--mbit", type=float, default=20.0, help="полоса клиента, Мбит/с")
+    ap.add_argument("--rounds", type=int, default=50)
+    args = ap.parse_args()
+
+    client = TestClient(app)
+    creds = {"username": f"bench_{uuid.uuid4().hex[:8]}", "password": "secret123"}
+    client.post("/api/v1/auth/register", json=creds)
+    token = client.post("/api/v1/auth/login", json=creds).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    user_id = storage.get_user_by_username(creds["username"])["id"]
+
+    quiz = storage.create_quiz(owner_id=user_id, title="compression")
+    for i in range(args.questions):
+        q = storage.create_question(quiz["id"], f"Question {i}: which statement is true?", "single")
+        for j in range(4):
+            storage.create_choice(q["id"], f"Answer option {j} for question {i}", j == 0)
+    for i in range(args.results):
+        storage.save_result(quiz["id"], user_id, i % args.questions, args.questions, [])
+
+    endpoints = {
+        "detail": f"/api/v1/quizzes/{quiz['id']}",
+        "preview": f"/api/v1/quizzes/{quiz['id']}/preview",
+        "results": f"/api/v1/quizzes/{quiz['id']}/results",
+    }
+    identity = {**headers, "Accept-Encoding": "identity"}
+    bytes_per_s = args.mbit * 1e6 / 8
+    print(f"{'endpoint':8s} {'level':>5s} {'bytes':>9s} {'ratio':>6s} {'cpu':>9s} {'wire':>9s}")
+    for name, url in endpoints.items():
+        body = client.get(url, headers=identity).content
+        wire = len(body) / bytes_per_s
+        print(f"{name:8s} {'-':>5s} {len(body):9d} {1:6.1f} {0:7.2f}ms {wire * 1e3:7.1f}ms")
+        for level in LEVELS:
+            gz = zlib.compress(body, level, wbits=31)
+            cpu = _timeit(lambda: zlib.compress(body, level, wbits=31), args.rounds)
+            wire = len(gz) / bytes_per_s
+            print(
+                f"{'':8s} {level:5d} {len(gz):9d} {len(body) / len(gz):6.1f} "
+                f"{cpu * 1e3:7.2f}ms {wire * 1e3:7.1f}ms"
+            )
+
+    gz = {"Accept-Encoding": "gzip"}
+    public = f"/api/v1/public/quizzes/{quiz['id']}/preview"
+    owner = f"/api/v1/quizzes/{quiz['id']}/preview"
+    client.get(public, headers=gz)
+    cached = _timeit(lambda: client.get(public, headers=gz), args.rounds)
+    live = _timeit(lambda: client.get(owner, headers={**headers, **gz}), args.rounds)
+    print(
+        f"preview end-to-end: cached gzip {cached * 1e3:.2f}ms, "
+        f"rendered + compressed per request {live * 1e3:.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Проверка text-вопросов: кешированный ключ ответов против сборки матчеров на каждый submit.
+
+Запуск: python benchmarks/bench_grading.py [--questions 100] [--submissions 5000]
+"""
+
+import argparse
+import random
+import re
+import time
+
+from _util import ROOT  # noqa: F401  (sys.path)
+
+from app import grading, storage
+from app.schemas.quiz import Answer
+
+
+def naive_match(accepted: list, text: str) -> bool:
+    # без предкомпиляции: всё считается заново на каждый ответ
+    for a in accepted:
+        if a["mode"] == "exact" and text == a["value"]:
+            return True
+        if a["mode"] == "normalized" and grading.normalize(text) == grading.normalize(a["value"]):
+            return True
+        if a["mode"] == "regex" and re.compile(a["value"]).fullmatch(text):
+            return True
+        if a["mode"] == "fuzzy" and grading.within_distance(
+            grading.normalize(text), grading.normalize(a["value"]), a["max_distance"]
+        ):
+            return True
+    return False
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--questions", type=int, default=100)
+    ap.add_argument("--submissions", type=int, default=5000)
+    args = ap.parse_args()
+
+    rnd = random.Random(7)
+    quiz = storage.create_quiz(owner_id=1, title="text heavy")
+    accepted_by_q = {}
+    for i in range(args.questions):
+        accepted = [{"mode": "normalized", "value": f"Answer number {i} v{k}"} for k in range(3)]
+        accepted += [
+            {"mode": "regex", "value": rf"(?:id|ID)-{i}-\d+"},
+            {"mode": "regex", "value": rf"code[ _]{i}[a-z]?"},
+            {"mode": "fuzzy", "value": f"Photosynthesis {i}", "max_distance": 2},
+        ]
+        q = storage.create_question(quiz["id"], f"Q{i}", "text", accepted=accepted)
+        accepted_by_q[q["id"]] = accepted
+
+    def answer(qid: int, i: int) -> Answer:
+        text = rnd.choice(
+            [f"answer NUMBER {i} v1!", f"ID-{i}-42", f"fotosynthesis {i}", "something else"]
+        )
+        return Answer(question_id=qid, text=text)
+
+    submissions = [
+        [answer(qid, i) for i, qid in enumerate(accepted_by_q)] for _ in range(args.submissions)
+    ]
+
+    grading.answer_key(quiz["id"])  # прогрев кеша
+    t0 = time.perf_counter()
+    for answers in submissions:
+        grading.grade(grading.answer_key(quiz["id"]), answers)
+    cached = time.perf_counter() - t0
+
+    n = max(1, args.submissions // 20)
+    snapshot = storage.quiz_version(quiz["id"])
+    t0 = time.perf_counter()
+    for answers in submissions[:n]:
+        grading.grade(grading.build_answer_key(snapshot, reuse=False), answers)
+    rebuilt = (time.perf_counter() - t0) * args.submissions / n
+
+    t0 = time.perf_counter()
+    for answers in submissions[:n]:
+        sum(naive_match(accepted_by_q[a.question_id], a.text) for a in answers)
+    naive = (time.perf_counter() - t0) * args.submissions / n
+
+    total = args.submissions * args.questions
+    print(f"{args.submissions} submissions x {args.questions} text questions")
+    for label, elapsed in [
+        ("cached answer key", cached),
+        ("key rebuilt per submit", rebuilt),
+        ("naive per-answer match", naive),
+    ]:
+        rate = args.submissions / elapsed
+        print(f"{label:<24} {rate:8,.0f} subm/s {total / elapsed:10,.0f} answers/s")
+
+
+if __name__ == "__main__":
+    main()
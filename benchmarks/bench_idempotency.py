@@ -0,0 +1,84 @@
+"""Idempotency-Key на submit: память на ключ и пропускная способность при 30% повторов.
+
+Повтор с тем же ключом отдаётся из кеша без проверки и без записи результата, поэтому
+при ретраях сервер делает меньше работы, а не больше.
+
+Запуск: python benchmarks/bench_idempotency.py [--requests 3000] [--retry 0.3]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+import uuid
+
+from _util import ROOT  # noqa: F401  (sys.path)
+from fastapi.testclient import TestClient
+
+from app import idempotency, storage
+from app.main import app
+from app.schemas.quiz import SubmitResult
+
+
+def memory(keys: int) -> None:
+    fp = idempotency.fingerprint(b"{}")
+    result = SubmitResult(score=1, max_score=1)
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    for i in range(keys):
+        idempotency.run("bench", f"{uuid.uuid4()}-{i}", fp, lambda: result)
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    print(f"cache: {keys} keys, {used / keys:.0f} B/key (UUID-ключ, результат общий)")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=3000)
+    ap.add_argument("--retry", type=float, default=0.3)
+    ap.add_argument("--questions", type=int, default=50)
+    ap.add_argument("--keys", type=int, default=100_000)
+    args = ap.parse_args()
+
+    memory(args.keys)
+
+    client = TestClient(app)
+    quiz = storage.create_quiz(owner_id=1, title="bench")
+    answers = []
+    for i in range(args.questions):
+        q = storage.create_question(quiz["id"], f"question {i}", "single")
+        ok = storage.create_choice(q["id"], "a", is_correct=True)
+        storage.create_choice(q["id"], "b", is_correct=False)
+        answers.append({"question_id": q["id"], "choice_id": ok["id"]})
+    url = f"/api/v1/public/quizzes/{quiz['id']}/submit"
+    body = {"answers": answers}
+
+    rnd = random.Random(1)
+    plans = {}
+    for mode in ("no key", "key", "key+retry"):
+        plan, sent = [], []
+        for i in range(args.requests):
+            if mode == "key+retry" and sent and rnd.random() < args.retry:
+                plan.append(rnd.choice(sent))
+            elif mode == "no key":
+                plan.append(None)
+            else:
+                sent.append(f"{mode}-{i}-{uuid.uuid4().hex}")
+                plan.append(sent[-1])
+        plans[mode] = plan
+
+    for mode, plan in plans.items():
+        before = len(storage.RESULTS)
+        t0 = time.perf_counter()
+        for key in plan:
+            headers = {"Idempotency-Key": key} if key else {}
+            assert client.post(url, json=body, headers=headers).status_code == 200
+        dt = time.perf_counter() - t0
+        print(
+            f"{mode:10s} {args.requests / dt:7.0f} req/s   "
+            f"saved results: {len(storage.RESULTS) - before}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Задержка лёгких запросов, пока идут тяжёлые операции: внутри запроса против фоновых задач.
+
+In-process через httpx.ASGITransport (без сети). Лёгкий трафик — --clients корутин по кругу:
+публичное превью маленького квиза и создание вопроса в нём (запись под блокировкой storage).
+Тяжёлые операции на том же процессе: удаление квиза из --questions вопросов по 4 варианта и
+экспорт --results результатов в CSV. Режимы:
+  idle    — без тяжёлых операций (база)
+  inline  — DELETE /quizzes/{id} и экспорт выполняются внутри запроса (экспорт — тем же
+            кодом задачи, вызванным прямо в обработчике)
+  jobs    — Prefer: respond-async / POST .../results/export: 202, задачи в пуле jobs,
+            клиент опрашивает GET /api/v1/jobs/{id}
+Выводим p50/p99 лёгких запросов за время тяжёлых и сколько тяжёлые заняли целиком.
+
+Запуск: python benchmarks/bench_jobs.py [--questions 20000] [--results 300000] [--clients 8]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List
+
+import httpx
+from _util import ROOT  # noqa: F401  (sys.path)
+
+from app import jobs, storage
+from app.main import app
+from app.routers.quizzes import _export_job
+from app.security import create_token
+
+
+def _pct(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def _seed_heavy(owner_id: int, args) -> tuple:
+    big = storage.create_quiz(owner_id, "big")
+    for i in range(args.questions):
+        q = storage.create_question(big["id"], f"question {i}", "single")
+        for c in range(4):
+            storage.create_choice(q["id"], f"choice {c}", is_correct=c == 0)
+    scored = storage.create_quiz(owner_id, "scored")
+    for i in range(args.results):
+        storage.save_result(scored["id"], i, i % 11, 10, [])
+    return big["id"], scored["id"]
+
+
+async def _heavy(client: httpx.AsyncClient, mode: str, big: int, scored: int, headers) -> None:
+    if mode == "inline":
+        delete = client.delete(f"/api/v1/quizzes/{big}", headers=headers)
+        # экспорт без задачи: тот же код в потоке, как если бы он шёл в обработчике
+        export = asyncio.to_thread(_export_job(scored), jobs.Job("inline", 0, None, 0))
+        r, _ = await asyncio.gather(delete, export)
+        assert r.status_code == 200, r.text
+        return
+    prefer = {**headers, "Prefer": "respond-async"}
+    started = [
+        await client.delete(f"/api/v1/quizzes/{big}", headers=prefer),
+        await client.post(f"/api/v1/quizzes/{scored}/results/export", headers=headers),
+    ]
+    for r in started:
+        assert r.status_code == 202, r.text
+        while True:
+            job = (await client.get(r.headers["Location"], headers=headers)).json()
+            if job["status"] not in (jobs.QUEUED, jobs.RUNNING):
+                assert job["status"] == jobs.SUCCEEDED, job
+                break
+            await asyncio.sleep(0.05)
+
+
+async def _scenario(mode: str, args, owner_id: int) -> str:
+    small = storage.create_quiz(owner_id, "small")
+    big, scored = _seed_heavy(owner_id, args) if mode != "idle" else (None, None)
+    auth = {"Authorization": f"Bearer {create_token(owner_id, 'user')}"}
+    transport = httpx.ASGITransport(app=app)
+    latencies: List[float] = []
+    stop = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def light(i: int) -> None:
+            body = {
+                "quiz_id": small["id"],
+                "text": "light",
+                "type": "single",
+                "choices": [{"text": "a", "is_correct": True}, {"text": "b"}],
+            }
+            n = 0
+            while not stop.is_set():
+                t0 = time.perf_counter()
+                if n % 2:
+                    r = await client.post("/api/v1/questions", json=body, headers=auth)
+                else:
+                    r = await client.get(f"/api/v1/public/quizzes/{small['id']}/preview")
+                assert r.status_code == 200, r.text
+                latencies.append(time.perf_counter() - t0)
+                n += 1
+
+        tasks = [asyncio.create_task(light(i)) for i in range(args.clients)]
+        t0 = time.perf_counter()
+        if mode == "idle":
+            await asyncio.sleep(args.idle_seconds)
+        else:
+            await _heavy(client, mode, big, scored, auth)
+        heavy_s = time.perf_counter() - t0
+        stop.set()
+        await asyncio.gather(*tasks)
+
+    storage.delete_quiz(small["id"])
+    if scored is not None:
+        storage.delete_quiz(scored)
+    return (
+        f"light p50={_pct(latencies, 0.5) * 1000:7.2f}ms  "
+        f"p99={_pct(latencies, 0.99) * 1000:7.2f}ms  "
+        f"max={max(latencies) * 1000:8.2f}ms  n={len(latencies):6d}  heavy={heavy_s:6.2f}s"
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--questions", type=int, default=20_000)
+    ap.add_argument("--results", type=int, default=300_000)
+    ap.add_argument("--clients", type=int, default=8)
+    ap.add_argument("--idle-seconds", type=float, default=1.0)
+    args = ap.parse_args()
+
+    user = storage.create_user("bench_jobs", "x")
+    print(
+        f"{args.questions} questions x 4 choices deleted, {args.results} results exported, "
+        f"{args.clients} light clients, workers={jobs.JOB_WORKERS} chunk={jobs.JOB_CHUNK}"
+    )
+    for mode in ("idle", "inline", "jobs"):
+        print(f"  {mode:7s}{asyncio.run(_scenario(mode, args, user['id']))}")
+    jobs.runner.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Лидерборд: латентность вставки и чтения top-N при 10^6 сабмитов в одном квизе.
+
+Запуск: python benchmarks/bench_leaderboard.py [--submissions 1000000] [--users 200000]
+"""
+
+import argparse
+import random
+import time
+
+from _util import summarize, timed
+
+from app import leaderboard
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--submissions", type=int, default=1_000_000)
+    ap.add_argument("--users", type=int, default=200_000)
+    ap.add_argument("--anonymous", type=float, default=0.3, help="доля публичных сабмитов")
+    ap.add_argument("--max-score", type=int, default=50)
+    args = ap.parse_args()
+
+    rnd = random.Random(3)
+    quiz_id, t = 1, 1_700_000_000
+    samples = []
+    t0 = time.perf_counter()
+    for rid in range(1, args.submissions + 1):
+        uid = None if rnd.random() < args.anonymous else rnd.randrange(args.users)
+        rec = {
+            "id": rid,
+            "quiz_id": quiz_id,
+            "user_id": uid,
+            "score": min(args.max_score, int(rnd.gauss(args.max_score * 0.6, 8))),
+            "max_score": args.max_score,
+            "created_at": t + rid // 10,
+        }
+        if rid % 100 == 0:
+            samples.append(timed(lambda: leaderboard.record(rec)))
+        else:
+            leaderboard.record(rec)
+    total = time.perf_counter() - t0
+    print(f"{args.submissions} inserts in {total:.2f}s ({args.submissions / total:,.0f}/s)")
+    print(f"insert latency (1% sample): {summarize(samples)}")
+
+    for n in (10, 50, leaderboard.LEADERBOARD_SIZE):
+        reads = [timed(lambda: leaderboard.top(quiz_id, n)) for _ in range(10_000)]
+        print(f"read top-{n:<4} {summarize(reads)}")
+
+    rows = [dict(id=i, score=i % args.max_score, created_at=i) for i in range(args.submissions)]
+    sort_time = timed(lambda: sorted(rows, key=lambda r: (-r["score"], r["created_at"]))[:10])
+    print(f"for comparison, full sort of {args.submissions} rows: {sort_time * 1e3:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Живые результаты (SSE) против опроса /results: задержка раздачи и память подписчиков.
+
+--subscribers потоков live.stream на один квиз в event loop; отдельный поток (как threadpool)
+делает --events вызовов save_result. Меряем задержку от save_result до получения кадра
+каждым подписчиком, память на подписчика и CPU на событие; для сравнения — CPU, который
+тратят столько же владельцев, опрашивая GET /results раз в --poll-interval секунд.
+
+Запуск: python benchmarks/bench_live.py [--subscribers 1000] [--events 50] [--results 2000]
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+import tracemalloc
+from typing import Dict, List
+
+from _util import ROOT  # noqa: F401  (sys.path)
+
+from app import live, storage
+from app.routers.quizzes import _live_seed, _result_read
+
+
+def _pct(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def run(args) -> None:
+    quiz = storage.create_quiz(owner_id=1, title="live")
+    for i in range(args.results):
+        storage.save_result(quiz["id"], i, i % 10, 10, [])
+
+    published: Dict[int, float] = {}
+    latencies: List[float] = []
+    got = [0]
+    done = asyncio.Event()
+    expected = args.subscribers * args.events
+
+    async def subscriber(ready: asyncio.Event) -> None:
+        async for chunk in live.stream(quiz["id"], lambda: _live_seed(quiz["id"])):
+            ready.set()
+            now = time.perf_counter()
+            for line in chunk.split(b"\n"):
+                if line.startswith(b"id: "):
+                    latencies.append(now - published[int(line[4:])])
+                    got[0] += 1
+            if got[0] >= expected:
+                done.set()
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    readies = [asyncio.Event() for _ in range(args.subscribers)]
+    tasks = [asyncio.create_task(subscriber(r)) for r in readies]
+    for r in readies:
+        await r.wait()
+    per_sub = (tracemalloc.get_traced_memory()[0] - base) / args.subscribers
+    tracemalloc.stop()
+
+    def publisher() -> None:
+        for i in range(args.events):
+            # id следующего результата: кадр может дойти раньше, чем save_result вернётся
+            published[storage._next_result_id] = time.perf_counter()
+            storage.save_result(quiz["id"], 10**6 + i, i % 10, 10, [])
+            time.sleep(args.interval)
+
+    cpu0 = time.process_time()
+    thread = threading.Thread(target=publisher)
+    thread.start()
+    await asyncio.wait_for(done.wait(), 60)
+    thread.join()
+    cpu = time.process_time() - cpu0  # сон publisher'а в CPU не входит
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    print(
+        f"subscribers: {args.subscribers}, events: {args.events}, results in quiz: {args.results}"
+    )
+    print(f"memory per idle subscriber: {per_sub:.0f} B (генератор, задача, очередь)")
+    print(
+        f"fan-out latency: p50={_pct(latencies, 0.5) * 1000:.2f}ms "
+        f"p95={_pct(latencies, 0.95) * 1000:.2f}ms max={max(latencies) * 1000:.2f}ms"
+    )
+    print(f"SSE CPU: {cpu / args.events * 1000:.2f}ms per event for all subscribers")
+
+    def poll() -> bytes:
+        rows = storage.list_results_for_quiz(quiz["id"])
+        return json.dumps([_result_read(r).model_dump() for r in rows]).encode()
+
+    t0 = time.perf_counter()
+    for _ in range(20):
+        poll()
+    per_poll = (time.perf_counter() - t0) / 20
+    polls_per_s = args.subscribers / args.poll_interval
+    print(
+        f"polling: {per_poll * 1000:.2f}ms per GET /results, {args.subscribers} owners every "
+        f"{args.poll_interval:g}s = {per_poll * polls_per_s:.2f} CPU-s per second"
+    )
+    sse_per_s = cpu / args.events * (1 / args.interval)
+    print(
+        f"SSE at the same event rate ({1 / args.interval:.0f}/s): {sse_per_s:.2f} CPU-s per second"
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--subscribers", type=int, default=1000)
+    ap.add_argument("--events", type=int, default=50)
+    ap.add_argument("--interval", type=float, default=0.02, help="секунды между save_result")
+    ap.add_argument("--results", type=int, default=2000)
+    ap.add_argument("--poll-interval", type=float, default=2.0)
+    args = ap.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Стоимость GET /api/v1/admin/memory: выборочная оценка против полного обхода.
+
+Заполняет storage (--users пользователей, --quizzes квизов по 10 вопросов с 4 вариантами,
+--results результатов), затем меряет memory.report() в обоих режимах и показывает
+расхождение оценки по крупным таблицам, а также, сколько стоит окно tracemalloc.
+
+Запуск: python benchmarks/bench_memory.py [--results 1000000] [--quizzes 10000]
+"""
+
+import argparse
+import asyncio
+import time
+
+from _util import ROOT  # noqa: F401  (sys.path)
+
+from app import memory, storage
+
+
+def _seed(args) -> None:
+    for i in range(args.users):
+        storage.create_user(f"user{i}", "x")
+    quizzes = []
+    for i in range(args.quizzes):
+        quiz = storage.create_quiz(1 + i % args.users, f"quiz {i}")
+        quizzes.append(quiz["id"])
+        for j in range(10):
+            q = storage.create_question(quiz["id"], f"question {j} of quiz {i}", "single")
+            for c in range(4):
+                storage.create_choice(q["id"], f"choice {c}", is_correct=c == 0)
+    for i in range(args.results):
+        answers = [{"question_id": j, "choice_id": j * 4} for j in range(10)]
+        storage.save_result(quizzes[i % len(quizzes)], 1 + i % args.users, i % 11, 10, answers)
+
+
+def _time(fn, reps: int) -> float:
+    samples = []
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return sorted(samples)[len(samples) // 2]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=10_000)
+    ap.add_argument("--quizzes", type=int, default=10_000)
+    ap.add_argument("--results", type=int, default=1_000_000)
+    ap.add_argument("--trace-seconds", type=float, default=1.0)
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    _seed(args)
+    print(f"seeded in {time.perf_counter() - t0:.1f}s")
+
+    sampled_s = _time(lambda: memory.report(), 20)
+    exact_s = _time(lambda: memory.report(exact=True), 1)
+    print(f"report sampled: {sampled_s * 1000:8.2f}ms (median of 20)")
+    print(f"report exact:   {exact_s * 1000:8.2f}ms")
+
+    sampled = {t["name"]: t for t in memory.report()["tables"]}
+    exact = memory.report(exact=True)
+    print(f"\n{'table':32s}{'rows':>10s}{'exact MB':>11s}{'sampled MB':>12s}{'error':>8s}")
+    for t in exact["tables"][:8]:
+        est = sampled[t["name"]]["bytes"]
+        err = (est - t["bytes"]) / t["bytes"] * 100 if t["bytes"] else 0.0
+        rows = t["rows"] if t["rows"] is not None else "-"
+        print(f"{t['name']:32s}{rows:>10}{t['bytes'] / 2**20:11.1f}{est / 2**20:12.1f}{err:7.1f}%")
+    print(f"{'total (exact)':32s}{'':10s}{exact['total_bytes'] / 2**20:11.1f}")
+    if exact["rss_bytes"]:
+        print(f"{'process RSS':32s}{'':10s}{exact['rss_bytes'] / 2**20:11.1f}")
+
+    async def traced() -> dict:
+        return await memory.trace(args.trace_seconds, 5)
+
+    t0 = time.perf_counter()
+    out = asyncio.run(traced())
+    overhead = time.perf_counter() - t0 - args.trace_seconds
+    print(f"\ntracemalloc window {args.trace_seconds:g}s: snapshots took {overhead * 1000:.0f}ms")
+    for s in out["top"]:
+        print(f"  {s['size_diff']:>10,d} B  {s['site']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Результаты пользователя по всем квизам: индекс пользователя против обхода квизов.
+
+Результаты растут ступенями до --results (--users пользователей, --quizzes квизов); на
+каждой ступени меряем страницу GET /api/v1/me/results уровня storage (срез индекса +
+заголовки квизов пачкой), первую и самую глубокую по курсору, и для сравнения — то, что
+пришлось бы делать без индекса: list_results_for_quiz(quiz, user_id) по всем квизам
+пользователя, слияние и сортировка.
+
+Запуск: python benchmarks/bench_my_results.py [--results 1000000] [--users 1000] [--limit 20]
+"""
+
+import argparse
+
+from _util import summarize, timed
+
+from app import storage
+
+
+def page(user_id: int, limit: int, before_id=None) -> list:
+    rows = storage.list_results_for_user(user_id, limit + 1, before_id=before_id)[:limit]
+    titles = storage.get_quiz_titles(r["quiz_id"] for r in rows)
+    return [(r["id"], titles.get(r["quiz_id"])) for r in rows]
+
+
+def per_quiz_scan(user_id: int, quiz_ids: list, limit: int) -> list:
+    rows = [r for qid in quiz_ids for r in storage.list_results_for_quiz(qid, user_id=user_id)]
+    rows.sort(key=lambda r: r["id"], reverse=True)
+    return [(r["id"], storage.get_quiz(r["quiz_id"])["title"]) for r in rows[:limit]]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--results", type=int, default=1_000_000)
+    ap.add_argument("--users", type=int, default=1_000)
+    ap.add_argument("--quizzes", type=int, default=200)
+    ap.add_argument("--limit", type=int, default=20)
+    args = ap.parse_args()
+
+    quiz_ids = [storage.create_quiz(1, f"quiz {i}")["id"] for i in range(args.quizzes)]
+    user_id = 1  # у каждого пользователя результаты во всех квизах
+    saved = 0
+    step = args.results // 100
+    while step <= args.results:
+        while saved < step:
+            storage.save_result(quiz_ids[saved % len(quiz_ids)], 1 + saved % args.users, 1, 1, [])
+            saved += 1
+        mine = storage._RESULT_IDS_BY_USER[user_id]
+        deepest = mine[min(args.limit, len(mine) - 1)]  # последняя страница истории
+        first = [timed(lambda: page(user_id, args.limit)) for _ in range(200)]
+        deep = [timed(lambda: page(user_id, args.limit, deepest)) for _ in range(200)]
+        scan = [timed(lambda: per_quiz_scan(user_id, quiz_ids, args.limit)) for _ in range(3)]
+        assert page(user_id, args.limit) == per_quiz_scan(user_id, quiz_ids, args.limit)
+        print(f"{saved:>9,d} results, {len(mine):>6,d} of user")
+        print(f"  index first page:   {summarize(first)}")
+        print(f"  index deepest page: {summarize(deep)}")
+        print(f"  per-quiz scan:      {summarize(scan)}")
+        step *= 10
+
+
+if __name__ == "__main__":
+    main()
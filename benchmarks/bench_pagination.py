@@ -0,0 +1,60 @@
+"""Пагинация квизов владельца: keyset-курсор против старого полного скана.
+
+Запуск: python benchmarks/bench_pagination.py [--quizzes 100000] [--limit 100]
+"""
+
+import argparse
+
+from _util import summarize, timed
+
+from app import storage
+from app.pagination import decode_cursor, encode_cursor
+
+
+def legacy_page(owner_id: int, limit: int, offset: int) -> list:
+    # поведение до индексов: скан всей таблицы + срез
+    owned = [q for q in storage.QUIZZES if q["owner_id"] == owner_id]
+    return owned[offset : offset + limit]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--quizzes", type=int, default=100_000)
+    ap.add_argument("--limit", type=int, default=100)
+    args = ap.parse_args()
+
+    owner, other = 1, 2
+    for i in range(args.quizzes):
+        storage.create_quiz(owner_id=owner, title=f"quiz {i}")
+        storage.create_quiz(owner_id=other, title=f"noise {i}")  # чужие строки в той же таблице
+
+    samples, cursor, seen = [], None, 0
+    while True:
+
+        def page():
+            after = decode_cursor(cursor) if cursor else None
+            return storage.list_quizzes_by_owner(owner, args.limit + 1, after_id=after)
+
+        samples.append(timed(page))
+        rows = page()
+        seen += min(len(rows), args.limit)
+        if len(rows) <= args.limit:
+            break
+        cursor = encode_cursor(rows[args.limit - 1]["id"])
+    assert seen == args.quizzes, seen
+    print(f"cursor pages ({seen} rows):  {summarize(samples)}")
+
+    first = [timed(lambda: storage.list_quizzes_by_owner(owner, args.limit)) for _ in range(50)]
+    deep_offset = args.quizzes - args.limit
+    deep = [
+        timed(lambda: storage.list_quizzes_by_owner(owner, args.limit, deep_offset))
+        for _ in range(50)
+    ]
+    legacy = [timed(lambda: legacy_page(owner, args.limit, deep_offset)) for _ in range(10)]
+    print(f"offset first page:        {summarize(first)}")
+    print(f"offset deepest page:      {summarize(deep)}")
+    print(f"legacy scan deepest page: {summarize(legacy)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Память под постоянной нагрузкой сабмитов: без ретенции и с keep_last + фоновой компакцией.
+
+Запуск: python benchmarks/bench_retention.py [--submissions 300000] [--keep-last 1000]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from _util import ROOT  # noqa: F401  (sys.path)
+
+from app import storage
+from app.compactor import ResultCompactor
+
+
+def run(label: str, args, keep_last) -> None:
+    storage.RESULTS.clear()
+    storage._RESULT_IDS_BY_QUIZ.clear()
+    storage._RESULT_IDS_BY_USER.clear()
+    storage.ROLLUPS.clear()
+    storage.RETENTION.clear()
+    for quiz_id in range(1, args.quizzes + 1):
+        storage.set_retention(quiz_id, keep_last=keep_last, keep_days=None)
+    compactor = ResultCompactor(interval=0.05, batch=500)
+    compactor.start()
+
+    def answers() -> list:
+        # как в роутере: новый список dict'ов на каждый сабмит
+        return [
+            {"question_id": i, "choice_id": i * 4, "choice_ids": None, "text": None}
+            for i in range(args.answers)
+        ]
+
+    tracemalloc.start()
+    checkpoints, t0 = [], time.perf_counter()
+    step = args.submissions // 5
+    for n in range(1, args.submissions + 1):
+        storage.save_result(n % args.quizzes + 1, None, n % 10, 10, answers())
+        if n % step == 0:
+            checkpoints.append(tracemalloc.get_traced_memory()[0] / 2**20)
+    elapsed = time.perf_counter() - t0
+    compactor.stop()
+    while storage.compact_results():
+        pass
+    final = tracemalloc.get_traced_memory()[0] / 2**20
+    tracemalloc.stop()
+
+    trend = " -> ".join(f"{m:.0f}" for m in checkpoints)
+    print(f"{label}: {args.submissions / elapsed:,.0f} submits/s")
+    print(f"  traced MiB at each 20%: {trend}; after final compaction {final:.0f}")
+    print(f"  raw rows kept: {len(storage.RESULTS)}, quizzes with rollups: {len(storage.ROLLUPS)}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--submissions", type=int, default=300_000)
+    ap.add_argument("--quizzes", type=int, default=50)
+    ap.add_argument("--answers", type=int, default=10, help="ответов в одном сабмите")
+    ap.add_argument("--keep-last", type=int, default=1000)
+    args = ap.parse_args()
+
+    run("no retention", args, keep_last=None)
+    run(f"keep_last={args.keep_last}", args, keep_last=args.keep_last)
+
+
+if __name__ == "__main__":
+    main()
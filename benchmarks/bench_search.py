@@ -0,0 +1,70 @@
+"""Латентность поиска по инвертированному индексу при 10^6 проиндексированных вопросах.
+
+Индекс наполняется напрямую через app.search (без строк storage), чтобы измерять только его.
+Запуск: python benchmarks/bench_search.py [--questions 1000000] [--quizzes 10000]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from _util import summarize, timed
+
+from app import search
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--questions", type=int, default=1_000_000)
+    ap.add_argument("--quizzes", type=int, default=10_000)
+    ap.add_argument("--vocab", type=int, default=50_000)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--trace-memory", action="store_true", help="медленнее в ~2 раза")
+    args = ap.parse_args()
+
+    rnd = random.Random(42)
+    vocab = [f"w{i:05d}x{rnd.randrange(1000)}" for i in range(args.vocab)]
+    # частоты слов ~ Zipf: несколько очень частых слов и длинный хвост
+    cum, acc = [], 0.0
+    for i in range(args.vocab):
+        acc += 1.0 / (i + 1)
+        cum.append(acc)
+
+    def words(k: int) -> str:
+        return " ".join(rnd.choices(vocab, cum_weights=cum, k=k))
+
+    owner = 1
+
+    if args.trace_memory:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    for quiz_id in range(1, args.quizzes + 1):
+        search.index_quiz(owner, quiz_id, words(3))
+    for qn in range(1, args.questions + 1):
+        quiz_id = qn % args.quizzes + 1
+        search.index_question(owner, quiz_id, qn, words(8))
+        search.add_question_text(owner, qn, words(4))
+    build = time.perf_counter() - t0
+    print(f"indexed {args.questions} questions in {build:.1f}s")
+    if args.trace_memory:
+        print(f"index memory: {tracemalloc.get_traced_memory()[0] / 2**20:.0f} MiB")
+        tracemalloc.stop()
+
+    def run(label: str, queries: list, offset: int = 0) -> None:
+        samples = [timed(lambda: search.search(owner, q, 10, offset)) for q in queries]
+        print(f"{label:<28} {summarize(samples)}")
+
+    n = args.queries
+    run("rare exact term", [rnd.choice(vocab[-20_000:]) for _ in range(n)])
+    run("mid-frequency term", [rnd.choice(vocab[100:1000]) for _ in range(n)])
+    run("frequent term", [rnd.choice(vocab[:10]) for _ in range(n)])
+    run("prefix (6 chars)", [rnd.choice(vocab[1000:])[:6] for _ in range(n)])
+    run(
+        "two terms (AND)", [f"{rnd.choice(vocab[:50])} {rnd.choice(vocab[:500])}" for _ in range(n)]
+    )
+    run("deep page (offset 500)", [rnd.choice(vocab[:10]) for _ in range(20)], offset=500)
+
+
+if __name__ == "__main__":
+    main()
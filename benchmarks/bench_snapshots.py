@@ -0,0 +1,113 @@
+"""Чтение квиза под конкурентной записью: опубликованные снимки против чтения живых списков.
+
+Квиз из --questions вопросов по 4 варианта; --readers потоков читают его целиком (вопросы и
+варианты каждого, как public_preview), один поток-писатель заменяет варианты случайного
+вопроса через apply_question_batch. Темп записи в выводе (writes/s) — фактический: под GIL
+спящий писатель просыпается реже, чем просит.
+Режимы чтения:
+  snapshot  — storage.quiz_version(): без блокировок, снимок публикуется писателем
+  locked    — живые списки под storage._WRITE_LOCK (так пришлось бы читать без снимков)
+  unlocked  — живые списки без блокировки: быстро, но видны недописанные правки (torn)
+
+Запуск: python benchmarks/bench_snapshots.py [--questions 50] [--readers 4] [--seconds 2]
+"""
+
+import argparse
+import random
+import threading
+import time
+from typing import Callable, List
+
+from _util import ROOT  # noqa: F401  (sys.path)
+
+from app import storage
+
+CHOICES = 4
+
+
+def _seed(questions: int) -> int:
+    quiz = storage.create_quiz(1, "snapshots")
+    for i in range(questions):
+        q = storage.create_question(quiz["id"], f"question {i}", "single")
+        for c in range(CHOICES):
+            storage.create_choice(q["id"], f"choice {c}", is_correct=c == 0)
+    return quiz["id"]
+
+
+def _readers(quiz_id: int) -> dict:
+    def snapshot() -> int:
+        snap = storage.quiz_version(quiz_id)
+        return sum(len(qv.choices) != CHOICES for qv in snap.questions)
+
+    def live() -> int:
+        return sum(
+            len(storage._live_choices(q["id"])) != CHOICES for q in storage._live_questions(quiz_id)
+        )
+
+    def locked() -> int:
+        with storage._WRITE_LOCK:
+            return live()
+
+    return {"snapshot": snapshot, "locked": locked, "unlocked": live}
+
+
+def _run(read: Callable[[], int], quiz_id: int, args) -> str:
+    stop = threading.Event()
+    ids = [q["id"] for q in storage.list_questions_by_quiz(quiz_id)]
+    writes = [0]
+
+    def writer() -> None:
+        rng = random.Random(1)
+        pause = 1 / args.write_rate if args.write_rate else 0
+        while not stop.is_set():
+            choices = [(f"v{writes[0]}-{c}", c == 0) for c in range(CHOICES)]
+            storage.apply_question_batch(quiz_id, [], {rng.choice(ids): {"choices": choices}}, [])
+            writes[0] += 1
+            if pause:
+                time.sleep(pause)
+
+    latencies: List[List[float]] = [[] for _ in range(args.readers)]
+    torn = [0] * args.readers
+
+    def reader(i: int) -> None:
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            torn[i] += read() > 0
+            latencies[i].append(time.perf_counter() - t0)
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    if args.write_rate >= 0:
+        threads.append(threading.Thread(target=writer))
+    for t in threads:
+        t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    samples = sorted(x for per in latencies for x in per)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6
+    return (
+        f"{len(samples) / args.seconds:10,.0f} reads/s  p99={p99:8.1f}us  "
+        f"torn={sum(torn):6d}  writes/s={writes[0] / args.seconds:8,.0f}"
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--questions", type=int, default=50)
+    ap.add_argument("--readers", type=int, default=4)
+    ap.add_argument("--seconds", type=float, default=2.0)
+    args = ap.parse_args()
+
+    quiz_id = _seed(args.questions)
+    print(f"{args.questions} questions x {CHOICES} choices, {args.readers} reader threads")
+    for label, rate in (("no writer", -1), ("writes 100/s", 100), ("writes flat-out", 0)):
+        args.write_rate = rate
+        print(label)
+        for mode, read in _readers(quiz_id).items():
+            print(f"  {mode:9s}{_run(read, quiz_id, args)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""Микробенчмарки app.storage: как каждая функция масштабируется с размером таблиц.
+
+Для каждого размера N (отдельный процесс — storage глобальный) заполняет хранилище:
+N/10 пользователей, N items, N/100 квизов по 25 вопросов с 4 вариантами (N вариантов),
+N результатов; затем меряет медиану одного вызова каждой публичной функции storage и
+grading.grade. По медианам на разных N подбирается показатель степени b (время ~ N^b):
+~0 — не зависит от размера таблиц, ~1 — линейный проход по таблице.
+
+  --save    записать медианы и показатели в --baseline (JSON)
+  --check   сравнить с --baseline: exit 1, если функция медленнее больше чем на --tolerance
+            или её показатель вырос больше чем на --max-slope-increase
+
+Запуск: python benchmarks/bench_storage.py [--sizes 1000,10000,100000,1000000] [--save|--check]
+"""
+
+import argparse
+import gc
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from _util import ROOT
+
+from app import grading, storage
+from app.schemas.quiz import Answer
+
+DEFAULT_BASELINE = ROOT / "benchmarks" / "storage_baseline.json"
+QUESTIONS_PER_QUIZ = 25
+CHOICES_PER_QUESTION = 4
+RESULTS_PER_TARGET = 100  # у квиза, который читаем, — фиксированное число результатов
+MIN_DELTA = 2e-6  # разницы меньше 2 мкс считаем шумом
+TIME_FLOOR = 1e-6  # для подбора показателя: всё быстрее 1 мкс — одинаково «мгновенно»
+
+# (имя, prepare(k) -> k аргументов, op(arg)); prepare не входит в замер
+Case = Tuple[str, Optional[Callable[[int], list]], Callable]
+
+
+def _seed(n: int) -> dict:
+    users = [storage.create_user(f"user{i}", "x")["id"] for i in range(max(1, n // 10))]
+    for i in range(n):
+        storage.create_item(users[i % len(users)], f"item {i}")
+    quizzes = []
+    for i in range(max(1, n // (QUESTIONS_PER_QUIZ * CHOICES_PER_QUESTION))):
+        quiz = storage.create_quiz(users[i % len(users)], f"quiz {i}")
+        quizzes.append(quiz["id"])
+        for j in range(QUESTIONS_PER_QUIZ):
+            q = storage.create_question(quiz["id"], f"question {j} of {i}", "single")
+            for c in range(CHOICES_PER_QUESTION):
+                storage.create_choice(q["id"], f"choice {c}", is_correct=c == 0)
+    for i in range(n):
+        storage.save_result(quizzes[i % len(quizzes)], users[i % len(users)], 1, 25, [])
+
+    owner = users[0]
+    target = storage.create_quiz(owner, "target")
+    for j in range(QUESTIONS_PER_QUIZ):
+        q = storage.create_question(target["id"], f"target question {j}", "single")
+        for c in range(CHOICES_PER_QUESTION):
+            storage.create_choice(q["id"], f"choice {c}", is_correct=c == 0)
+    for i in range(RESULTS_PER_TARGET):
+        storage.save_result(target["id"], users[i % len(users)], 1, 25, [])
+    return {"n": n, "owner": owner, "quiz": target["id"], "users": len(users)}
+
+
+def _cases(ctx: dict) -> Iterator[Case]:
+    n, owner, quiz_id = ctx["n"], ctx["owner"], ctx["quiz"]
+    question = storage.list_questions_by_quiz(quiz_id)[0]
+    counter = iter(range(10**9))
+    # ключ и ответы — по исходным 25 вопросам, до правок квиза случаями ниже
+    key = grading.answer_key(quiz_id)
+    answers = [
+        Answer(question_id=q["id"], choice_id=storage.list_choices_by_question(q["id"])[0]["id"])
+        for q in storage.list_questions_by_quiz(quiz_id)
+    ]
+
+    def fresh_quiz() -> int:
+        return storage.create_quiz(owner, f"fresh {next(counter)}")["id"]
+
+    def fresh_question() -> int:
+        q = storage.create_question(quiz_id, f"fresh {next(counter)}", "single")
+        for c in range(CHOICES_PER_QUESTION):
+            storage.create_choice(q["id"], f"c{c}", is_correct=c == 0)
+        return q["id"]
+
+    def repeat(value):
+        return lambda k: [value] * k
+
+    # --- users / items ---
+    yield "create_user", lambda k: [f"new{next(counter)}" for _ in range(k)], lambda u: (
+        storage.create_user(u, "x")
+    )
+    yield "get_user_by_username", repeat("user0"), storage.get_user_by_username
+    yield "get_user_by_id", repeat(owner), storage.get_user_by_id
+    yield "create_item", repeat(owner), lambda o: storage.create_item(o, "new item")
+    yield "get_item", repeat(n // 2 or 1), storage.get_item
+    yield "list_items_all", repeat(n // 2), lambda off: storage.list_items_all(50, off)
+    yield "list_items_by_owner", repeat(owner), lambda o: storage.list_items_by_owner(o, 50)
+    yield "update_item_name", repeat(n // 2 or 1), lambda i: storage.update_item_name(i, "renamed")
+    yield "delete_item", lambda k: [storage.create_item(owner, "d")["id"] for _ in range(k)], (
+        storage.delete_item
+    )
+
+    # --- quizzes ---
+    yield "create_quiz", repeat(owner), lambda o: storage.create_quiz(o, "new quiz")
+    yield "get_quiz", repeat(quiz_id), storage.get_quiz
+    yield "list_quizzes_by_owner", repeat(owner), lambda o: storage.list_quizzes_by_owner(o, 50)
+    yield "update_quiz_title", lambda k: [fresh_quiz() for _ in range(k)], lambda q: (
+        storage.update_quiz_title(q, "renamed quiz")
+    )
+    yield "delete_quiz", lambda k: [fresh_quiz() for _ in range(k)], storage.delete_quiz
+
+    # --- questions / choices ---
+    yield "create_question", repeat(quiz_id), lambda q: storage.create_question(q, "new", "text")
+    yield "get_question", repeat(question["id"]), storage.get_question
+    yield "list_questions_by_quiz", repeat(quiz_id), storage.list_questions_by_quiz
+    yield "update_question", lambda k: [fresh_question() for _ in range(k)], lambda q: (
+        storage.update_question(q, text="edited question")
+    )
+    yield "delete_question", lambda k: [fresh_question() for _ in range(k)], (
+        storage.delete_question
+    )
+    yield "create_choice", lambda k: [fresh_question() for _ in range(k)], lambda q: (
+        storage.create_choice(q, "extra", is_correct=False)
+    )
+    yield "list_choices_by_question", repeat(question["id"]), storage.list_choices_by_question
+    yield "delete_choices_for_question", lambda k: [fresh_question() for _ in range(k)], (
+        storage.delete_choices_for_question
+    )
+
+    # --- results / grading ---
+    yield "save_result", repeat(quiz_id), lambda q: storage.save_result(q, owner, 1, 25, [])
+    yield "list_results_for_quiz", repeat(quiz_id), storage.list_results_for_quiz
+    yield "grade", repeat(answers), lambda a: grading.grade(key, a)
+
+
+def _measure(
+    prepare: Optional[Callable[[int], list]], op: Callable, reps: int, budget: float
+) -> float:
+    # медиана одного вызова; медленные функции — меньше повторов, но не меньше 5
+    args = prepare(reps) if prepare else [None] * reps
+    samples: List[float] = []
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for arg in args:
+            t0 = time.perf_counter()
+            op(arg)
+            samples.append(time.perf_counter() - t0)
+            if len(samples) >= 5 and time.perf_counter() - started > budget:
+                break
+    finally:
+        gc.enable()
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def child(n: int, reps: int, budget: float) -> None:
+    t0 = time.perf_counter()
+    ctx = _seed(n)
+    seeded = time.perf_counter() - t0
+    out = {name: _measure(prepare, op, reps, budget) for name, prepare, op in _cases(ctx)}
+    json.dump({"n": n, "seed_s": seeded, "median_s": out}, sys.stdout)
+
+
+def fit_slope(points: List[Tuple[int, float]]) -> Optional[float]:
+    # наклон прямой log(t) = b*log(N) + c по методу наименьших квадратов
+    if len(points) < 2:
+        return None
+    xs = [math.log(n) for n, _ in points]
+    ys = [math.log(max(t, TIME_FLOOR)) for _, t in points]
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    var = sum((x - mx) ** 2 for x in xs)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / var if var else None
+
+
+def label(slope: Optional[float]) -> str:
+    if slope is None:
+        return "?"
+    if slope < 0.25:
+        return "O(1)"
+    if slope < 0.75:
+        return f"O(n^{slope:.2f})"
+    if slope < 1.25:
+        return "O(n)"
+    return f"O(n^{slope:.2f})"
+
+
+def check(current: dict, baseline: dict, tolerance: float, max_slope_increase: float) -> List[str]:
+    problems = []
+    for size, ops in current["sizes"].items():
+        base_ops = baseline["sizes"].get(size, {})
+        for name, t in ops.items():
+            old = base_ops.get(name)
+            if old is not None and t > old * (1 + tolerance) and t - old > MIN_DELTA:
+                problems.append(f"{name} @ N={size}: {old * 1e6:.1f}us -> {t * 1e6:.1f}us")
+    for name, slope in current["slopes"].items():
+        old = baseline["slopes"].get(name)
+        if slope is None or old is None or slope < 0.5:
+            continue  # наклоны около нуля на 1-2 мкс — шум, интересен только рост с N
+        if slope - old > max_slope_increase:
+            problems.append(f"{name}: complexity {label(old)} -> {label(slope)}")
+    return problems
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="1000,10000,100000,1000000")
+    ap.add_argument("--reps", type=int, default=200, help="вызовов на функцию (максимум)")
+    ap.add_argument("--budget", type=float, default=1.0, help="секунд на функцию (примерно)")
+    ap.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    ap.add_argument("--save", action="store_true")
+    ap.add_argument("--check", action="store_true")
+    ap.add_argument("--tolerance", type=float, default=1.0, help="допустимое замедление, доля")
+    ap.add_argument("--max-slope-increase", type=float, default=0.4)
+    ap.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child is not None:
+        child(args.child, args.reps, args.budget)
+        return
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    runs: Dict[int, dict] = {}
+    for n in sizes:
+        cmd = [sys.executable, __file__, "--child", str(n), "--reps", str(args.reps)]
+        out = subprocess.run(
+            cmd + ["--budget", str(args.budget)], check=True, capture_output=True, text=True
+        )
+        runs[n] = json.loads(out.stdout)
+        print(f"N={n}: seeded in {runs[n]['seed_s']:.1f}s", file=sys.stderr)
+
+    names = list(runs[sizes[0]]["median_s"])
+    slopes = {name: fit_slope([(n, runs[n]["median_s"][name]) for n in sizes]) for name in names}
+    header = "".join(f"{'N=' + str(n):>12s}" for n in sizes)
+    print(f"{'function':28s}{header}   fitted       ops/s @ N={sizes[-1]}")
+    for name in names:
+        cells = "".join(f"{runs[n]['median_s'][name] * 1e6:10.2f}us" for n in sizes)
+        ops = 1 / max(runs[sizes[-1]]["median_s"][name], 1e-9)
+        print(f"{name:28s}{cells}   {label(slopes[name]):12s} {ops:12,.0f}")
+
+    current = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "sizes": {str(n): runs[n]["median_s"] for n in sizes},
+        "slopes": slopes,
+    }
+    if args.save:
+        args.baseline.write_text(json.dumps(current, indent=2, sort_keys=True) + "\n")
+        print(f"baseline saved: {args.baseline}")
+    if args.check:
+        baseline = json.loads(args.baseline.read_text())
+        problems = check(current, baseline, args.tolerance, args.max_slope_increase)
+        for line in problems:
+            print(f"REGRESSION {line}")
+        if problems:
+            raise SystemExit(1)
+        print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
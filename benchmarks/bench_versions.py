@@ -0,0 +1,70 @@
+"""Версии и клоны квиза: память клона до правки, стоимость первой правки и новой версии.
+
+Запуск: python benchmarks/bench_versions.py [--questions 500] [--clones 1000]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from _util import ROOT  # noqa: F401  (sys.path)
+
+from app import storage
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--questions", type=int, default=500)
+    ap.add_argument("--choices", type=int, default=4)
+    ap.add_argument("--clones", type=int, default=1000)
+    args = ap.parse_args()
+
+    quiz = storage.create_quiz(owner_id=1, title="source")
+    qids = []
+    for i in range(args.questions):
+        q = storage.create_question(quiz["id"], f"question number {i}", "single")
+        qids.append(q["id"])
+        for j in range(args.choices):
+            storage.create_choice(q["id"], f"choice {j} of {i}", is_correct=j == 0)
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    storage.quiz_version(quiz["id"])
+    snap = tracemalloc.get_traced_memory()[0] - base
+    print(f"snapshot of {args.questions} questions: {snap / 1024:.1f} KiB (один раз на версию)")
+
+    base = tracemalloc.get_traced_memory()[0]
+    t0 = time.perf_counter()
+    clones = [storage.clone_quiz(quiz["id"], owner_id=2) for _ in range(args.clones)]
+    dt = time.perf_counter() - t0
+    used = tracemalloc.get_traced_memory()[0] - base
+    print(
+        f"clone x{args.clones}: {used / args.clones:.0f} B/clone, "
+        f"{dt / args.clones * 1e6:.1f}us/clone"
+    )
+
+    clone_id = clones[0]["id"]
+    first_q = storage.list_questions_by_quiz(clone_id)[0]["id"]
+    base = tracemalloc.get_traced_memory()[0]
+    t0 = time.perf_counter()
+    storage.update_question(first_q, text="edited")
+    dt = time.perf_counter() - t0
+    used = tracemalloc.get_traced_memory()[0] - base
+    print(f"first edit of a clone (materialize): {dt * 1000:.1f}ms, {used / 1024:.1f} KiB")
+
+    base = tracemalloc.get_traced_memory()[0]
+    t0 = time.perf_counter()
+    for n, qid in enumerate(qids[:100]):
+        storage.update_question(qid, text=f"edit {n}")
+        storage.quiz_version(quiz["id"])
+    dt = time.perf_counter() - t0
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    print(
+        f"edit + new version x100: {used / 100 / 1024:.1f} KiB/version, "
+        f"{dt / 100 * 1000:.2f}ms/version (вопросы без правок общие)"
+    )
+
+
+if __name__ == "__main__":
+    main()
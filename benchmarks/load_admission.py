@@ -0,0 +1,162 @@
+"""Перегрузка submit/login: admission control против приёма всего подряд.
+
+Поднимает uvicorn дважды — с лимитами классов по умолчанию и с ADMISSION_*_LIMIT=0 — и
+одновременно шлёт волну public submit и login (--spike запросов, --concurrency соединений)
+и поток запросов владельца GET /quizzes/{id}. Goodput — успешные ответы не дольше --deadline.
+Клиент работает на той же машине: на малом числе ядер абсолютные задержки завышены,
+сравнивать стоит режимы между собой.
+
+Запуск: python benchmarks/load_admission.py [--spike 3000] [--concurrency 400]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from typing import Dict, List
+
+import httpx
+from _util import ROOT
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(port: int, env: Dict[str, str]) -> subprocess.Popen:
+    env = dict(os.environ, PYTHONPATH=str(ROOT / "src"), **env)
+    cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)]
+    proc = subprocess.Popen(
+        cmd + ["--log-level", "warning", "--backlog", "4096"], env=env, cwd=str(ROOT)
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health", timeout=0.5)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    proc.kill()
+    raise SystemExit("server did not start")
+
+
+class Stats:
+    def __init__(self) -> None:
+        self.ok: List[float] = []
+        self.shed = 0
+        self.errors = 0
+
+    def line(self, elapsed: float, deadline: float) -> str:
+        ok = sorted(self.ok)
+        good = sum(1 for t in ok if t <= deadline)
+        p95 = ok[min(len(ok) - 1, int(len(ok) * 0.95))] * 1000 if ok else float("nan")
+        return (
+            f"ok={len(ok):5d} goodput={good / elapsed:7.1f}/s p95={p95:8.1f}ms "
+            f"503={self.shed:5d} errors={self.errors}"
+        )
+
+
+async def _run(base: str, args, seed: dict) -> None:
+    limits = httpx.Limits(max_connections=args.concurrency + 20)
+    stats = {"submit": Stats(), "login": Stats(), "owner": Stats()}
+    sem = asyncio.Semaphore(args.concurrency)
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=120) as client:
+
+        async def call(kind: str, method: str, url: str, **kw) -> None:
+            t0 = time.perf_counter()
+            try:
+                r = await client.request(method, url, **kw)
+            except httpx.HTTPError:
+                stats[kind].errors += 1
+                return
+            if r.status_code == 200:
+                stats[kind].ok.append(time.perf_counter() - t0)
+            elif r.status_code == 503:
+                stats[kind].shed += 1
+            else:
+                stats[kind].errors += 1
+
+        async def spike(i: int) -> None:
+            async with sem:
+                if i % 4 == 0:
+                    await call("login", "POST", "/api/v1/auth/login", json=seed["creds"])
+                else:
+                    await call("submit", "POST", seed["submit"], json=seed["answers"])
+
+        async def owner() -> None:
+            while not done.is_set():
+                await call("owner", "GET", seed["detail"], headers=seed["headers"])
+
+        t0 = time.perf_counter()
+        owners = [asyncio.create_task(owner()) for _ in range(args.owners)]
+        await asyncio.gather(*(spike(i) for i in range(args.spike)))
+        done.set()
+        await asyncio.gather(*owners)
+        elapsed = time.perf_counter() - t0
+
+    deadlines = {"submit": args.deadline, "login": 0.35, "owner": 0.25}  # NFR-11
+    for kind, s in stats.items():
+        print(f"  {kind:6s} {s.line(elapsed, deadlines[kind])}")
+
+
+def _seed(base: str, questions: int) -> dict:
+    creds = {"username": f"bench_{uuid.uuid4().hex[:8]}", "password": "secret123"}
+    httpx.post(f"{base}/api/v1/auth/register", json=creds).raise_for_status()
+    token = httpx.post(f"{base}/api/v1/auth/login", json=creds).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    quiz = httpx.post(f"{base}/api/v1/quizzes", json={"title": "spike"}, headers=headers).json()
+    answers = []
+    for i in range(questions):
+        body = {
+            "quiz_id": quiz["id"],
+            "text": f"question {i}",
+            "type": "single",
+            "choices": [{"text": f"choice {j}", "is_correct": j == 0} for j in range(4)],
+        }
+        q = httpx.post(f"{base}/api/v1/questions", json=body, headers=headers).json()
+        answers.append({"question_id": q["id"], "choice_id": q["choices"][0]["id"]})
+    return {
+        "creds": creds,
+        "headers": headers,
+        "answers": {"answers": answers},
+        "submit": f"/api/v1/public/quizzes/{quiz['id']}/submit",
+        "detail": f"/api/v1/quizzes/{quiz['id']}",
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--spike", type=int, default=3000)
+    ap.add_argument("--concurrency", type=int, default=400)
+    ap.add_argument("--owners", type=int, default=4, help="параллельных клиентов-владельцев")
+    ap.add_argument("--questions", type=int, default=50)
+    ap.add_argument("--deadline", type=float, default=1.0, help="секунды для goodput submit")
+    args = ap.parse_args()
+
+    modes = {
+        "admission on ": {},
+        "admission off": {"ADMISSION_AUTH_LIMIT": "0", "ADMISSION_SUBMIT_LIMIT": "0"},
+    }
+    print(f"spike {args.spike} requests (1/4 login), concurrency {args.concurrency}")
+    for name, env in modes.items():
+        port = _free_port()
+        base = f"http://127.0.0.1:{port}"
+        proc = _start_server(port, env)
+        try:
+            seed = _seed(base, args.questions)
+            print(name)
+            asyncio.run(_run(base, args, seed))
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Нагрузочный тест read-эндпойнтов: async-обработчики против sync (через threadpool).
+
+Поднимает uvicorn в отдельном процессе и шлёт --requests запросов с --concurrency
+одновременными соединениями на пары эндпойнтов с одинаковой работой:
+  public preview (async)  vs  owner preview (sync)
+  quiz detail (async)     vs  GET /questions?quiz_id= (sync)
+
+Запуск: python benchmarks/load_read_endpoints.py [--requests 2000] [--concurrency 500]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from typing import List, Tuple
+
+import httpx
+from _util import ROOT
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(port: int, threads: int) -> subprocess.Popen:
+    env = dict(os.environ, PYTHONPATH=str(ROOT / "src"), THREADPOOL_SIZE=str(threads))
+    cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)]
+    proc = subprocess.Popen(
+        cmd + ["--log-level", "warning", "--backlog", "4096"], env=env, cwd=str(ROOT)
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health", timeout=0.5)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    proc.kill()
+    raise SystemExit("server did not start")
+
+
+def _seed(base: str, questions: int) -> Tuple[int, dict]:
+    creds = {"username": f"bench_{uuid.uuid4().hex[:8]}", "password": "secret123"}
+    httpx.post(f"{base}/api/v1/auth/register", json=creds).raise_for_status()
+    token = httpx.post(f"{base}/api/v1/auth/login", json=creds).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    quiz = httpx.post(f"{base}/api/v1/quizzes", json={"title": "load"}, headers=headers).json()
+    for i in range(questions):
+        body = {
+            "quiz_id": quiz["id"],
+            "text": f"question {i}",
+            "type": "single",
+            "choices": [{"text": f"choice {j}", "is_correct": j == 0} for j in range(4)],
+        }
+        httpx.post(f"{base}/api/v1/questions", json=body, headers=headers).raise_for_status()
+    return quiz["id"], headers
+
+
+async def _load(base: str, path: str, headers: dict, total: int, concurrency: int) -> str:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    latencies: List[float] = []
+    errors = 0
+    sem = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=60) as client:
+
+        async def one() -> None:
+            nonlocal errors
+            async with sem:
+                t0 = time.perf_counter()
+                r = await client.get(path, headers=headers)
+                latencies.append(time.perf_counter() - t0)
+                errors += r.status_code != 200
+
+        await client.get(path, headers=headers)  # прогрев соединения и кешей
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+    return f"{total / elapsed:8,.0f} req/s  p50={p50:7.1f}ms  p95={p95:7.1f}ms  errors={errors}"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=500)
+    ap.add_argument("--questions", type=int, default=20)
+    ap.add_argument("--threads", type=int, default=40, help="THREADPOOL_SIZE сервера")
+    args = ap.parse_args()
+
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    proc = _start_server(port, args.threads)
+    try:
+        quiz_id, headers = _seed(base, args.questions)
+        pairs = [
+            ("public preview  (async)", f"/api/v1/public/quizzes/{quiz_id}/preview", {}),
+            ("owner preview   (sync) ", f"/api/v1/quizzes/{quiz_id}/preview", headers),
+            ("quiz detail     (async)", f"/api/v1/quizzes/{quiz_id}", headers),
+            ("questions list  (sync) ", f"/api/v1/questions?quiz_id={quiz_id}", headers),
+        ]
+        print(f"{args.requests} requests, concurrency {args.concurrency}, threads {args.threads}")
+        for name, path, hdrs in pairs:
+            line = asyncio.run(_load(base, path, hdrs, args.requests, args.concurrency))
+            print(f"{name}: {line}")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
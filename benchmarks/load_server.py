@@ -0,0 +1,161 @@
+"""Пропускная способность сервера: `python -m app` против uvicorn с настройками по умолчанию.
+
+Конфигурации:
+  uvicorn default   — `uvicorn app.main:app` (access-лог, keep-alive 5 с, backlog 2048)
+  asyncio + h11     — то же, но без uvloop/httptools (как без установленных extras)
+  python -m app     — точка входа из Dockerfile (без access-лога, keep-alive 75 с)
+Для каждой — --requests запросов с --concurrency соединениями на /health и публичный
+preview; keep-alive клиента включён, с --no-keepalive — новое соединение на запрос.
+
+Запуск: python benchmarks/load_server.py [--requests 5000] [--concurrency 64]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from typing import List
+
+import httpx
+from _util import ROOT
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start(cmd: List[str], port: int) -> subprocess.Popen:
+    env = dict(os.environ, PYTHONPATH=str(ROOT / "src"), PORT=str(port), LOG_LEVEL="warning")
+    proc = subprocess.Popen(
+        cmd, env=env, cwd=str(ROOT), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    for _ in range(100):
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=0.5).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    proc.kill()
+    raise SystemExit(f"server did not start: {' '.join(cmd)}")
+
+
+def _seed(base: str, questions: int) -> int:
+    creds = {"username": f"bench_{uuid.uuid4().hex[:8]}", "password": "secret123"}
+    httpx.post(f"{base}/api/v1/auth/register", json=creds).raise_for_status()
+    token = httpx.post(f"{base}/api/v1/auth/login", json=creds).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    quiz = httpx.post(f"{base}/api/v1/quizzes", json={"title": "load"}, headers=headers).json()
+    for i in range(questions):
+        body = {
+            "quiz_id": quiz["id"],
+            "text": f"question {i}",
+            "type": "single",
+            "choices": [{"text": f"choice {j}", "is_correct": j == 0} for j in range(4)],
+        }
+        httpx.post(f"{base}/api/v1/questions", json=body, headers=headers).raise_for_status()
+    return quiz["id"]
+
+
+async def _one(reader, writer, request: bytes) -> int:
+    writer.write(request)
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.partition(b":")
+        if name.lower() == b"content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def _load(port: int, path: str, total: int, concurrency: int, keepalive: bool) -> str:
+    # свой минимальный HTTP/1.1-клиент: httpx сам съедает больше CPU, чем сервер
+    conn = b"keep-alive" if keepalive else b"close"
+    request = (
+        b"GET " + path.encode() + b" HTTP/1.1\r\nHost: bench\r\n"
+        b"Accept-Encoding: gzip\r\nConnection: " + conn + b"\r\n\r\n"
+    )
+    latencies: List[float] = []
+    errors = 0
+    per_worker = [total // concurrency + (i < total % concurrency) for i in range(concurrency)]
+
+    async def worker(count: int) -> None:
+        nonlocal errors
+        streams = None
+        for _ in range(count):
+            t0 = time.perf_counter()
+            try:
+                if streams is None:
+                    streams = await asyncio.open_connection("127.0.0.1", port)
+                errors += await _one(*streams, request) != 200
+            except (OSError, asyncio.IncompleteReadError, IndexError, ValueError):
+                errors += 1
+                streams = None
+            latencies.append(time.perf_counter() - t0)
+            if not keepalive and streams is not None:
+                streams[1].close()
+                streams = None
+        if streams is not None:
+            streams[1].close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in per_worker))
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+    return f"{total / elapsed:8,.0f} req/s  p95={p95:7.1f}ms  errors={errors}"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=5000)
+    ap.add_argument("--concurrency", type=int, default=64)
+    ap.add_argument("--questions", type=int, default=50)
+    ap.add_argument("--no-keepalive", action="store_true")
+    args = ap.parse_args()
+
+    uvicorn = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "app.main:app",
+    ]  # log-level info: access-лог пишется
+    configs = {
+        "uvicorn default": lambda port: uvicorn + ["--port", str(port)],
+        "asyncio + h11  ": lambda port: uvicorn
+        + ["--port", str(port), "--loop", "asyncio", "--http", "h11"],
+        "python -m app  ": lambda port: [sys.executable, "-m", "app", "--host", "127.0.0.1"],
+    }
+    mode = "new connection per request" if args.no_keepalive else "keep-alive"
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {mode}")
+    for name, cmd in configs.items():
+        port = _free_port()
+        proc = _start(cmd(port), port)
+        base = f"http://127.0.0.1:{port}"
+        try:
+            quiz_id = _seed(base, args.questions)
+            for label, path in (
+                ("health ", "/health"),
+                ("preview", f"/api/v1/public/quizzes/{quiz_id}/preview"),
+            ):
+                line = asyncio.run(
+                    _load(port, path, args.requests, args.concurrency, not args.no_keepalive)
+                )
+                print(f"{name} {label}: {line}")
+        finally:
+            proc.terminate()
+            proc.wait(timeout=40)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import importlib.util
+import logging
+import os
+
+import uvicorn
+
+# === Точка входа сервера: python -m app ===
+# uvicorn с настройками для продакшена; всё задаётся переменными окружения (для контейнера)
+# или флагами. uvloop/httptools берутся, если установлены, иначе asyncio/h11.
+# Данные хранятся в памяти процесса: при WEB_CONCURRENCY > 1 у каждого воркера своё
+# хранилище (пользователь, зарегистрированный в одном, не виден в другом).
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8080"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))  # процессы-воркеры
+# дольше idle-таймаута балансировщика (обычно 60 с), иначе он ловит закрытые соединения
+KEEPALIVE_TIMEOUT = int(os.getenv("KEEPALIVE_TIMEOUT", "75"))  # секунды
+BACKLOG = int(os.getenv("BACKLOG", "2048"))  # очередь accept при всплеске соединений
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))  # секунды на дослушивание запросов
+ACCESS_LOG = os.getenv("ACCESS_LOG", "0") == "1"  # access-лог заметно режет пропускную способность
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info")
+FORWARDED_ALLOW_IPS = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+log = logging.getLogger("app")
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def server_config(args: argparse.Namespace) -> dict:
+    return {
+        "host": args.host,
+        "port": args.port,
+        "workers": args.workers,
+        "loop": "uvloop" if _available("uvloop") else "asyncio",
+        "http": "httptools" if _available("httptools") else "h11",
+        "backlog": args.backlog,
+        "timeout_keep_alive": args.keepalive,
+        # SIGTERM: перестаём принимать соединения, ждём начатые запросы до GRACEFUL_TIMEOUT
+        "timeout_graceful_shutdown": args.graceful_timeout,
+        "access_log": args.access_log,
+        "log_level": args.log_level,
+        "proxy_headers": True,
+        "forwarded_allow_ips": FORWARDED_ALLOW_IPS,
+        "server_header": False,
+    }
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(prog="python -m app", description="Quiz Builder API server")
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--workers", type=int, default=WEB_CONCURRENCY)
+    ap.add_argument("--backlog", type=int, default=BACKLOG)
+    ap.add_argument("--keepalive", type=int, default=KEEPALIVE_TIMEOUT)
+    ap.add_argument("--graceful-timeout", type=int, default=GRACEFUL_TIMEOUT)
+    ap.add_argument("--access-log", action="store_true", default=ACCESS_LOG)
+    ap.add_argument("--log-level", default=LOG_LEVEL)
+    args = ap.parse_args(argv)
+
+    config = server_config(args)
+    logging.basicConfig(level=args.log_level.upper())
+    if args.workers > 1:
+        log.warning("WEB_CONCURRENCY=%d: in-memory storage is per worker process", args.workers)
+    log.info("serving with loop=%s http=%s", config["loop"], config["http"])
+    # строка импорта, а не объект: нужна uvicorn для запуска нескольких воркеров
+    uvicorn.run("app.main:app", **config)
+
+
+if __name__ == "__main__":
+    main()
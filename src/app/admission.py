@@ -0,0 +1,176 @@
+import asyncio
+import math
+import os
+import re
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app import runtime
+
+# === Admission control ===
+# Тяжёлые классы запросов (login/register — PBKDF2, submit — проверка и запись результата)
+# ограничены по числу одновременных запросов и по времени ожидания в очереди. Если ожидаемое
+# ожидание (лаг event loop + очередь / limit * среднее время обработки) больше бюджета,
+# запрос сразу получает 503 + Retry-After, а не висит в очереди threadpool. Лимиты классов
+# в сумме меньше THREADPOOL_SIZE: остальные потоки всегда свободны для запросов владельца
+# (detail, правки) — у них приоритет, в очередь они не встают.
+
+ADMISSION_AUTH_LIMIT = int(os.getenv("ADMISSION_AUTH_LIMIT", str(os.cpu_count() or 1)))  # 0 — выкл.
+ADMISSION_AUTH_MAX_WAIT_MS = float(os.getenv("ADMISSION_AUTH_MAX_WAIT_MS", "250"))
+ADMISSION_SUBMIT_LIMIT = int(os.getenv("ADMISSION_SUBMIT_LIMIT", "16"))
+ADMISSION_SUBMIT_MAX_WAIT_MS = float(os.getenv("ADMISSION_SUBMIT_MAX_WAIT_MS", "500"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "256"))  # на класс
+EWMA_ALPHA = 0.2  # вес нового замера во времени обработки
+
+
+class Rejected(Exception):
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+
+class Limiter:
+    """Не больше limit запросов класса одновременно; очередь FIFO с бюджетом max_wait."""
+
+    __slots__ = (
+        "name",
+        "limit",
+        "max_wait",
+        "max_queue",
+        "active",
+        "waiters",
+        "service_time",
+        "admitted",
+        "rejected",
+    )
+
+    def __init__(
+        self, name: str, limit: int, max_wait: float, max_queue: int = ADMISSION_MAX_QUEUE
+    ) -> None:
+        self.name = name
+        self.limit = limit
+        self.max_wait = max_wait  # секунды
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.service_time = 0.0  # EWMA, секунды; 0 — пока нет замеров
+        self.admitted = 0
+        self.rejected = 0
+
+    def expected_wait(self) -> float:
+        if self.active < self.limit and not self.waiters:
+            return 0.0
+        return (len(self.waiters) // self.limit + 1) * self.service_time
+
+    async def acquire(self, backlog: float = 0.0) -> None:
+        # backlog — задержка, которую запрос уже накопил до нас (лаг event loop)
+        wait = backlog + self.expected_wait()
+        if wait <= self.max_wait and self.active < self.limit and not self.waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+        if wait > self.max_wait or len(self.waiters) >= self.max_queue:
+            self.rejected += 1
+            raise Rejected(wait)
+        fut = asyncio.get_running_loop().create_future()
+        self.waiters.append(fut)
+        try:
+            await asyncio.wait_for(fut, self.max_wait)
+        except asyncio.TimeoutError:
+            self._forget(fut)
+            self.rejected += 1
+            raise Rejected(self.expected_wait() or self.max_wait) from None
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()  # слот уже передали, а клиент ушёл
+            else:
+                self._forget(fut)
+            raise
+        self.admitted += 1
+
+    def release(self) -> None:
+        # слот переходит первому живому ожидающему, active не меняется
+        while self.waiters:
+            fut = self.waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self.active -= 1
+
+    def observe(self, seconds: float) -> None:
+        if self.service_time == 0.0:
+            self.service_time = seconds
+        else:
+            self.service_time += EWMA_ALPHA * (seconds - self.service_time)
+
+    def _forget(self, fut: asyncio.Future) -> None:
+        try:
+            self.waiters.remove(fut)
+        except ValueError:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": len(self.waiters),
+            "service_ms": round(self.service_time * 1000, 2),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+_CLASSES = (
+    ("auth", re.compile(r"^/api/v1/auth/(login|register)$")),
+    ("submit", re.compile(r"/submit$")),
+)
+
+limiters: Dict[str, Limiter] = {
+    "auth": Limiter("auth", ADMISSION_AUTH_LIMIT, ADMISSION_AUTH_MAX_WAIT_MS / 1000),
+    "submit": Limiter("submit", ADMISSION_SUBMIT_LIMIT, ADMISSION_SUBMIT_MAX_WAIT_MS / 1000),
+}
+
+
+def classify(method: str, path: str) -> Optional[Limiter]:
+    if method != "POST":
+        return None
+    for name, pattern in _CLASSES:
+        if pattern.search(path):
+            limiter = limiters[name]
+            return limiter if limiter.limit > 0 else None
+    return None
+
+
+def stats() -> dict:
+    return {name: limiter.stats() for name, limiter in limiters.items()}
+
+
+class AdmissionMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limiter = classify(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await limiter.acquire(runtime.loop_lag.last() or 0.0)
+        except Rejected as exc:
+            response = JSONResponse(
+                status_code=503,
+                content={"error": {"code": "overloaded", "message": "server is overloaded"}},
+                headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+            )
+            await response(scope, receive, send)
+            return
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.observe(time.perf_counter() - started)
+            limiter.release()
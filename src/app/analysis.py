@@ -0,0 +1,248 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app import memory
+from app.storage import QuizVersion, list_results_for_quiz, quiz_version, results_signature
+
+# === Анализ заданий квиза (item analysis) ===
+# Ответы результатов раскладываются в матрицу «попытки × варианты» (bool), из неё одним
+# векторным проходом считаются: трудность вопроса (доля верных), дискриминация
+# (точечно-бисериальная корреляция с суммой по остальным вопросам) и выбор дистракторов.
+# Считаются только single/multiple: для text в результате не сохраняется, был ли ответ верным.
+# Берутся результаты, оценённые по текущей версии квиза: ответы на прежние версии относятся
+# к другим вопросам/вариантам.
+# Матрица строится блоками по CHUNK_ROWS попыток, статистики — аддитивные суммы, поэтому
+# память ограничена одним блоком независимо от числа попыток.
+
+CHUNK_ROWS = 16_384
+ANALYSIS_CACHE_SIZE = 256
+
+
+class Layout:
+    """Столбцы матрицы: варианты квиза, сгруппированные по вопросам (версия квиза)."""
+
+    __slots__ = ("questions", "starts", "column", "correct", "choices", "members", "need")
+
+    def __init__(self, questions: List[Tuple[int, str, List[dict]]]) -> None:
+        self.questions = [(qid, qtype) for qid, qtype, _ in questions]
+        self.starts = np.zeros(len(questions), dtype=np.intp)  # первый столбец вопроса
+        self.column: Dict[int, Tuple[int, int]] = {}  # choice_id -> (столбец, question_id)
+        self.choices: List[dict] = []
+        owner: List[int] = []  # столбец -> индекс вопроса
+        col = 0
+        for i, (qid, _, choices) in enumerate(questions):
+            self.starts[i] = col
+            for c in choices:
+                self.column[c["id"]] = (col, qid)
+                self.choices.append(c)
+                owner.append(i)
+                col += 1
+        self.correct = np.fromiter((c["is_correct"] for c in self.choices), bool, col)
+        # P @ members за одно умножение даёт по каждому вопросу число выбранных вариантов
+        # (первые nq столбцов) и число выбранных правильных (следующие nq)
+        nq = len(questions)
+        self.members = np.zeros((col, 2 * nq), dtype=np.float32)
+        self.members[np.arange(col), owner] = 1
+        self.members[
+            self.correct.nonzero()[0], np.asarray(owner, dtype=np.intp)[self.correct] + nq
+        ] = 1
+        self.need = self.members[:, nq:].sum(axis=0)  # правильных вариантов в вопросе
+
+
+def build_layout(snapshot: QuizVersion) -> Layout:
+    questions = []
+    for qv in snapshot.questions:
+        q = qv.question
+        if q["type"] != "text" and qv.choices:
+            questions.append((q["id"], q["type"], list(qv.choices)))
+    return Layout(questions)
+
+
+def encode(layout: Layout, results: Iterable[dict]) -> np.ndarray:
+    """Блок результатов -> bool-матрица выбранных вариантов (как в grade: первый ответ)."""
+    rows: List[int] = []
+    cols: List[int] = []
+    column = layout.column
+    n = 0
+    for n, rec in enumerate(results, 1):
+        seen = set()
+        for a in rec["answers"]:
+            qid = a["question_id"]
+            if qid in seen:
+                continue
+            seen.add(qid)
+            picked = a.get("choice_ids") or ()
+            if a.get("choice_id") is not None:
+                picked = (a["choice_id"], *picked)
+            for cid in picked:
+                hit = column.get(cid)
+                if hit is not None and hit[1] == qid:  # вариант из чужого вопроса не считаем
+                    rows.append(n - 1)
+                    cols.append(hit[0])
+    matrix = np.zeros((n, len(layout.choices)), dtype=bool)
+    matrix[rows, cols] = True
+    return matrix
+
+
+class Sums:
+    """Аддитивные суммы по попыткам; из них в finish() получаются статистики."""
+
+    def __init__(self, layout: Layout) -> None:
+        nq, nc = len(layout.questions), len(layout.choices)
+        self.layout = layout
+        self.n = 0
+        self.total = 0.0  # Σ T, T — число верных ответов попытки
+        self.total_sq = 0.0  # Σ T²
+        self.correct = np.zeros(nq)  # Σ X_j
+        self.answered = np.zeros(nq)
+        self.total_x = np.zeros(nq)  # Σ T·X_j
+        self.picks = np.zeros(nc)  # Σ P_c
+        self.total_p = np.zeros(nc)  # Σ T·P_c
+
+    def copy(self) -> "Sums":
+        # кешированные суммы не меняем на месте: их может читать параллельный запрос
+        other = Sums.__new__(Sums)
+        other.__dict__ = {
+            k: v.copy() if isinstance(v, np.ndarray) else v for k, v in vars(self).items()
+        }
+        return other
+
+    def add(self, picks: np.ndarray) -> None:
+        layout = self.layout
+        if not len(picks) or not len(layout.questions):
+            self.n += len(picks)
+            return
+        # вопрос решён верно, если выбраны все правильные варианты и ничего лишнего;
+        # суммы по float32 точны: значения целые и меньше 2**24 в пределах блока
+        nq = len(layout.questions)
+        p = picks.astype(np.float32)
+        counts = p @ layout.members
+        chosen, hits = counts[:, :nq], counts[:, nq:]
+        x = ((chosen == layout.need) & (hits == layout.need)).astype(np.float64)
+        t = x.sum(axis=1)
+        self.n += len(picks)
+        self.total += t.sum()
+        self.total_sq += t @ t
+        self.correct += x.sum(axis=0)
+        self.answered += (chosen > 0).sum(axis=0)
+        self.total_x += t @ x
+        self.picks += p.sum(axis=0)
+        self.total_p += t.astype(np.float32) @ p
+
+    def finish(self) -> dict:
+        layout, n = self.layout, self.n
+        out = {"submissions": n, "questions": []}
+        if not n:
+            p = r = np.full(len(layout.questions), np.nan)
+        else:
+            # corr(X_j, T - X_j) через моменты: X_j² = X_j, поэтому хватает Σ T·X_j
+            p = self.correct / n
+            mean_t = self.total / n
+            var_t = self.total_sq / n - mean_t**2
+            cov_tx = self.total_x / n - mean_t * p
+            var_x = p * (1 - p)
+            cov_rest = cov_tx - var_x
+            var_rest = var_t + var_x - 2 * cov_tx
+            with np.errstate(divide="ignore", invalid="ignore"):
+                r = cov_rest / np.sqrt(var_x * var_rest)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_total = self.total_p / self.picks
+
+        bounds = list(layout.starts[1:]) + [len(layout.choices)]
+        for i, ((qid, qtype), start, end) in enumerate(
+            zip(layout.questions, layout.starts, bounds)
+        ):
+            choices = []
+            for c in range(start, end):
+                picked = int(self.picks[c])
+                choices.append(
+                    {
+                        "choice_id": layout.choices[c]["id"],
+                        "is_correct": bool(layout.correct[c]),
+                        "picked": picked,
+                        "rate": picked / n if n else 0.0,
+                        "mean_score": _num(mean_total[c]) if picked else None,
+                    }
+                )
+            out["questions"].append(
+                {
+                    "question_id": qid,
+                    "type": qtype,
+                    "answered": int(self.answered[i]),
+                    "difficulty": _num(p[i]),
+                    "discrimination": _num(r[i]),
+                    "choices": choices,
+                }
+            )
+        return out
+
+
+def _num(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 4)
+
+
+def analyze(layout: Layout, results: List[dict], sums: Optional[Sums] = None) -> Sums:
+    sums = sums or Sums(layout)
+    for i in range(0, len(results), CHUNK_ROWS):
+        sums.add(encode(layout, results[i : i + CHUNK_ROWS]))
+    return sums
+
+
+class _Entry:
+    __slots__ = ("version", "count", "last_id", "sums", "data")
+
+    def __init__(self, version: int, count: int, last_id: int, sums: Sums) -> None:
+        self.version, self.count, self.last_id = version, count, last_id
+        self.sums = sums
+        self.data = sums.finish()
+
+
+def _graded(rows: List[dict], version: int) -> List[dict]:
+    return [r for r in rows if r.get("quiz_version") == version]
+
+
+_CACHE: "OrderedDict[int, _Entry]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+memory.register("analysis.cache", lambda: _CACHE)
+
+
+def item_analysis(quiz_id: int) -> Optional[dict]:
+    """
+    Анализ по сохранённым результатам. Кеш живёт до нового результата; новые попытки
+    добавляются к накопленным суммам, с нуля пересчитываем после правки квиза (новая
+    версия) или компакции по ретенции (часть результатов исчезла).
+    """
+    snapshot = quiz_version(quiz_id)
+    if snapshot is None:
+        return None
+    version = snapshot.version
+    with _CACHE_LOCK:
+        entry = _CACHE.get(quiz_id)
+        if entry is not None:
+            _CACHE.move_to_end(quiz_id)
+    if entry is not None and entry.version == version:
+        if (entry.count, entry.last_id) == results_signature(quiz_id):
+            return entry.data
+
+    rows = list_results_for_quiz(quiz_id)  # новые сверху; порядок для сумм не важен
+    fresh = 0
+    if entry is not None and entry.version == version:
+        while fresh < len(rows) and rows[fresh]["id"] > entry.last_id:
+            fresh += 1
+        if len(rows) != entry.count + fresh:
+            entry = None  # компакция удалила старые результаты
+    else:
+        entry = None
+    if entry is not None:
+        sums = analyze(entry.sums.layout, _graded(rows[:fresh], version), entry.sums.copy())
+    else:
+        sums = analyze(build_layout(snapshot), _graded(rows, version))
+    entry = _Entry(version, len(rows), rows[0]["id"] if rows else 0, sums)
+    with _CACHE_LOCK:
+        _CACHE[quiz_id] = entry
+        while len(_CACHE) > ANALYSIS_CACHE_SIZE:
+            _CACHE.popitem(last=False)
+    return entry.data
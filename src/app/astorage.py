@@ -0,0 +1,48 @@
+from typing import Dict, List, Optional
+
+from app import storage
+
+# === Async-API чтения поверх storage ===
+# Хранилище in-memory: каждая операция — короткое вычисление без I/O, поэтому async-обработчики
+# вызывают её прямо в event loop, без перехода в threadpool. Когда storage станет внешним
+# (БД/кеш), меняется только этот модуль, а не обработчики.
+
+
+async def get_user_by_id(user_id: int) -> Optional[dict]:
+    return storage.get_user_by_id(user_id)
+
+
+async def get_quiz(quiz_id: int) -> Optional[dict]:
+    return storage.get_quiz(quiz_id)
+
+
+async def list_quizzes_by_owner(
+    owner_id: int, limit: int, offset: int = 0, after_id: Optional[int] = None
+) -> List[dict]:
+    return storage.list_quizzes_by_owner(owner_id, limit, offset, after_id=after_id)
+
+
+async def list_questions_by_quiz(quiz_id: int) -> List[dict]:
+    return storage.list_questions_by_quiz(quiz_id)
+
+
+async def quiz_version(quiz_id: int) -> Optional[storage.QuizVersion]:
+    return storage.quiz_version(quiz_id)
+
+
+async def list_choices_by_question(question_id: int) -> List[dict]:
+    return storage.list_choices_by_question(question_id)
+
+
+async def list_results_for_quiz(quiz_id: int, user_id: Optional[int] = None) -> List[dict]:
+    return storage.list_results_for_quiz(quiz_id, user_id=user_id)
+
+
+async def list_results_for_user(
+    user_id: int, limit: int, before_id: Optional[int] = None
+) -> List[dict]:
+    return storage.list_results_for_user(user_id, limit, before_id=before_id)
+
+
+async def get_quiz_titles(quiz_ids) -> Dict[int, str]:
+    return storage.get_quiz_titles(quiz_ids)
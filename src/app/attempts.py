@@ -0,0 +1,101 @@
+import os
+import random
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from app import memory
+
+# === Сессии прохождения квиза ===
+# Храним только seed + версию квиза, а не копию вопросов: вариант (выборка и порядок)
+# детерминированно восстанавливается из seed при выдаче и при проверке.
+
+ATTEMPT_TTL = int(os.getenv("ATTEMPT_TTL", "3600"))  # секунды
+ATTEMPT_MAX_SESSIONS = int(os.getenv("ATTEMPT_MAX_SESSIONS", "200000"))
+
+
+class Attempt:
+    __slots__ = ("quiz_id", "version", "seed", "count", "shuffle_choices", "expires_at")
+
+    def __init__(
+        self,
+        quiz_id: int,
+        version: int,
+        seed: int,
+        count: Optional[int],
+        shuffle_choices: bool,
+        expires_at: int,
+    ) -> None:
+        self.quiz_id = quiz_id
+        self.version = version
+        self.seed = seed
+        self.count = count
+        self.shuffle_choices = shuffle_choices
+        self.expires_at = expires_at
+
+
+# TTL одинаковый для всех сессий, поэтому порядок вставки совпадает с порядком истечения
+_SESSIONS: "OrderedDict[str, Attempt]" = OrderedDict()
+_LOCK = threading.Lock()
+memory.register("attempts.sessions", lambda: _SESSIONS)
+
+
+def _evict(now: int) -> None:
+    while _SESSIONS:
+        sid, attempt = next(iter(_SESSIONS.items()))
+        if attempt.expires_at > now and len(_SESSIONS) <= ATTEMPT_MAX_SESSIONS:
+            break
+        del _SESSIONS[sid]
+
+
+def start(
+    quiz_id: int, version: int, count: Optional[int], shuffle_choices: bool
+) -> Tuple[str, Attempt]:
+    now = int(time.time())
+    attempt = Attempt(
+        quiz_id=quiz_id,
+        version=version,
+        seed=secrets.randbits(32),
+        count=count,
+        shuffle_choices=shuffle_choices,
+        expires_at=now + ATTEMPT_TTL,
+    )
+    sid = secrets.token_urlsafe(16)
+    with _LOCK:
+        _SESSIONS[sid] = attempt
+        _evict(now)
+    return sid, attempt
+
+
+def get(session_id: str) -> Optional[Attempt]:
+    with _LOCK:
+        _evict(int(time.time()))
+        return _SESSIONS.get(session_id)
+
+
+def finish(session_id: str) -> Optional[Attempt]:
+    # сессия одноразовая: submit забирает её из хранилища
+    with _LOCK:
+        _evict(int(time.time()))
+        return _SESSIONS.pop(session_id, None)
+
+
+def active_count() -> int:
+    return len(_SESSIONS)
+
+
+# --- Вариант ---
+def pick_questions(attempt: Attempt, question_ids: List[int]) -> List[int]:
+    ids = list(question_ids)
+    random.Random(attempt.seed).shuffle(ids)
+    return ids[: attempt.count] if attempt.count else ids
+
+
+def order_choices(attempt: Attempt, question_id: int, choices: list) -> list:
+    if not attempt.shuffle_choices:
+        return choices
+    out = list(choices)
+    random.Random(attempt.seed ^ (question_id * 2654435761)).shuffle(out)
+    return out
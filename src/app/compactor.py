@@ -0,0 +1,49 @@
+import os
+import threading
+import time
+from typing import Optional
+
+from app.storage import compact_results
+
+# === Фоновая компакция результатов (ретенция -> дневные агрегаты) ===
+RESULTS_COMPACT_INTERVAL = float(os.getenv("RESULTS_COMPACT_INTERVAL", "5"))  # секунды
+RESULTS_COMPACT_BATCH = int(os.getenv("RESULTS_COMPACT_BATCH", "500"))
+
+
+class ResultCompactor:
+    def __init__(
+        self, interval: float = RESULTS_COMPACT_INTERVAL, batch: int = RESULTS_COMPACT_BATCH
+    ) -> None:
+        self.interval = interval
+        self.batch = batch
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="result-compactor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def run_once(self) -> int:
+        total = 0
+        while not self._stop.is_set():
+            n = compact_results(self.batch)
+            total += n
+            if n < self.batch:
+                break
+            time.sleep(0)  # между порциями отдаём GIL обработчикам запросов
+        return total
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+
+compactor = ResultCompactor()
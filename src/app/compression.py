@@ -0,0 +1,164 @@
+import gzip
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app import memory
+
+# === Сжатие ответов ===
+# gzip для JSON/текста от COMPRESS_MIN_SIZE байт (меньше — заголовки дороже выигрыша).
+# Потоковые ответы сжимаются по кускам с Z_SYNC_FLUSH: клиент получает каждый кусок сразу,
+# text/event-stream не трогаем вовсе. Ответ с уже выставленным Content-Encoding (готовый
+# gzip из кеша ниже) проходит как есть.
+
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))  # байты
+COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", "6"))  # 1..9, см. benchmarks/bench_compression.py
+COMPRESS_CACHE_BYTES = int(os.getenv("COMPRESS_CACHE_BYTES", str(32 * 1024 * 1024)))
+CACHED_LEVEL = 9  # кешированное тело сжимается один раз — можно сжимать сильнее
+
+_COMPRESSIBLE = ("application/json", "application/javascript", "image/svg+xml", "text/")
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    # "gzip;q=0" — явный отказ; "*" подходит, если gzip не указан отдельно
+    star = False
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        name = name.strip()
+        if name == "gzip":
+            return q > 0
+        if name == "*":
+            star = q > 0
+    return star
+
+
+def _compressible(content_type: str) -> bool:
+    return content_type.startswith(_COMPRESSIBLE) or "+json" in content_type
+
+
+class CompressionMiddleware:
+    def __init__(
+        self, app: ASGIApp, minimum_size: int = COMPRESS_MIN_SIZE, level: int = COMPRESS_LEVEL
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not accepts_gzip(
+            Headers(scope=scope).get("accept-encoding", "")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        compressor = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                start = message  # заголовки отправим, когда увидим первый кусок тела
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more = message.get("more_body", False)
+            if start is not None:
+                headers = MutableHeaders(raw=start["headers"])
+                content_type = headers.get("content-type", "")
+                if "content-encoding" not in headers and _compressible(content_type):
+                    headers.add_vary_header("Accept-Encoding")
+                    if (more or len(body) >= self.minimum_size) and not content_type.startswith(
+                        "text/event-stream"
+                    ):
+                        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)  # gzip
+                        headers["Content-Encoding"] = "gzip"
+                        del headers["Content-Length"]
+                        body = _chunk(compressor, body, more)
+                        if not more:
+                            headers["Content-Length"] = str(len(body))
+                        message = {**message, "body": body}
+                await send(start)
+                start = None
+            elif compressor is not None:
+                message = {**message, "body": _chunk(compressor, body, more)}
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+
+def _chunk(compressor, body: bytes, more: bool) -> bytes:
+    return compressor.compress(body) + compressor.flush(
+        zlib.Z_SYNC_FLUSH if more else zlib.Z_FINISH
+    )
+
+
+# --- Кеш готовых тел ---
+# Для ответов, которые однозначно задаются ключом (например, публичный preview для версии
+# квиза), JSON и его gzip считаются один раз и отдаются из кеша. LRU, ограничен суммой байт.
+
+
+class Payload:
+    __slots__ = ("raw", "gz")
+
+    def __init__(self, raw: bytes) -> None:
+        self.raw = raw
+        self.gz = (
+            gzip.compress(raw, CACHED_LEVEL, mtime=0) if len(raw) >= COMPRESS_MIN_SIZE else None
+        )
+
+    @property
+    def size(self) -> int:
+        return len(self.raw) + len(self.gz or b"")
+
+
+_PAYLOADS: "OrderedDict[Hashable, Payload]" = OrderedDict()
+_PAYLOADS_LOCK = threading.Lock()
+memory.register("compression.payloads", lambda: _PAYLOADS)
+_payload_bytes = 0
+
+
+def cached_payload(key: Hashable, build: Callable[[], bytes]) -> Payload:
+    global _payload_bytes
+    with _PAYLOADS_LOCK:
+        payload = _PAYLOADS.get(key)
+        if payload is not None:
+            _PAYLOADS.move_to_end(key)
+            return payload
+    payload = Payload(build())
+    with _PAYLOADS_LOCK:
+        if key not in _PAYLOADS:
+            _PAYLOADS[key] = payload
+            _payload_bytes += payload.size
+            while _payload_bytes > COMPRESS_CACHE_BYTES and len(_PAYLOADS) > 1:
+                _payload_bytes -= _PAYLOADS.popitem(last=False)[1].size
+    return payload
+
+
+def payload_response(request: Request, payload: Payload) -> Response:
+    headers = {"Vary": "Accept-Encoding"}
+    if payload.gz is not None and accepts_gzip(request.headers.get("accept-encoding", "")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(payload.gz, media_type="application/json", headers=headers)
+    return Response(payload.raw, media_type="application/json", headers=headers)
+
+
+def cache_stats() -> dict:
+    with _PAYLOADS_LOCK:
+        return {"entries": len(_PAYLOADS), "bytes": _payload_bytes}
@@ -1,23 +1,24 @@
 from fastapi import Depends, HTTPException, Request
 
+from app.astorage import get_user_by_id
 from app.security import verify_token
-from app.storage import get_user_by_id
 
 
-def get_current_user(request: Request) -> dict:
+# async: проверка HMAC дешёвая, отдельный переход в threadpool ради неё не нужен
+async def get_current_user(request: Request) -> dict:
     auth = request.headers.get("Authorization", "")
     if not auth.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="missing or invalid auth")
     payload = verify_token(auth.split(" ", 1)[1])
     if not payload:
         raise HTTPException(status_code=401, detail="invalid token")
-    user = get_user_by_id(int(payload["sub"]))
+    user = await get_user_by_id(int(payload["sub"]))
     if not user:
         raise HTTPException(status_code=401, detail="user not found")
     return user
 
 
-def require_admin(user: dict = Depends(get_current_user)) -> dict:
+async def require_admin(user: dict = Depends(get_current_user)) -> dict:
     if user.get("role") != "admin":
         raise HTTPException(status_code=403, detail="admin only")
     return user
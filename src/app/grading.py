@@ -0,0 +1,204 @@
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app import memory
+from app.storage import QUIZZES, QuestionVersion, QuizVersion, quiz_version
+
+# === Ключ ответов квиза ===
+# Собирается по неизменяемому снимку версии квиза и кешируется: правильные id вариантов
+# для single/multiple и скомпилированные матчеры для text-вопросов с accepted-ответами.
+# Записи вопросов, не менявшихся между версиями, общие (снимок вопроса тот же).
+
+ANSWER_KEY_CACHE_SIZE = 1024
+MAX_TEXT_ANSWER = 1000  # длиннее не сравниваем: ограничивает стоимость regex/fuzzy
+
+
+_PUNCT_RE = re.compile(r"[^\w\s]|_")
+
+
+def normalize(text: str) -> str:
+    # регистр, пунктуация/символы и лишние пробелы не важны
+    return " ".join(_PUNCT_RE.sub("", text.casefold()).split())
+
+
+def within_distance(a: str, b: str, limit: int) -> bool:
+    # Левенштейн с отсечкой: считаем только полосу шириной 2*limit+1 вокруг диагонали
+    # и выходим, как только вся строка полосы превысила limit
+    if abs(len(a) - len(b)) > limit:
+        return False
+    if a == b:
+        return True
+    if len(a) > len(b):
+        a, b = b, a
+    big = limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [big] * (len(b) + 1)
+        cur[0] = i
+        lo, hi = max(1, i - limit), min(len(b), i + limit)
+        row_min = cur[lo - 1]
+        for j in range(lo, hi + 1):
+            v = prev[j - 1] + (ca != b[j - 1])
+            x = prev[j] + 1
+            if x < v:
+                v = x
+            x = cur[j - 1] + 1
+            if x < v:
+                v = x
+            cur[j] = v
+            if v < row_min:
+                row_min = v
+        if row_min > limit:
+            return False
+        prev = cur
+    return prev[len(b)] <= limit
+
+
+_BACKREF_RE = re.compile(r"\\[1-9]|\(\?P=")
+
+
+class TextMatcher:
+    __slots__ = ("exact", "normalized", "regexes", "fuzzy")
+
+    def __init__(self, accepted: Iterable[dict]) -> None:
+        exact, normalized, patterns, fuzzy = set(), set(), [], []
+        for a in accepted:
+            mode, value = a["mode"], a["value"]
+            if mode == "exact":
+                exact.add(value)
+            elif mode == "normalized":
+                normalized.add(normalize(value))
+            elif mode == "regex":
+                patterns.append(value)
+            elif mode == "fuzzy":
+                fuzzy.append((normalize(value), a.get("max_distance", 1)))
+        self.exact = frozenset(exact)
+        self.normalized = frozenset(normalized)
+        self.regexes = _compile_patterns(patterns)
+        self.fuzzy = tuple(fuzzy)
+
+    def match(self, text: str) -> bool:
+        if len(text) > MAX_TEXT_ANSWER:
+            return False
+        if text in self.exact:
+            return True
+        norm = normalize(text)
+        if norm in self.normalized:
+            return True
+        if any(rx.fullmatch(text) for rx in self.regexes):
+            return True
+        return any(within_distance(norm, value, limit) for value, limit in self.fuzzy)
+
+
+def _compile_patterns(patterns: List[str]) -> Tuple[re.Pattern, ...]:
+    # одна общая альтернатива вместо N проходов; шаблоны с обратными ссылками
+    # (нумерация групп в объединении сдвигается) и несовместимые флаги — отдельно
+    if not patterns:
+        return ()
+    unionable = [p for p in patterns if not _BACKREF_RE.search(p)]
+    separate = [re.compile(p) for p in patterns if _BACKREF_RE.search(p)]
+    if unionable:
+        try:
+            separate.insert(0, re.compile("|".join(f"(?:{p})" for p in unionable)))
+        except re.error:
+            separate[:0] = [re.compile(p) for p in unionable]
+    return tuple(separate)
+
+
+class AnswerKey:
+    __slots__ = ("version", "questions", "gradable")
+
+    def __init__(self, version: int, questions: Dict[int, Tuple[str, object]]) -> None:
+        self.version = version
+        self.questions = questions  # question_id -> (type, эталон)
+        self.gradable = frozenset(questions)
+
+    def max_score(self, only_ids: Optional[set] = None) -> int:
+        if only_ids is None:
+            return len(self.gradable)
+        return len(self.gradable & only_ids)
+
+
+def _entry(qv: QuestionVersion) -> Optional[Tuple[str, object]]:
+    q = qv.question
+    qtype = q["type"]
+    if qtype == "text":
+        # text без accepted-ответов не автооцениваем
+        return (qtype, TextMatcher(q["accepted"])) if q.get("accepted") else None
+    return (qtype, frozenset(c["id"] for c in qv.choices if c["is_correct"]))
+
+
+_ENTRIES: "weakref.WeakKeyDictionary[QuestionVersion, Optional[tuple]]" = (
+    weakref.WeakKeyDictionary()
+)
+_MISSING = object()
+
+
+def build_answer_key(snapshot: QuizVersion, reuse: bool = True) -> AnswerKey:
+    questions: Dict[int, Tuple[str, object]] = {}
+    for qv in snapshot.questions:
+        with _KEYS_LOCK:
+            entry = _ENTRIES.get(qv, _MISSING) if reuse else _MISSING
+        if entry is _MISSING:
+            entry = _entry(qv)
+            with _KEYS_LOCK:
+                _ENTRIES[qv] = entry
+        if entry is not None:  # None — вопрос без автооценки
+            questions[qv.question["id"]] = entry
+    return AnswerKey(snapshot.version, questions)
+
+
+_KEYS: "OrderedDict[Tuple[int, int], AnswerKey]" = OrderedDict()
+_KEYS_LOCK = threading.Lock()
+memory.register("grading.answer_keys", lambda: _KEYS)
+
+
+def answer_key(quiz_id: int, version: Optional[int] = None) -> Optional[AnswerKey]:
+    """Ключ для версии квиза (по умолчанию текущей); None — нет квиза или такой версии."""
+    snapshot = quiz_version(quiz_id, version)
+    if snapshot is None:
+        return None
+    cache_key = (quiz_id, snapshot.version)
+    with _KEYS_LOCK:
+        key = _KEYS.get(cache_key)
+        if key is not None:
+            _KEYS.move_to_end(cache_key)
+            return key
+    key = build_answer_key(snapshot)  # вне блокировки: сборка может быть долгой
+    with _KEYS_LOCK:
+        _KEYS[cache_key] = key
+        while len(_KEYS) > ANSWER_KEY_CACHE_SIZE:
+            _KEYS.popitem(last=False)
+    return key
+
+
+def warm_up(limit: int = ANSWER_KEY_CACHE_SIZE) -> int:
+    """Собирает ключи текущих версий последних limit квизов; возвращает их число."""
+    quiz_ids = [q["id"] for q in QUIZZES[-limit:]]
+    for quiz_id in quiz_ids:
+        answer_key(quiz_id)
+    return len(quiz_ids)
+
+
+def grade(key: AnswerKey, answers: Iterable, only_ids: Optional[set] = None) -> Tuple[int, int]:
+    score = 0
+    seen = set()
+    for ans in answers:
+        qid = ans.question_id
+        entry = key.questions.get(qid)
+        if entry is None or qid in seen or (only_ids is not None and qid not in only_ids):
+            continue
+        seen.add(qid)
+        qtype, expected = entry
+        if qtype == "single":
+            if ans.choice_id in expected:
+                score += 1
+        elif qtype == "multiple":
+            if ans.choice_ids and frozenset(ans.choice_ids) == expected:
+                score += 1
+        elif ans.text is not None and expected.match(ans.text):
+            score += 1
+    return score, key.max_score(only_ids)
@@ -0,0 +1,109 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple, TypeVar
+
+from app import memory
+
+# === Idempotency-Key для submit ===
+# Повтор запроса с тем же ключом получает сохранённый ответ, а не новую проверку и новый
+# результат. Одновременные дубли ждут первый запрос (он единственный выполняет fn).
+# Кеш ограничен по времени (IDEMPOTENCY_TTL) и по размеру (LRU, IDEMPOTENCY_MAX_KEYS).
+
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", "86400"))  # секунды
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "100000"))
+MAX_KEY_LENGTH = 255
+WAIT_TIMEOUT = 30.0  # сколько дубль ждёт первый запрос, секунды
+
+T = TypeVar("T")
+
+
+class KeyReused(Exception):
+    """Тот же ключ пришёл с другим телом запроса."""
+
+
+class InProgress(Exception):
+    """Первый запрос с этим ключом не завершился за WAIT_TIMEOUT."""
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "expires_at", "done", "ok", "result")
+
+    def __init__(self, fingerprint: bytes, expires_at: float) -> None:
+        self.fingerprint = fingerprint
+        self.expires_at = expires_at
+        # Event нужен только пока запрос выполняется: потом его отпускаем ради памяти
+        self.done: Optional[threading.Event] = threading.Event()
+        self.ok = False
+        self.result = None
+
+
+_ENTRIES: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+_LOCK = threading.Lock()
+memory.register("idempotency.keys", lambda: _ENTRIES)
+
+
+def fingerprint(body: bytes) -> bytes:
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+def valid_key(key: str) -> bool:
+    return 0 < len(key) <= MAX_KEY_LENGTH and key.isascii() and key.isprintable()
+
+
+def _evict(now: float) -> None:
+    # спереди — давно не использованные; истёкшие глубже удаляются при обращении
+    while _ENTRIES:
+        entry = next(iter(_ENTRIES.values()))
+        if entry.expires_at > now and len(_ENTRIES) <= IDEMPOTENCY_MAX_KEYS:
+            break
+        _ENTRIES.popitem(last=False)
+
+
+def run(scope: str, key: str, body_fingerprint: bytes, fn: Callable[[], T]) -> Tuple[T, bool]:
+    """Выполняет fn один раз на (scope, key); возвращает (результат, был ли это повтор)."""
+    cache_key = (scope, key)
+    while True:
+        now = time.monotonic()
+        with _LOCK:
+            entry = _ENTRIES.get(cache_key)
+            if entry is not None and entry.expires_at <= now:
+                del _ENTRIES[cache_key]
+                entry = None
+            if entry is None:
+                entry = _ENTRIES[cache_key] = _Entry(body_fingerprint, now + IDEMPOTENCY_TTL)
+                _evict(now)
+                owner = True
+            else:
+                if entry.fingerprint != body_fingerprint:
+                    raise KeyReused(key)
+                _ENTRIES.move_to_end(cache_key)
+                owner = False
+            done = entry.done
+
+        if owner:
+            try:
+                entry.result = fn()
+                entry.ok = True
+            except BaseException:
+                # ошибку не запоминаем: повтор с тем же ключом выполнится заново
+                with _LOCK:
+                    if _ENTRIES.get(cache_key) is entry:
+                        del _ENTRIES[cache_key]
+                raise
+            finally:
+                entry.done = None
+                done.set()
+            return entry.result, False
+
+        if done is not None and not done.wait(WAIT_TIMEOUT):
+            raise InProgress(key)
+        if entry.ok:
+            return entry.result, True
+        # первый запрос упал — пробуем выполнить сами
+
+
+def size() -> int:
+    return len(_ENTRIES)
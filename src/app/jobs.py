@@ -0,0 +1,246 @@
+import heapq
+import itertools
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Tuple
+
+from app import memory
+
+# === Фоновые задачи владельцев ===
+# Тяжёлые операции (удаление большого квиза, экспорт результатов, пересчёт анализа) не держат
+# поток обработчика: эндпоинт ставит задачу в очередь и отвечает 202 с id, клиент опрашивает
+# GET /api/v1/jobs/{id}. JOB_WORKERS потоков берут задачи по приоритету (меньше — раньше),
+# при равном — в порядке постановки. Работа делится на порции: между ними задача вызывает
+# job.step() — отмечает прогресс, проверяет отмену и отдаёт GIL обработчикам запросов.
+# Задача в очереди отменяется сразу, выполняющаяся — на ближайшем step(). Задачу, которую
+# нельзя бросить на середине (удаление квиза), ставят с cancellable=False.
+
+# под GIL второй поток не ускоряет задачи на чистом Python, а отнимает CPU у обработчиков
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "1000"))  # больше — 503 на постановку
+JOB_TTL = int(os.getenv("JOB_TTL", "3600"))  # секунды хранения завершённой задачи и результата
+JOB_MAX_FINISHED = int(os.getenv("JOB_MAX_FINISHED", "1000"))
+JOB_CHUNK = int(os.getenv("JOB_CHUNK", "500"))  # строк (вопросов, результатов) на порцию
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = (
+    "queued",
+    "running",
+    "succeeded",
+    "failed",
+    "cancelled",
+)
+
+log = logging.getLogger("app.jobs")
+
+
+class Cancelled(Exception):
+    pass
+
+
+class Failed(Exception):
+    """Ожидаемая ошибка задачи: сообщение уходит клиенту в поле error."""
+
+
+class QueueFull(Exception):
+    pass
+
+
+def respond_async(prefer: Optional[str]) -> bool:
+    # RFC 7240: "Prefer: respond-async" — клиент согласен на 202 вместо ожидания
+    return prefer is not None and "respond-async" in prefer.lower()
+
+
+class Job:
+    __slots__ = (
+        "id",
+        "kind",
+        "owner_id",
+        "priority",
+        "fn",
+        "status",
+        "done",
+        "total",
+        "result",
+        "media_type",
+        "error",
+        "created_at",
+        "started_at",
+        "finished_at",
+        "cancel_requested",
+        "cancellable",
+    )
+
+    def __init__(
+        self,
+        kind: str,
+        owner_id: int,
+        fn: Callable[["Job"], Any],
+        priority: int,
+        cancellable: bool = True,
+    ) -> None:
+        self.id = secrets.token_urlsafe(12)
+        self.kind = kind
+        self.owner_id = owner_id
+        self.priority = priority
+        self.fn: Optional[Callable[["Job"], Any]] = fn
+        self.status = QUEUED
+        self.done = 0
+        self.total: Optional[int] = None
+        self.result: Any = None  # dict (JSON) или bytes с media_type
+        self.media_type = "application/json"
+        self.error: Optional[str] = None
+        self.created_at = int(time.time())
+        self.started_at: Optional[int] = None
+        self.finished_at: Optional[int] = None
+        self.cancel_requested = False
+        self.cancellable = cancellable
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED, CANCELLED)
+
+    def step(self, done: Optional[int] = None, total: Optional[int] = None) -> None:
+        # вызывается задачей между порциями работы
+        if done is not None:
+            self.done = done
+        if total is not None:
+            self.total = total
+        if self.cancel_requested and self.cancellable:
+            raise Cancelled()
+        time.sleep(0)
+
+
+class JobRunner:
+    def __init__(self, workers: int = JOB_WORKERS) -> None:
+        self.workers = workers
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: List[Tuple[int, int, Job]] = []  # куча (priority, seq, job)
+        self._seq = itertools.count()
+        self._queued = 0
+        self._running = 0
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+
+    def submit(
+        self,
+        kind: str,
+        owner_id: int,
+        fn: Callable[[Job], Any],
+        priority: int = 5,
+        cancellable: bool = True,
+    ) -> Job:
+        with self._cond:
+            self._evict(int(time.time()))
+            if self._queued >= JOB_MAX_QUEUED:
+                raise QueueFull()
+            job = Job(kind, owner_id, fn, priority, cancellable)
+            self._jobs[job.id] = job
+            heapq.heappush(self._queue, (priority, next(self._seq), job))
+            self._queued += 1
+            self._start_workers()
+            self._cond.notify()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job: Job) -> Job:
+        with self._cond:
+            if not job.cancellable:
+                return job
+            if job.status == QUEUED:
+                self._finish(job, CANCELLED)  # из кучи уберёт воркер, когда дойдёт
+                self._queued -= 1
+            elif job.status == RUNNING:
+                job.cancel_requested = True
+        return job
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "workers": self.workers,
+                "queued": self._queued,
+                "running": self._running,
+                "tracked": len(self._jobs),
+            }
+
+    def stop(self, timeout: float = 5.0) -> None:
+        # при остановке сервера: очередь отменяется (и неотменяемые задачи — данные in-memory
+        # всё равно уходят вместе с процессом), выполняющимся — запрос отмены
+        with self._cond:
+            self._stopping = True
+            for job in self._jobs.values():
+                if job.status == QUEUED:
+                    self._finish(job, CANCELLED)
+                elif job.status == RUNNING:
+                    job.cancel_requested = True
+            self._queue.clear()
+            self._queued = 0
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout)
+        with self._cond:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            self._stopping = False
+
+    def _start_workers(self) -> None:
+        # лениво, при первой задаче: без lifespan (TestClient, скрипты) очередь тоже работает
+        self._threads = [t for t in self._threads if t.is_alive()]
+        while len(self._threads) < self.workers:
+            t = threading.Thread(target=self._work, name=f"job-{len(self._threads)}", daemon=True)
+            self._threads.append(t)
+            t.start()
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                _, _, job = heapq.heappop(self._queue)
+                if job.status != QUEUED:
+                    continue  # отменена, пока ждала
+                job.status = RUNNING
+                job.started_at = int(time.time())
+                self._queued -= 1
+                self._running += 1
+            status = SUCCEEDED
+            try:
+                job.result = job.fn(job)
+            except Cancelled:
+                status = CANCELLED
+            except Failed as exc:
+                status, job.error = FAILED, str(exc)
+            except Exception:
+                log.exception("job %s (%s) failed", job.id, job.kind)
+                status, job.error = FAILED, "internal error"
+            with self._cond:
+                self._running -= 1
+                self._finish(job, status)
+
+    def _finish(self, job: Job, status: str) -> None:
+        job.status = status
+        job.finished_at = int(time.time())
+        job.fn = None  # замыкание держит аргументы задачи — отпускаем
+
+    def _evict(self, now: int) -> None:
+        # задачи в порядке постановки: с головы уходят завершённые — истёкшие или сверх лимита
+        finished = sum(1 for j in self._jobs.values() if j.finished)
+        while self._jobs:
+            job = next(iter(self._jobs.values()))
+            if not job.finished:
+                break
+            if job.finished_at > now - JOB_TTL and finished <= JOB_MAX_FINISHED:
+                break
+            self._jobs.popitem(last=False)
+            finished -= 1
+
+
+runner = JobRunner()
+memory.register("jobs.jobs", lambda: runner._jobs)
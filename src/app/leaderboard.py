@@ -0,0 +1,63 @@
+import os
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+from app import memory
+
+# === Лидерборд квиза ===
+# Держим только top-K (K = LEADERBOARD_SIZE) в отсортированном списке и лучший ключ каждого
+# пользователя: save_result обновляет доску за O(log K + K) = O(1) по числу сабмитов,
+# чтение top-N — срез O(N). Попытка пользователя лучше прежней только при большем score
+# или при том же score, но раньше; анонимные попытки — отдельные записи.
+
+LEADERBOARD_SIZE = int(os.getenv("LEADERBOARD_SIZE", "100"))
+
+# (-score, created_at, result_id, user_id, max_score): сортировка = score desc, время asc
+Entry = Tuple[int, int, int, Optional[int], int]
+
+
+class _Board:
+    __slots__ = ("top", "best")
+
+    def __init__(self) -> None:
+        self.top: List[Entry] = []
+        self.best: Dict[int, Entry] = {}  # user_id -> лучшая попытка
+
+
+_BOARDS: Dict[int, _Board] = {}
+_LOCK = threading.Lock()
+memory.register("leaderboard.boards", lambda: _BOARDS)
+
+
+def record(rec: dict) -> None:
+    entry: Entry = (-rec["score"], rec["created_at"], rec["id"], rec["user_id"], rec["max_score"])
+    uid = rec["user_id"]
+    with _LOCK:
+        board = _BOARDS.get(rec["quiz_id"])
+        if board is None:
+            board = _BOARDS[rec["quiz_id"]] = _Board()
+        top = board.top
+        if uid is not None:
+            old = board.best.get(uid)
+            if old is not None and old <= entry:
+                return
+            board.best[uid] = entry
+            if old is not None:
+                i = bisect_left(top, old)
+                if i < len(top) and top[i] == old:
+                    del top[i]
+        if len(top) < LEADERBOARD_SIZE or entry < top[-1]:
+            insort(top, entry)
+            if len(top) > LEADERBOARD_SIZE:
+                top.pop()
+
+
+def top(quiz_id: int, limit: int) -> List[Entry]:
+    board = _BOARDS.get(quiz_id)
+    return board.top[:limit] if board else []
+
+
+def drop(quiz_id: int) -> None:
+    with _LOCK:
+        _BOARDS.pop(quiz_id, None)
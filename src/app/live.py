@@ -0,0 +1,149 @@
+import asyncio
+import json
+import os
+import threading
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Dict, Optional, Tuple
+
+from app import memory
+from app.schemas.quiz import ResultRead
+
+# === Живые результаты квиза (Server-Sent Events) ===
+# save_result публикует запись; подписчики — SSE-потоки владельца в event loop. Кадр
+# кодируется один раз на событие и раздаётся всем подписчикам квиза через
+# call_soon_threadsafe (submit идёт в threadpool). У каждого подписчика своя очередь на
+# LIVE_QUEUE_SIZE результатов: медленный клиент теряет самые старые (и получает событие
+# dropped — перечитать /results), а агрегаты (stats) схлопываются до последнего значения.
+# Без подписчиков publish — только поиск по словарю.
+
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", "64"))
+LIVE_HEARTBEAT = float(os.getenv("LIVE_HEARTBEAT", "15"))  # секунды тишины до ": ping"
+
+# seed квиза при первой подписке: (число результатов, сумма score, лучший score, последний id)
+Seed = Tuple[int, int, Optional[int], int]
+
+
+def _frame(event: str, data: str, event_id: Optional[int] = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {data}\n\n".encode()
+
+
+class Subscriber:
+    __slots__ = ("loop", "results", "stats", "dropped", "wakeup")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, stats: bytes) -> None:
+        self.loop = loop
+        self.results: Deque[bytes] = deque()
+        self.stats: Optional[bytes] = stats
+        self.dropped = 0
+        self.wakeup = asyncio.Event()
+        self.wakeup.set()  # первым кадром уйдут текущие агрегаты
+
+    def push(self, frame: bytes, stats: bytes) -> None:
+        # вызывается в event loop подписчика
+        if len(self.results) >= LIVE_QUEUE_SIZE:
+            self.results.popleft()
+            self.dropped += 1
+        self.results.append(frame)
+        self.stats = stats
+        self.wakeup.set()
+
+    def drain(self) -> bytes:
+        parts = list(self.results)
+        self.results.clear()
+        if self.dropped:
+            parts.append(_frame("dropped", json.dumps({"count": self.dropped})))
+            self.dropped = 0
+        if self.stats is not None:
+            parts.append(self.stats)
+            self.stats = None
+        self.wakeup.clear()
+        return b"".join(parts)
+
+
+class _Topic:
+    __slots__ = ("subscribers", "count", "score_sum", "best", "seed_last_id")
+
+    def __init__(self, seed: Seed) -> None:
+        self.subscribers: Tuple[Subscriber, ...] = ()  # заменяется целиком: publish без копий
+        self.count, self.score_sum, self.best, self.seed_last_id = seed
+
+    def stats_frame(self) -> bytes:
+        mean = round(self.score_sum / self.count, 3) if self.count else None
+        data = {"count": self.count, "mean_score": mean, "best_score": self.best}
+        return _frame("stats", json.dumps(data))
+
+
+_TOPICS: Dict[int, _Topic] = {}
+_LOCK = threading.Lock()
+memory.register("live.topics", lambda: _TOPICS)
+
+
+def subscribe(quiz_id: int, seed: Callable[[], Seed]) -> Subscriber:
+    loop = asyncio.get_running_loop()
+    with _LOCK:
+        topic = _TOPICS.get(quiz_id)
+        if topic is None:
+            # под той же блокировкой, что и publish: результат либо попал в seed, либо придёт
+            topic = _TOPICS[quiz_id] = _Topic(seed())
+        sub = Subscriber(loop, topic.stats_frame())
+        topic.subscribers += (sub,)
+    return sub
+
+
+def unsubscribe(quiz_id: int, sub: Subscriber) -> None:
+    with _LOCK:
+        topic = _TOPICS.get(quiz_id)
+        if topic is None:
+            return
+        topic.subscribers = tuple(s for s in topic.subscribers if s is not sub)
+        if not topic.subscribers:
+            del _TOPICS[quiz_id]
+
+
+def publish(rec: dict) -> None:
+    with _LOCK:
+        topic = _TOPICS.get(rec["quiz_id"])
+        if topic is None or rec["id"] <= topic.seed_last_id:
+            return
+        topic.count += 1
+        topic.score_sum += rec["score"]
+        if topic.best is None or rec["score"] > topic.best:
+            topic.best = rec["score"]
+        stats = topic.stats_frame()
+        subscribers = topic.subscribers
+    frame = _frame("result", ResultRead.model_validate(rec).model_dump_json(), rec["id"])
+    by_loop: Dict[asyncio.AbstractEventLoop, list] = {}
+    for sub in subscribers:
+        by_loop.setdefault(sub.loop, []).append(sub)
+    for loop, subs in by_loop.items():
+        try:
+            loop.call_soon_threadsafe(_fan_out, subs, frame, stats)
+        except RuntimeError:
+            pass  # loop уже закрыт: подписчики отпишутся сами
+
+
+def _fan_out(subs: list, frame: bytes, stats: bytes) -> None:
+    for sub in subs:
+        sub.push(frame, stats)
+
+
+async def stream(quiz_id: int, seed: Callable[[], Seed]) -> AsyncIterator[bytes]:
+    sub = subscribe(quiz_id, seed)
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                async with asyncio.timeout(LIVE_HEARTBEAT):  # без лишней задачи, как у wait_for
+                    await sub.wakeup.wait()
+            except TimeoutError:
+                yield b": ping\n\n"  # держит соединение через прокси с idle-таймаутом
+                continue
+            yield sub.drain()
+    finally:
+        unsubscribe(quiz_id, sub)
+
+
+def subscriber_count() -> int:
+    with _LOCK:
+        return sum(len(t.subscribers) for t in _TOPICS.values())
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import List
 
@@ -7,16 +8,44 @@ from fastapi.staticfiles import StaticFiles
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.responses import FileResponse, HTMLResponse, JSONResponse
 
+from app import admission, grading, jobs, memory, runtime
+from app.admission import AdmissionMiddleware
+from app.compactor import compactor
+from app.compression import CompressionMiddleware
+from app.routers import admin as admin_router
 from app.routers import auth as auth_router
 from app.routers import items as items_router
+from app.routers import jobs as jobs_router
 from app.routers import quizzes as quizzes_router
 from app.schemas.item import ItemCreate, ItemRead
 
-app = FastAPI(title="Quiz Builder API", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # размер threadpool; фоновые задачи: компакция результатов, замер лага event loop
+    runtime.configure_threadpool()
+    compactor.start()
+    runtime.loop_lag.start()
+    # прогрев: схема OpenAPI, ключи ответов квизов; до конца readiness отвечает 503
+    runtime.warmup.start([app.openapi, grading.warm_up])
+    try:
+        yield
+    finally:
+        await runtime.warmup.stop()
+        await runtime.loop_lag.stop()
+        compactor.stop()
+        jobs.runner.stop()  # очередь отменяется, выполняющиеся задачи — на ближайшей порции
+
+
+app = FastAPI(title="Quiz Builder API", version="0.1.0", lifespan=lifespan)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(AdmissionMiddleware)  # внешний: отказ при перегрузке — до всей остальной работы
 
 # === Подключаем API-роутеры ===
 app.include_router(auth_router.router)
+app.include_router(admin_router.router)
 app.include_router(items_router.router)
+app.include_router(jobs_router.router)
 app.include_router(quizzes_router.router)
 
 
@@ -81,8 +110,18 @@ async def health():
     return {"status": "ok"}
 
 
+@app.get("/health/ready", tags=["Health"])
+async def ready():
+    # 503 при деградации: балансировщик перестаёт слать сюда трафик
+    report = runtime.snapshot()
+    report["admission"] = admission.stats()
+    report["jobs"] = jobs.runner.stats()
+    return JSONResponse(status_code=200 if report["status"] == "ok" else 503, content=report)
+
+
 # === Демонстрационный /items для автотестов ===
 _DB = {"items": []}
+memory.register("main.demo_items", lambda: _DB["items"])
 
 
 @app.post("/items", response_model=ItemRead, tags=["Items"])
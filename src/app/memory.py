@@ -0,0 +1,200 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from itertools import islice
+from typing import Callable, Dict, List, Optional, Set
+
+# === Учёт памяти in-memory структур ===
+# Модули регистрируют свои таблицы, индексы и кеши (register рядом с объявлением), а
+# GET /api/v1/admin/memory показывает число строк и глубокий размер каждой.
+# По умолчанию размер оценивается по выборке: MEMORY_SAMPLE строк с равным шагом,
+# глубокий размер выборки × число строк — это O(выборки), а не O(таблицы) (у dict — ещё
+# проход итератором до последней выбранной строки, на C). exact=true обходит всё с общим
+# множеством посещённых объектов: разделяемые объекты засчитываются первой таблице, которая
+# до них дошла; на миллионах строк это секунды, поэтому только по запросу.
+# Индекс (index=True) хранит ссылки на строки другой таблицы: считаем сам контейнер, ключи
+# и списки id, но не строки. Объекты классов вне app.* (loop, Event, lock) — только
+# sys.getsizeof, без обхода: иначе обход уходит в граф event loop.
+
+MEMORY_SAMPLE = int(os.getenv("MEMORY_SAMPLE", "64"))  # строк в выборке на таблицу
+TRACE_MAX_SECONDS = 60.0
+TRACE_FRAMES = 1  # глубина стека tracemalloc: для сайтов аллокаций хватает одной строки
+
+_CONTAINERS = (list, tuple, set, frozenset, deque)
+_SKIP = (type, type(sys), type(len), type(lambda: 0), bool, type(None))
+_GONE = object()
+
+
+class _Table:
+    __slots__ = ("name", "get", "index")
+
+    def __init__(self, name: str, get: Callable[[], object], index: bool) -> None:
+        self.name = name
+        self.get = get
+        self.index = index
+
+
+_TABLES: Dict[str, _Table] = {}
+_TRACE_LOCK = threading.Lock()
+
+
+def register(name: str, get: Callable[[], object], index: bool = False) -> None:
+    # get, а не сам объект: модуль может пересоздать контейнер
+    _TABLES[name] = _Table(name, get, index)
+
+
+def deep_size(obj: object, seen: Set[int]) -> int:
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _SKIP):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, _CONTAINERS):
+            stack.extend(obj)
+        elif type(obj).__module__.startswith("app."):
+            if hasattr(obj, "__dict__"):
+                stack.append(vars(obj))
+            for cls in type(obj).__mro__:
+                for slot in getattr(cls, "__slots__", ()):
+                    value = getattr(obj, slot, None)
+                    if value is not None:
+                        stack.append(value)
+    return size
+
+
+def _entries(container: object, every: int, limit: Optional[int]) -> list:
+    # строки с шагом every; для dict — пары (ключ, значение)
+    stop = every * limit if limit is not None else None
+    if isinstance(container, dict):
+        # по ключам, без кортежа (ключ, значение) на каждую пропущенную строку
+        keys = list(islice(container, 0, stop, every))
+        return [(k, v) for k in keys if (v := container.get(k, _GONE)) is not _GONE]
+    if isinstance(container, (list, tuple)):
+        return list(container[0:stop:every])
+    return list(islice(container, 0, stop, every))
+
+
+def _entry_size(entry: object, is_dict: bool, index: bool, seen: Set[int]) -> int:
+    # пара (ключ, значение) собрана в _entries — сам кортеж не считаем и в seen не кладём
+    key, value = entry if is_dict else (None, entry)
+    size = deep_size(key, seen) if is_dict else 0
+    if not index:
+        return size + deep_size(value, seen)
+    # индекс: строки (dict) принадлежат другой таблице, у списков id — только сам список
+    if isinstance(value, dict):
+        return size
+    if isinstance(value, _CONTAINERS):
+        return size + sys.getsizeof(value)
+    return size + deep_size(value, seen)
+
+
+def _measure(table: _Table, exact: bool, seen: Set[int]) -> dict:
+    container = table.get()
+    if not hasattr(container, "__len__") or not hasattr(container, "__iter__"):
+        return {"name": table.name, "rows": None, "bytes": deep_size(container, seen)}
+    rows = len(container)
+    is_dict = isinstance(container, dict)
+    every = 1 if exact or rows <= MEMORY_SAMPLE else rows // MEMORY_SAMPLE
+    for _ in range(3):
+        try:
+            entries = _entries(container, every, None if exact else MEMORY_SAMPLE)
+            break
+        except RuntimeError:
+            continue  # dict изменился во время обхода (запись из threadpool) — повторяем
+    else:
+        entries = []
+    shell = sys.getsizeof(container)
+    seen.add(id(container))
+    sampled = sum(_entry_size(e, is_dict, table.index, seen) for e in entries)
+    estimate = shell + (sampled * rows / len(entries) if entries else 0)
+    return {
+        "name": table.name,
+        "rows": rows,
+        "bytes": int(estimate),
+        "bytes_per_row": round((estimate - shell) / rows, 1) if rows else None,
+        "index": table.index,
+        "sampled_rows": len(entries),
+    }
+
+
+def report(exact: bool = False) -> dict:
+    started = time.perf_counter()
+    seen: Set[int] = set()
+    tables: List[dict] = []
+    for table in list(_TABLES.values()):
+        # в выборочном режиме у каждой таблицы своё множество: общие объекты в каждой
+        tables.append(_measure(table, exact, seen if exact else set()))
+    return {
+        "mode": "exact" if exact else "sampled",
+        "sample": None if exact else MEMORY_SAMPLE,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        "total_bytes": sum(t["bytes"] for t in tables),
+        "rss_bytes": _rss(),
+        "tables": sorted(tables, key=lambda t: t["bytes"], reverse=True),
+    }
+
+
+def _rss() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None  # не Linux
+
+
+class TraceBusy(Exception):
+    pass
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        )
+    )
+
+
+async def trace(seconds: float, top: int) -> dict:
+    # рост аллокаций за окно: снимок, пауза, снимок, разница по строкам кода. Пока идёт
+    # трассировка, каждая аллокация дороже (заметно на CPU) — отсюда ограничение окна
+    if not _TRACE_LOCK.acquire(blocking=False):
+        raise TraceBusy()
+    started_here = not tracemalloc.is_tracing()
+    loop = asyncio.get_running_loop()
+    try:
+        if started_here:
+            tracemalloc.start(TRACE_FRAMES)
+        before = await loop.run_in_executor(None, _snapshot)
+        await asyncio.sleep(min(seconds, TRACE_MAX_SECONDS))
+        after = await loop.run_in_executor(None, _snapshot)
+        stats = after.compare_to(before, "lineno")[:top]
+        traced, peak = tracemalloc.get_traced_memory()
+    finally:
+        if started_here:
+            tracemalloc.stop()
+        _TRACE_LOCK.release()
+    return {
+        "seconds": seconds,
+        "traced_bytes": traced,
+        "peak_bytes": peak,
+        "top": [
+            {
+                "site": f"{s.traceback[0].filename}:{s.traceback[0].lineno}",
+                "size_diff": s.size_diff,
+                "count_diff": s.count_diff,
+                "size": s.size,
+            }
+            for s in stats
+        ],
+    }
@@ -0,0 +1,42 @@
+import base64
+from typing import Optional
+
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+_CURSOR_PREFIX = "k1:"  # версия формата курсора
+
+
+def encode_cursor(last_id: int) -> str:
+    raw = f"{_CURSOR_PREFIX}{last_id}".encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        if not raw.startswith(_CURSOR_PREFIX):
+            raise ValueError("bad_cursor")
+        last_id = int(raw[len(_CURSOR_PREFIX) :])
+    except ValueError:
+        raise ValueError("bad_cursor") from None
+    if last_id < 0:
+        raise ValueError("bad_cursor")
+    return last_id
+
+
+def parse_cursor(cursor: Optional[str]) -> Optional[int]:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid cursor") from None
+
+
+def keyset_page(rows: list, limit: int, response: Response) -> list:
+    # rows запрошены с limit + 1: лишняя строка означает, что есть следующая страница
+    page = rows[:limit]
+    if len(rows) > limit and page:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(page[-1]["id"])
+    return page
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+
+from app import memory
+from app.deps import require_admin
+from app.runtime import TimedRoute
+
+router = APIRouter(prefix="/api/v1/admin", tags=["Admin"], route_class=TimedRoute)
+
+
+@router.get("/memory")
+async def memory_report(
+    exact: bool = Query(False),
+    trace_seconds: float = Query(0, ge=0, le=memory.TRACE_MAX_SECONDS),
+    top: int = Query(10, ge=1, le=100),
+    _: dict = Depends(require_admin),
+):
+    # размеры по выборке (exact — полный обход); trace_seconds > 0 — ещё и рост аллокаций
+    # tracemalloc за это окно, по строкам кода
+    report = await run_in_threadpool(memory.report, exact)
+    if trace_seconds > 0:
+        try:
+            report["tracemalloc"] = await memory.trace(trace_seconds, top)
+        except memory.TraceBusy:
+            raise HTTPException(status_code=409, detail="memory trace already running")
+    return report
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, HTTPException
 
+from app.runtime import TimedRoute
 from app.schemas.auth import Token
 from app.schemas.user import UserCreate, UserRead
 from app.security import create_token, hash_password, verify_password
 from app.storage import create_user, get_user_by_username
 
-router = APIRouter(prefix="/api/v1/auth", tags=["Auth"])
+router = APIRouter(prefix="/api/v1/auth", tags=["Auth"], route_class=TimedRoute)
 
 
 @router.post("/register", response_model=UserRead)
@@ -1,12 +1,14 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
 from app.deps import get_current_user
+from app.pagination import keyset_page, parse_cursor
+from app.runtime import TimedRoute
 from app.schemas.item import ItemCreate, ItemRead
 from app.storage import create_item, delete_item, get_item, list_items_by_owner, update_item_name
 
-router = APIRouter(prefix="/api/v1/items", tags=["Items"])
+router = APIRouter(prefix="/api/v1/items", tags=["Items"], route_class=TimedRoute)
 
 
 @router.post("", response_model=ItemRead)
@@ -17,11 +19,17 @@ def create_item_secure(data: ItemCreate, user: dict = Depends(get_current_user))
 
 @router.get("", response_model=List[ItemRead])
 def list_items_secure(
+    response: Response,
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, max_length=64),
     user: dict = Depends(get_current_user),
 ):
-    items = list_items_by_owner(owner_id=user["id"], limit=limit, offset=offset)
+    # cursor (keyset по id) имеет приоритет над offset; следующий курсор — в X-Next-Cursor
+    rows = list_items_by_owner(
+        owner_id=user["id"], limit=limit + 1, offset=offset, after_id=parse_cursor(cursor)
+    )
+    items = keyset_page(rows, limit, response)
     return [{"id": it["id"], "name": it["name"]} for it in items]
 
 
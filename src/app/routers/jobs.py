@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse, Response
+
+from app import jobs
+from app.deps import get_current_user
+from app.runtime import TimedRoute
+from app.schemas.job import JobProgress, JobRead
+
+router = APIRouter(prefix="/api/v1/jobs", tags=["Jobs"], route_class=TimedRoute)
+
+
+# ---------- helpers ----------
+def job_read(job: jobs.Job) -> JobRead:
+    return JobRead(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        progress=JobProgress(done=job.done, total=job.total),
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        error=job.error,
+        result_url=f"{router.prefix}/{job.id}/result" if job.status == jobs.SUCCEEDED else None,
+    )
+
+
+def submit(kind: str, user: dict, fn, priority: int = 5, cancellable: bool = True) -> JSONResponse:
+    # 202 + Location: клиент опрашивает GET /api/v1/jobs/{id}
+    try:
+        job = jobs.runner.submit(kind, user["id"], fn, priority, cancellable)
+    except jobs.QueueFull:
+        raise HTTPException(status_code=503, detail="job queue is full") from None
+    return JSONResponse(
+        status_code=202,
+        content=job_read(job).model_dump(),
+        headers={"Location": f"{router.prefix}/{job.id}"},
+    )
+
+
+def _ensure_job_owner(job_id: str, user: dict) -> jobs.Job:
+    job = jobs.runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    if job.owner_id != user["id"] and user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="forbidden")
+    return job
+
+
+# ---------- Jobs ----------
+@router.get("/{job_id}", response_model=JobRead)
+async def get_job(job_id: str, user: dict = Depends(get_current_user)):
+    return job_read(_ensure_job_owner(job_id, user))
+
+
+@router.get("/{job_id}/result")
+async def get_job_result(job_id: str, user: dict = Depends(get_current_user)):
+    job = _ensure_job_owner(job_id, user)
+    if job.status != jobs.SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"job is {job.status}")
+    if isinstance(job.result, bytes):
+        return Response(job.result, media_type=job.media_type)
+    return JSONResponse(job.result)
+
+
+@router.delete("/{job_id}", response_model=JobRead)
+async def cancel_job(job_id: str, user: dict = Depends(get_current_user)):
+    # в очереди — отменяется сразу; выполняющаяся остановится на ближайшей порции работы
+    job = _ensure_job_owner(job_id, user)
+    if not job.cancellable and not job.finished:
+        raise HTTPException(status_code=409, detail="job cannot be cancelled")
+    return job_read(jobs.runner.cancel(job))
@@ -1,45 +1,88 @@
+import csv
+import io
+import re
+from datetime import datetime, timezone
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+
+from app import (
+    analysis,
+    astorage,
+    attempts,
+    compression,
+    grading,
+    idempotency,
+    jobs,
+    leaderboard,
+    live,
+    search,
+)
 from app.deps import get_current_user
+from app.pagination import keyset_page, parse_cursor
+from app.routers.jobs import submit as submit_job
+from app.runtime import TimedRoute
+from app.schemas.job import JobRead
 from app.schemas.quiz import (
+    AcceptedAnswer,
+    AttemptCreate,
+    AttemptRead,
     ChoiceCreate,
     ChoicePublic,
     ChoiceRead,
+    ItemAnalysis,
+    LeaderboardEntry,
+    MatchMode,
+    MyResultRead,
+    QuestionAttempt,
+    QuestionBulk,
     QuestionCreate,
     QuestionPublic,
     QuestionRead,
     QuestionType,
     QuestionUpdate,
+    QuizClone,
     QuizCreate,
     QuizDetail,
     QuizPreview,
     QuizRead,
+    QuizSearchHit,
     QuizUpdate,
     ResultRead,
+    ResultRollup,
+    RetentionRead,
+    RetentionUpdate,
     SubmitRequest,
     SubmitResult,
 )
 from app.storage import (
-    create_choice,
+    QuestionVersion,
+    apply_question_batch,
+    clone_quiz,
     create_question,
     create_quiz,
-    delete_choices_for_question,
     delete_question,
     delete_quiz,
+    delete_quiz_questions,
     get_question,
     get_quiz,
+    get_retention,
+    get_user_by_id,
+    hide_quiz,
     list_choices_by_question,
     list_questions_by_quiz,
-    list_quizzes_by_owner,
+    list_result_rollups,
     list_results_for_quiz,
+    pin_version,
+    quiz_version,
     save_result,
+    set_retention,
     update_question,
     update_quiz_title,
 )
 
-router = APIRouter(prefix="/api/v1", tags=["Quizzes"])
+router = APIRouter(prefix="/api/v1", tags=["Quizzes"], route_class=TimedRoute)
 
 
 # ---------- helpers ----------
@@ -80,20 +123,82 @@ def _validate_choices_for_type(qtype: QuestionType, choices: Optional[List[Choic
         )
 
 
+def _validate_accepted_answers(
+    qtype: QuestionType, accepted: Optional[List[AcceptedAnswer]]
+) -> None:
+    if not accepted:
+        return
+    if qtype != QuestionType.text:
+        raise HTTPException(status_code=400, detail="accepted answers are only for text questions")
+    for a in accepted:
+        if a.mode == MatchMode.regex:
+            try:
+                re.compile(a.value)
+            except re.error:
+                raise HTTPException(status_code=400, detail="invalid regex") from None
+
+
+async def _aensure_quiz_owner(quiz_id: int, user: dict) -> dict:
+    quiz = await astorage.get_quiz(quiz_id)
+    if not quiz:
+        raise HTTPException(status_code=404, detail="quiz not found")
+    if quiz["owner_id"] != user["id"] and user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="forbidden")
+    return quiz
+
+
+def _question_changes(q: dict, data: QuestionUpdate) -> dict:
+    # проверка и итог правки одного вопроса (PATCH и bulk); choices: None — не трогать
+    new_type = data.type or QuestionType(q["type"])
+    if data.choices is not None:
+        _validate_choices_for_type(new_type, data.choices)
+    accepted = None
+    if data.accepted_answers is not None:
+        _validate_accepted_answers(new_type, data.accepted_answers)
+        accepted = [a.model_dump(mode="json") for a in data.accepted_answers]
+    elif new_type != QuestionType.text and q.get("accepted"):
+        accepted = []  # смена типа с text: старые accepted-ответы больше не применимы
+
+    choices = None
+    if data.choices is not None:
+        choices = [(c.text, c.is_correct) for c in data.choices]
+    if new_type == QuestionType.text and (data.choices is not None or data.type is not None):
+        choices = []
+    return {
+        "text": data.text,
+        "qtype": new_type.value if data.type is not None else None,
+        "accepted": accepted,
+        "choices": choices,
+    }
+
+
 def _read_question(question_id: int) -> QuestionRead:
-    q = get_question(question_id)
-    choices = list_choices_by_question(question_id)
+    return _question_read(get_question(question_id), list_choices_by_question(question_id))
+
+
+def _question_read(q: dict, choices: List[dict]) -> QuestionRead:
+    accepted = q.get("accepted")
     return QuestionRead(
         id=q["id"],
         text=q["text"],
         type=QuestionType(q["type"]),
         choices=[ChoiceRead(id=c["id"], text=c["text"]) for c in choices] if choices else None,
+        accepted_answers=[AcceptedAnswer(**a) for a in accepted] if accepted else None,
     )
 
 
-def _public_question(question_id: int) -> QuestionPublic:
-    q = get_question(question_id)
-    choices = list_choices_by_question(question_id)
+def _attempt_question(qv: QuestionVersion, attempt: attempts.Attempt) -> QuestionAttempt:
+    q = qv.question
+    choices = attempts.order_choices(attempt, q["id"], list(qv.choices))
+    return QuestionAttempt(
+        id=q["id"],
+        text=q["text"],
+        type=QuestionType(q["type"]),
+        choices=[ChoiceRead(id=c["id"], text=c["text"]) for c in choices] if choices else None,
+    )
+
+
+def _public_question(q: dict, choices: List[dict]) -> QuestionPublic:
     return QuestionPublic(
         id=q["id"],
         text=q["text"],
@@ -102,31 +207,79 @@ def _public_question(question_id: int) -> QuestionPublic:
     )
 
 
-def _grade(quiz_id: int, payload: SubmitRequest) -> SubmitResult:
-    questions = list_questions_by_quiz(quiz_id)
-    qmap = {q["id"]: q for q in questions}
-    max_score = sum(1 for q in questions if q["type"] in ("single", "multiple"))
-    choices_by_q = {q["id"]: list_choices_by_question(q["id"]) for q in questions}
-
-    score = 0
-    for ans in payload.answers:
-        q = qmap.get(ans.question_id)
-        if not q:
-            continue
-        qtype = q["type"]
-        if qtype == "single" and ans.choice_id is not None:
-            target = next((c for c in choices_by_q[q["id"]] if c["id"] == ans.choice_id), None)
-            if target and target["is_correct"]:
-                score += 1
-        elif qtype == "multiple" and ans.choice_ids:
-            correct_ids = sorted([c["id"] for c in choices_by_q[q["id"]] if c["is_correct"]])
-            given = sorted(list(set(ans.choice_ids)))
-            if given == correct_ids:
-                score += 1
-        # text — не автооцениваем
+def _grade_and_save(
+    quiz_id: int,
+    payload: SubmitRequest,
+    user_id: Optional[int],
+    version: Optional[int] = None,
+    only_ids: Optional[set] = None,
+) -> SubmitResult:
+    # ключ ответов (вместе с матчерами text-вопросов) собирается один раз на версию квиза;
+    # результат запоминает версию, по которой оценён, — она закрепляется в истории квиза
+    snapshot = quiz_version(quiz_id, version)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="quiz not found")
+    pin_version(snapshot)
+    key = grading.answer_key(quiz_id, snapshot.version)
+    if key is None:
+        raise HTTPException(status_code=404, detail="quiz not found")
+    score, max_score = grading.grade(key, payload.answers, only_ids)
+    save_result(
+        quiz_id=quiz_id,
+        user_id=user_id,
+        score=score,
+        max_score=max_score,
+        answers=[
+            a.dict() for a in payload.answers if only_ids is None or a.question_id in only_ids
+        ],
+        quiz_version=key.version,
+    )
     return SubmitResult(score=score, max_score=max_score)
 
 
+IDEMPOTENCY_KEY = Header(
+    None, alias="Idempotency-Key", max_length=idempotency.MAX_KEY_LENGTH
+)  # повтор с тем же ключом возвращает первый ответ, не создавая новый результат
+
+
+def _submit_once(
+    key: Optional[str], scope: str, payload: SubmitRequest, response: Response, submit
+) -> SubmitResult:
+    if key is None:
+        return submit()
+    if not idempotency.valid_key(key):
+        raise HTTPException(status_code=400, detail="invalid idempotency key")
+    body = idempotency.fingerprint(payload.model_dump_json().encode())
+    try:
+        result, replayed = idempotency.run(scope, key, body, submit)
+    except idempotency.KeyReused:
+        raise HTTPException(
+            status_code=409, detail="idempotency key reused with different payload"
+        ) from None
+    except idempotency.InProgress:
+        raise HTTPException(status_code=409, detail="request with this key in progress") from None
+    if replayed:
+        response.headers["Idempotency-Replayed"] = "true"
+    return result
+
+
+PREFER = Header(
+    None, alias="Prefer", max_length=200
+)  # "respond-async": вместо ожидания — 202 и фоновая задача (GET /api/v1/jobs/{id})
+ASYNC_RESPONSES = {202: {"model": JobRead, "description": "Prefer: respond-async"}}
+
+
+def _result_read(r: dict) -> ResultRead:
+    return ResultRead(
+        id=r["id"],
+        user_id=r["user_id"],
+        score=r["score"],
+        max_score=r["max_score"],
+        quiz_version=r.get("quiz_version"),
+        created_at=r["created_at"],
+    )
+
+
 # ---------- Quizzes ----------
 @router.post("/quizzes", response_model=QuizRead)
 def create_quiz_endpoint(data: QuizCreate, user: dict = Depends(get_current_user)):
@@ -135,24 +288,79 @@ def create_quiz_endpoint(data: QuizCreate, user: dict = Depends(get_current_user
 
 
 @router.get("/quizzes", response_model=List[QuizRead])
-def list_quizzes(
+async def list_quizzes(
+    response: Response,
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, max_length=64),
     user: dict = Depends(get_current_user),
 ):
-    qs = list_quizzes_by_owner(user["id"], limit, offset)
+    # cursor (keyset по id) имеет приоритет над offset; следующий курсор — в X-Next-Cursor
+    after_id = parse_cursor(cursor)
+    rows = await astorage.list_quizzes_by_owner(user["id"], limit + 1, offset, after_id=after_id)
+    qs = keyset_page(rows, limit, response)
     return [QuizRead(id=q["id"], title=q["title"]) for q in qs]
 
 
+@router.get("/quizzes/search", response_model=List[QuizSearchHit])
+def search_quizzes(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    user: dict = Depends(get_current_user),
+):
+    hits = search.search(user["id"], q, limit, offset)
+    out = []
+    for quiz_id, score, question_ids in hits:
+        quiz = get_quiz(quiz_id)
+        if quiz:
+            out.append(
+                QuizSearchHit(
+                    id=quiz["id"], title=quiz["title"], score=score, question_ids=question_ids
+                )
+            )
+    return out
+
+
 @router.get("/quizzes/{quiz_id}", response_model=QuizDetail)
-def get_quiz_detail(quiz_id: int, user: dict = Depends(get_current_user)):
+async def get_quiz_detail(quiz_id: int, user: dict = Depends(get_current_user)):
+    quiz = await _aensure_quiz_owner(quiz_id, user)
+    questions = [
+        _question_read(q, await astorage.list_choices_by_question(q["id"]))
+        for q in await astorage.list_questions_by_quiz(quiz_id)
+    ]
+    return QuizDetail(
+        id=quiz["id"], title=quiz["title"], version=quiz["version"], questions=questions
+    )
+
+
+@router.get("/quizzes/{quiz_id}/versions/{version}", response_model=QuizDetail)
+def get_quiz_version(quiz_id: int, version: int, user: dict = Depends(get_current_user)):
+    # доступны версии, по которым оценивались результаты или начинались попытки, и текущая
     quiz = _ensure_quiz_owner(quiz_id, user)
-    questions = list_questions_by_quiz(quiz_id)
+    snapshot = quiz_version(quiz_id, version)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="version not found")
     return QuizDetail(
-        id=quiz["id"], title=quiz["title"], questions=[_read_question(q["id"]) for q in questions]
+        id=quiz["id"],
+        title=quiz["title"],
+        version=snapshot.version,
+        questions=[_question_read(qv.question, list(qv.choices)) for qv in snapshot.questions],
     )
 
 
+@router.post("/quizzes/{quiz_id}/clone", response_model=QuizRead)
+def clone_quiz_endpoint(
+    quiz_id: int, data: Optional[QuizClone] = None, user: dict = Depends(get_current_user)
+):
+    # клон делит вопросы с текущей версией исходного квиза до первой правки
+    _ensure_quiz_owner(quiz_id, user)
+    quiz = clone_quiz(quiz_id, owner_id=user["id"], title=data.title if data else None)
+    if not quiz:
+        raise HTTPException(status_code=404, detail="quiz not found")
+    return QuizRead(id=quiz["id"], title=quiz["title"])
+
+
 @router.patch("/quizzes/{quiz_id}", response_model=QuizRead)
 def update_quiz_endpoint(quiz_id: int, data: QuizUpdate, user: dict = Depends(get_current_user)):
     _ensure_quiz_owner(quiz_id, user)
@@ -162,9 +370,37 @@ def update_quiz_endpoint(quiz_id: int, data: QuizUpdate, user: dict = Depends(ge
     return QuizRead(id=q["id"], title=q["title"])
 
 
-@router.delete("/quizzes/{quiz_id}")
-def delete_quiz_endpoint(quiz_id: int, user: dict = Depends(get_current_user)):
+def _delete_quiz_job(quiz_id: int):
+    # квиз уже скрыт (hide_quiz): вопросы удаляются порциями, между ними блокировка записи
+    # свободна для других квизов. Задача неотменяемая — начатое удаление доводится до конца
+    def run(job: jobs.Job) -> dict:
+        total = len(list_questions_by_quiz(quiz_id))
+        job.step(0, total)
+        left = total
+        while left:
+            left = delete_quiz_questions(quiz_id, jobs.JOB_CHUNK)
+            job.step(max(total - left, 0))
+        delete_quiz(quiz_id)
+        return {"deleted": True}
+
+    return run
+
+
+@router.delete("/quizzes/{quiz_id}", responses=ASYNC_RESPONSES)
+def delete_quiz_endpoint(
+    quiz_id: int, prefer: Optional[str] = PREFER, user: dict = Depends(get_current_user)
+):
     _ensure_quiz_owner(quiz_id, user)
+    if jobs.respond_async(prefer):
+        # скрыть до первой порции: читатели сразу получают 404, а не полуудалённый квиз
+        if not hide_quiz(quiz_id):
+            raise HTTPException(status_code=404, detail="quiz not found")
+        try:
+            return submit_job(
+                "quiz_delete", user, _delete_quiz_job(quiz_id), priority=7, cancellable=False
+            )
+        except HTTPException:
+            pass  # очередь полна — квиз уже скрыт, доудаляем здесь же
     ok = delete_quiz(quiz_id)
     if not ok:
         raise HTTPException(status_code=404, detail="quiz not found")
@@ -176,11 +412,16 @@ def delete_quiz_endpoint(quiz_id: int, user: dict = Depends(get_current_user)):
 def create_question_endpoint(data: QuestionCreate, user: dict = Depends(get_current_user)):
     _ensure_quiz_owner(data.quiz_id, user)
     _validate_choices_for_type(data.type, data.choices)
-
-    q = create_question(quiz_id=data.quiz_id, text=data.text, qtype=data.type.value)
-    if data.type != QuestionType.text and data.choices:
-        for c in data.choices:
-            create_choice(question_id=q["id"], text=c.text, is_correct=c.is_correct)
+    _validate_accepted_answers(data.type, data.accepted_answers)
+
+    choices = data.choices if data.type != QuestionType.text else None
+    q = create_question(
+        quiz_id=data.quiz_id,
+        text=data.text,
+        qtype=data.type.value,
+        accepted=[a.model_dump(mode="json") for a in data.accepted_answers or []] or None,
+        choices=[(c.text, c.is_correct) for c in choices or []],
+    )
 
     return _read_question(q["id"])
 
@@ -203,30 +444,51 @@ def update_question_endpoint(
     question_id: int, data: QuestionUpdate, user: dict = Depends(get_current_user)
 ):
     q = _ensure_question_owner(question_id, user)
-    current_type = QuestionType(q["type"])
-    new_type = data.type or current_type
-
-    if data.choices is not None:
-        _validate_choices_for_type(new_type, data.choices)
-
-    updated = update_question(
-        question_id,
-        text=data.text if data.text is not None else None,
-        qtype=new_type.value if data.type is not None else None,
-    )
+    updated = update_question(question_id, **_question_changes(q, data))
     if not updated:
         raise HTTPException(status_code=404, detail="question not found")
+    return _read_question(question_id)
 
-    if data.choices is not None:
-        delete_choices_for_question(question_id)
-        if new_type != QuestionType.text:
-            for c in data.choices:
-                create_choice(question_id=question_id, text=c.text, is_correct=c.is_correct)
 
-    if data.type == QuestionType.text and data.choices is None:
-        delete_choices_for_question(question_id)
+@router.post("/quizzes/{quiz_id}/questions/bulk", response_model=QuizDetail)
+def bulk_questions_endpoint(
+    quiz_id: int, data: QuestionBulk, user: dict = Depends(get_current_user)
+):
+    # весь пакет проверяется до первого изменения: применяется целиком или не применяется
+    quiz = _ensure_quiz_owner(quiz_id, user)
+    existing = {q["id"]: q for q in list_questions_by_quiz(quiz_id)}
+    touched = [u.id for u in data.update] + data.delete
+    if len(set(touched)) != len(touched):
+        raise HTTPException(status_code=400, detail="duplicate question in batch")
+    if any(qid not in existing for qid in touched):
+        raise HTTPException(status_code=404, detail="question not found")
+    update = {u.id: _question_changes(existing[u.id], u) for u in data.update}
+
+    create = []
+    for c in data.create:
+        _validate_choices_for_type(c.type, c.choices)
+        _validate_accepted_answers(c.type, c.accepted_answers)
+        create.append(
+            {
+                "text": c.text,
+                "type": c.type.value,
+                "accepted": [a.model_dump(mode="json") for a in c.accepted_answers or []] or None,
+                "choices": [(ch.text, ch.is_correct) for ch in c.choices or []],
+                "position": c.position,
+            }
+        )
+    if data.order is not None:
+        remaining = existing.keys() - set(data.delete)
+        if len(data.order) != len(remaining) or set(data.order) != remaining:
+            raise HTTPException(status_code=400, detail="order must list remaining questions")
 
-    return _read_question(question_id)
+    questions = apply_question_batch(quiz_id, create, update, data.delete, data.order)
+    return QuizDetail(
+        id=quiz["id"],
+        title=quiz["title"],
+        version=quiz["version"],
+        questions=[_read_question(q["id"]) for q in questions],
+    )
 
 
 @router.delete("/questions/{question_id}")
@@ -242,85 +504,269 @@ def delete_question_endpoint(question_id: int, user: dict = Depends(get_current_
 @router.get("/quizzes/{quiz_id}/preview", response_model=QuizPreview)
 def preview_quiz(quiz_id: int, user: dict = Depends(get_current_user)):
     quiz = _ensure_quiz_owner(quiz_id, user)
-    questions = list_questions_by_quiz(quiz_id)
-    return QuizPreview(
-        id=quiz["id"], title=quiz["title"], questions=[_public_question(q["id"]) for q in questions]
-    )
+    questions = [
+        _public_question(q, list_choices_by_question(q["id"]))
+        for q in list_questions_by_quiz(quiz_id)
+    ]
+    return QuizPreview(id=quiz["id"], title=quiz["title"], questions=questions)
 
 
 # ---------- Submit (owner) ----------
 @router.post("/quizzes/{quiz_id}/submit", response_model=SubmitResult)
-def submit_quiz(quiz_id: int, payload: SubmitRequest, user: dict = Depends(get_current_user)):
+def submit_quiz(
+    quiz_id: int,
+    payload: SubmitRequest,
+    response: Response,
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY,
+    user: dict = Depends(get_current_user),
+):
     _ensure_quiz_owner(quiz_id, user)
-    result = _grade(quiz_id, payload)
-    save_result(
-        quiz_id=quiz_id,
-        user_id=user["id"],
-        score=result.score,
-        max_score=result.max_score,
-        answers=[a.dict() for a in payload.answers],
+    return _submit_once(
+        idempotency_key,
+        f"user:{user['id']}:quiz:{quiz_id}",
+        payload,
+        response,
+        lambda: _grade_and_save(quiz_id, payload, user["id"]),
     )
-    return result
 
 
 # ---------- PUBLIC endpoints (без авторизации) ----------
 @router.get("/public/quizzes/{quiz_id}/preview", response_model=QuizPreview)
-def public_preview(quiz_id: int):
+async def public_preview(quiz_id: int, request: Request):
+    quiz = await astorage.get_quiz(quiz_id)
+    if not quiz:
+        raise HTTPException(status_code=404, detail="quiz not found")
+    snapshot = await astorage.quiz_version(quiz_id)
+
+    def build() -> bytes:
+        questions = [_public_question(qv.question, qv.choices) for qv in snapshot.questions]
+        preview = QuizPreview(id=quiz["id"], title=quiz["title"], questions=questions)
+        return preview.model_dump_json().encode()
+
+    # одинаков для всех, пока не изменились версия или заголовок: JSON и gzip — из кеша
+    key = ("public_preview", quiz_id, snapshot.version, quiz["title"])
+    return compression.payload_response(request, compression.cached_payload(key, build))
+
+
+@router.post("/public/quizzes/{quiz_id}/submit", response_model=SubmitResult)
+def public_submit(
+    quiz_id: int,
+    payload: SubmitRequest,
+    response: Response,
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY,
+):
     quiz = get_quiz(quiz_id)
     if not quiz:
         raise HTTPException(status_code=404, detail="quiz not found")
-    questions = list_questions_by_quiz(quiz_id)
-    return QuizPreview(
-        id=quiz["id"], title=quiz["title"], questions=[_public_question(q["id"]) for q in questions]
+    return _submit_once(
+        idempotency_key,
+        f"public:quiz:{quiz_id}",
+        payload,
+        response,
+        lambda: _grade_and_save(quiz_id, payload, None),
     )
 
 
-@router.post("/public/quizzes/{quiz_id}/submit", response_model=SubmitResult)
-def public_submit(quiz_id: int, payload: SubmitRequest):
+# ---------- PUBLIC attempts (сессии с вариантом) ----------
+@router.post("/public/quizzes/{quiz_id}/start", response_model=AttemptRead)
+def public_start(quiz_id: int, data: Optional[AttemptCreate] = None):
     quiz = get_quiz(quiz_id)
     if not quiz:
         raise HTTPException(status_code=404, detail="quiz not found")
-    result = _grade(quiz_id, payload)
-    save_result(
-        quiz_id=quiz_id,
-        user_id=None,
-        score=result.score,
-        max_score=result.max_score,
-        answers=[a.dict() for a in payload.answers],
+    data = data or AttemptCreate()
+    snapshot = quiz_version(quiz_id)  # попытка закрепляет версию: правки её не затронут
+    session_id, attempt = attempts.start(
+        quiz_id, snapshot.version, data.count, data.shuffle_choices
     )
-    return result
+    pin_version(snapshot, until=attempt.expires_at)  # не вытесняется, пока попытка жива
+    question_ids = [qv.question["id"] for qv in snapshot.questions]
+    picked = attempts.pick_questions(attempt, question_ids)
+    by_id = {qv.question["id"]: qv for qv in snapshot.questions}
+    return AttemptRead(
+        id=quiz["id"],
+        title=quiz["title"],
+        session_id=session_id,
+        expires_at=attempt.expires_at,
+        questions=[_attempt_question(by_id[qid], attempt) for qid in picked],
+    )
+
+
+@router.post("/public/attempts/{session_id}/submit", response_model=SubmitResult)
+def public_attempt_submit(session_id: str, payload: SubmitRequest):
+    attempt = attempts.finish(session_id)
+    if not attempt:
+        raise HTTPException(status_code=404, detail="attempt not found or expired")
+    # оцениваем по версии, с которой попытка началась, даже если квиз с тех пор правили
+    snapshot = quiz_version(attempt.quiz_id, attempt.version)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="quiz not found")
+    question_ids = [qv.question["id"] for qv in snapshot.questions]
+    picked = set(attempts.pick_questions(attempt, question_ids))
+    return _grade_and_save(attempt.quiz_id, payload, None, attempt.version, only_ids=picked)
 
 
 # ---------- Results (история) ----------
 @router.get("/quizzes/{quiz_id}/results", response_model=List[ResultRead])
-def results_for_quiz(quiz_id: int, user: dict = Depends(get_current_user)):
+async def results_for_quiz(quiz_id: int, user: dict = Depends(get_current_user)):
+    await _aensure_quiz_owner(quiz_id, user)
+    rows = await astorage.list_results_for_quiz(quiz_id)
+    return [_result_read(r) for r in rows]
+
+
+EXPORT_COLUMNS = ("id", "user_id", "score", "max_score", "quiz_version", "created_at")
+
+
+def _export_job(quiz_id: int):
+    # CSV собирается порциями по JOB_CHUNK результатов
+    def run(job: jobs.Job) -> bytes:
+        rows = list_results_for_quiz(quiz_id)
+        job.step(0, len(rows))
+        buf = io.StringIO()
+        out = csv.writer(buf)
+        out.writerow(EXPORT_COLUMNS)
+        for start in range(0, len(rows), jobs.JOB_CHUNK):
+            chunk = rows[start : start + jobs.JOB_CHUNK]
+            out.writerows([r.get(col) for col in EXPORT_COLUMNS] for r in chunk)
+            job.step(start + len(chunk))
+        job.media_type = "text/csv; charset=utf-8"
+        return buf.getvalue().encode()
+
+    return run
+
+
+@router.post("/quizzes/{quiz_id}/results/export", status_code=202, response_model=JobRead)
+def export_results(quiz_id: int, user: dict = Depends(get_current_user)):
+    # всегда фоном; файл — GET /api/v1/jobs/{id}/result
     _ensure_quiz_owner(quiz_id, user)
+    return submit_job("results_export", user, _export_job(quiz_id))
+
+
+def _live_seed(quiz_id: int) -> live.Seed:
+    # агрегаты на момент подписки: сырые результаты + уже свёрнутые в rollup
     rows = list_results_for_quiz(quiz_id)
+    rollups = list_result_rollups(quiz_id)
+    count = len(rows) + sum(r["count"] for r in rollups)
+    score_sum = sum(r["score"] for r in rows) + sum(r["score_sum"] for r in rollups)
+    scores = [r["score"] for r in rows] + [max(r["histogram"]) for r in rollups if r["histogram"]]
+    return count, score_sum, max(scores, default=None), rows[0]["id"] if rows else 0
+
+
+@router.get("/quizzes/{quiz_id}/results/live")
+async def results_live(quiz_id: int, user: dict = Depends(get_current_user)):
+    # SSE: event result — новый результат, stats — агрегаты, dropped — часть пропущена
+    await _aensure_quiz_owner(quiz_id, user)
+    return StreamingResponse(
+        live.stream(quiz_id, lambda: _live_seed(quiz_id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/quizzes/{quiz_id}/results/rollup", response_model=List[ResultRollup])
+def results_rollup(quiz_id: int, user: dict = Depends(get_current_user)):
+    # агрегаты по дням для результатов, уже вышедших за ретенцию
+    _ensure_quiz_owner(quiz_id, user)
     return [
-        ResultRead(
-            id=r["id"],
-            user_id=r["user_id"],
-            score=r["score"],
-            max_score=r["max_score"],
-            created_at=r["created_at"],
+        ResultRollup(
+            day=datetime.fromtimestamp(r["day"] * 86400, tz=timezone.utc).date().isoformat(),
+            count=r["count"],
+            avg_score=round(r["score_sum"] / r["count"], 3),
+            histogram=r["histogram"],
         )
-        for r in rows
+        for r in list_result_rollups(quiz_id)
     ]
 
 
+def _analysis_job(quiz_id: int):
+    def run(job: jobs.Job) -> dict:
+        job.step()
+        data = analysis.item_analysis(quiz_id)
+        if data is None:
+            raise jobs.Failed("quiz not found")
+        return ItemAnalysis(**data).model_dump(mode="json")
+
+    return run
+
+
+@router.get("/quizzes/{quiz_id}/analysis", response_model=ItemAnalysis, responses=ASYNC_RESPONSES)
+def quiz_item_analysis(
+    quiz_id: int, prefer: Optional[str] = PREFER, user: dict = Depends(get_current_user)
+):
+    # по сырым результатам в ретенции; пересчёт только после новых попыток или правки квиза
+    _ensure_quiz_owner(quiz_id, user)
+    if jobs.respond_async(prefer):
+        return submit_job("analysis", user, _analysis_job(quiz_id), priority=3)
+    data = analysis.item_analysis(quiz_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="quiz not found")
+    return ItemAnalysis(**data)
+
+
+@router.get("/quizzes/{quiz_id}/retention", response_model=RetentionRead)
+def get_quiz_retention(quiz_id: int, user: dict = Depends(get_current_user)):
+    _ensure_quiz_owner(quiz_id, user)
+    return RetentionRead(**get_retention(quiz_id))
+
+
+@router.put("/quizzes/{quiz_id}/retention", response_model=RetentionRead)
+def set_quiz_retention(quiz_id: int, data: RetentionUpdate, user: dict = Depends(get_current_user)):
+    _ensure_quiz_owner(quiz_id, user)
+    return RetentionRead(**set_retention(quiz_id, data.keep_last, data.keep_days))
+
+
 @router.get("/quizzes/{quiz_id}/my-results", response_model=List[ResultRead])
 def my_results(quiz_id: int, user: dict = Depends(get_current_user)):
     _ensure_quiz_owner(
         quiz_id, user
     )  # можно убрать, если хочешь, чтобы студент видел свои результаты даже в чужом квизе
     rows = list_results_for_quiz(quiz_id, user_id=user["id"])
+    return [_result_read(r) for r in rows]
+
+
+@router.get("/me/results", response_model=List[MyResultRead])
+async def my_results_all_quizzes(
+    response: Response,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, max_length=64),
+    user: dict = Depends(get_current_user),
+):
+    # свои попытки во всех квизах, последние сверху; следующий курсор — в X-Next-Cursor.
+    # Страница — из индекса пользователя, заголовки квизов — одним запросом на страницу
+    before_id = parse_cursor(cursor)
+    rows = await astorage.list_results_for_user(user["id"], limit + 1, before_id=before_id)
+    page = keyset_page(rows, limit, response)
+    titles = await astorage.get_quiz_titles(r["quiz_id"] for r in page)
     return [
-        ResultRead(
-            id=r["id"],
-            user_id=r["user_id"],
-            score=r["score"],
-            max_score=r["max_score"],
-            created_at=r["created_at"],
+        MyResultRead(
+            **_result_read(r).model_dump(),
+            quiz_id=r["quiz_id"],
+            quiz_title=titles.get(r["quiz_id"]),
         )
-        for r in rows
+        for r in page
     ]
+
+
+@router.get("/quizzes/{quiz_id}/leaderboard", response_model=List[LeaderboardEntry])
+def quiz_leaderboard(
+    quiz_id: int,
+    limit: int = Query(10, ge=1, le=leaderboard.LEADERBOARD_SIZE),
+    user: dict = Depends(get_current_user),
+):
+    _ensure_quiz_owner(quiz_id, user)
+    out = []
+    for rank, (neg_score, created_at, rid, uid, max_score) in enumerate(
+        leaderboard.top(quiz_id, limit), 1
+    ):
+        u = get_user_by_id(uid) if uid is not None else None
+        out.append(
+            LeaderboardEntry(
+                rank=rank,
+                id=rid,
+                user_id=uid,
+                username=u["username"] if u else None,
+                score=-neg_score,
+                max_score=max_score,
+                created_at=created_at,
+            )
+        )
+    return out
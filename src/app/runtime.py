@@ -0,0 +1,197 @@
+import asyncio
+import functools
+import os
+import time
+from collections import deque
+from typing import Callable, Deque, List, Optional
+
+import anyio.to_thread
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+
+# === Мониторинг рантайма: лаг event loop, очередь threadpool, ожидание потока ===
+# Все sync-обработчики выполняются в общем threadpool anyio; когда он занят (PBKDF2 на
+# логинах, тяжёлый _grade), запросы копятся в очереди лимитера — это и показываем.
+
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))  # потоки для sync-обработчиков
+HEALTH_MAX_LOOP_LAG_MS = float(os.getenv("HEALTH_MAX_LOOP_LAG_MS", "200"))
+HEALTH_MAX_THREAD_QUEUE = int(os.getenv("HEALTH_MAX_THREAD_QUEUE", "20"))
+HEALTH_MAX_THREAD_WAIT_MS = float(os.getenv("HEALTH_MAX_THREAD_WAIT_MS", "500"))  # p95
+LOOP_LAG_INTERVAL = 0.1  # секунды между замерами лага
+WINDOW = 1024  # сколько последних замеров держим
+
+
+def _percentile(samples: List[float], q: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class LoopLagMonitor:
+    """Периодически спит LOOP_LAG_INTERVAL и меряет, насколько позже проснулся."""
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL) -> None:
+        self.interval = interval
+        self.samples: Deque[float] = deque(maxlen=WINDOW // 8)
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - expected))
+
+    def last(self) -> Optional[float]:
+        return self.samples[-1] if self.samples else None
+
+
+class ThreadTimings:
+    """Для sync-обработчиков: сколько запрос ждал свободный поток и сколько выполнялся."""
+
+    def __init__(self) -> None:
+        self.waits: Deque[float] = deque(maxlen=WINDOW)
+        self.execs: Deque[float] = deque(maxlen=WINDOW)
+        self.total = 0
+
+    def observe(self, wait: float, exec_: float) -> None:
+        self.waits.append(wait)
+        self.execs.append(exec_)
+        self.total += 1
+
+
+class WarmUp:
+    """Прогрев после старта в фоне: пока он идёт, readiness отвечает 503 (warming_up)."""
+
+    def __init__(self) -> None:
+        self.seconds: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, steps: List[Callable[[], object]]) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run(steps))
+
+    async def _run(self, steps: List[Callable[[], object]]) -> None:
+        started = time.perf_counter()
+        for step in steps:
+            await run_in_threadpool(step)  # шаги синхронные: event loop не блокируем
+        self.seconds = time.perf_counter() - started
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+loop_lag = LoopLagMonitor()
+warmup = WarmUp()
+thread_timings = ThreadTimings()
+
+
+def _offload(endpoint: Callable) -> Callable:
+    # тот же переход в threadpool, что делает FastAPI для def-обработчика, но с замером
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        queued = time.perf_counter()
+
+        def call():
+            started = time.perf_counter()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                thread_timings.observe(started - queued, time.perf_counter() - started)
+
+        return await run_in_threadpool(call)
+
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """route_class для APIRouter: sync-обработчики выполняются в threadpool с замером."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs) -> None:
+        if not asyncio.iscoroutinefunction(endpoint):
+            endpoint = _offload(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def configure_threadpool(size: int = THREADPOOL_SIZE) -> None:
+    # лимитер anyio привязан к event loop, поэтому вызывается из lifespan
+    anyio.to_thread.current_default_thread_limiter().total_tokens = size
+
+
+def _ms(value: Optional[float]) -> Optional[float]:
+    return round(value * 1000, 2) if value is not None else None
+
+
+def snapshot() -> dict:
+    """Состояние рантайма для readiness; вызывать из event loop (нужен лимитер anyio)."""
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    queued = limiter.statistics().tasks_waiting
+    lag = loop_lag.last()
+    lag_max = max(loop_lag.samples) if loop_lag.samples else None
+    waits, execs = list(thread_timings.waits), list(thread_timings.execs)
+    wait_p95 = _percentile(waits, 0.95)
+
+    reasons = ["warming_up"] if warmup.pending else []
+    if lag is not None and lag * 1000 > HEALTH_MAX_LOOP_LAG_MS:
+        reasons.append("event_loop_lag")
+    if queued > HEALTH_MAX_THREAD_QUEUE:
+        reasons.append("threadpool_queue")
+    if wait_p95 is not None and wait_p95 * 1000 > HEALTH_MAX_THREAD_WAIT_MS:
+        reasons.append("threadpool_wait")
+
+    return {
+        "status": "degraded" if reasons else "ok",
+        "reasons": reasons,
+        "event_loop": {
+            "monitored": loop_lag.running,
+            "lag_ms": _ms(lag),
+            "lag_max_ms": _ms(lag_max),
+        },
+        "warmup": {
+            "pending": warmup.pending,
+            "seconds": round(warmup.seconds, 3) if warmup.seconds is not None else None,
+        },
+        "threadpool": {
+            "size": int(limiter.total_tokens),
+            "active": int(limiter.borrowed_tokens),
+            "queued": queued,
+        },
+        "requests": {
+            "observed": thread_timings.total,
+            "thread_wait_ms": {
+                "p50": _ms(_percentile(waits, 0.5)),
+                "p95": _ms(wait_p95),
+            },
+            "exec_ms": {
+                "p50": _ms(_percentile(execs, 0.5)),
+                "p95": _ms(_percentile(execs, 0.95)),
+            },
+        },
+    }
@@ -0,0 +1,20 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class JobProgress(BaseModel):
+    done: int
+    total: Optional[int] = None  # None — объём работы ещё не известен
+
+
+class JobRead(BaseModel):
+    id: str
+    kind: str
+    status: str  # queued | running | succeeded | failed | cancelled
+    progress: JobProgress
+    created_at: int  # epoch seconds
+    started_at: Optional[int] = None
+    finished_at: Optional[int] = None
+    error: Optional[str] = None
+    result_url: Optional[str] = None  # есть, когда задача succeeded
@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -27,6 +27,20 @@ class ChoicePublic(ChoiceBase):
     pass  # в превью правильность не выдаем
 
 
+# ---------- Accepted answers (text) ----------
+class MatchMode(str, Enum):
+    exact = "exact"  # посимвольно
+    normalized = "normalized"  # без учёта регистра, пробелов и пунктуации
+    regex = "regex"  # fullmatch
+    fuzzy = "fuzzy"  # расстояние Левенштейна после нормализации
+
+
+class AcceptedAnswer(BaseModel):
+    mode: MatchMode = MatchMode.normalized
+    value: str = Field(min_length=1, max_length=300)
+    max_distance: int = Field(default=1, ge=1, le=5)  # только для fuzzy
+
+
 # ---------- Questions ----------
 class QuestionBase(BaseModel):
     text: str = Field(min_length=1, max_length=1000)
@@ -36,17 +50,46 @@ class QuestionBase(BaseModel):
 class QuestionCreate(QuestionBase):
     quiz_id: int
     choices: Optional[List[ChoiceCreate]] = None
+    accepted_answers: Optional[List[AcceptedAnswer]] = Field(default=None, max_length=50)
 
 
 class QuestionUpdate(BaseModel):
     text: Optional[str] = Field(default=None, min_length=1, max_length=1000)
     type: Optional[QuestionType] = None
     choices: Optional[List[ChoiceCreate]] = None  # полная замена, если передано
+    accepted_answers: Optional[List[AcceptedAnswer]] = Field(default=None, max_length=50)
+
+
+# ---------- Bulk ----------
+MAX_BULK_OPS = 500
+
+
+class QuestionBulkCreate(QuestionBase):
+    choices: Optional[List[ChoiceCreate]] = None
+    accepted_answers: Optional[List[AcceptedAnswer]] = Field(default=None, max_length=50)
+    position: Optional[int] = Field(default=None, ge=0)  # индекс в итоговом списке; None — в конец
+
+
+class QuestionBulkUpdate(QuestionUpdate):
+    id: int
+
+
+class QuestionBulk(BaseModel):
+    create: List[QuestionBulkCreate] = Field(default_factory=list, max_length=MAX_BULK_OPS)
+    update: List[QuestionBulkUpdate] = Field(default_factory=list, max_length=MAX_BULK_OPS)
+    delete: List[int] = Field(default_factory=list, max_length=MAX_BULK_OPS)
+    order: Optional[List[int]] = Field(default=None, max_length=10_000)  # все оставшиеся id
 
 
 class QuestionRead(QuestionBase):
     id: int
     choices: Optional[List[ChoiceRead]] = None
+    accepted_answers: Optional[List[AcceptedAnswer]] = None  # видит только владелец
+
+
+class QuestionAttempt(QuestionBase):
+    id: int
+    choices: Optional[List[ChoiceRead]] = None  # id вариантов нужны для submit
 
 
 class QuestionPublic(QuestionBase):
@@ -68,7 +111,14 @@ class QuizRead(BaseModel):
     title: str
 
 
+class QuizClone(BaseModel):
+    title: Optional[str] = Field(
+        default=None, min_length=1, max_length=200
+    )  # None — как у исходного
+
+
 class QuizDetail(QuizRead):
+    version: Optional[int] = None
     questions: List[QuestionRead] = []
 
 
@@ -76,12 +126,17 @@ class QuizPreview(QuizRead):
     questions: List[QuestionPublic] = []
 
 
+class QuizSearchHit(QuizRead):
+    score: float
+    question_ids: List[int] = []  # вопросы квиза, совпавшие с запросом
+
+
 # ---------- Passing (submit) ----------
 class Answer(BaseModel):
     question_id: int
     choice_id: Optional[int] = None  # для single
     choice_ids: Optional[List[int]] = None  # для multiple
-    text: Optional[str] = None  # для text
+    text: Optional[str] = Field(default=None, max_length=1000)  # для text
 
 
 class SubmitRequest(BaseModel):
@@ -93,9 +148,72 @@ class SubmitResult(BaseModel):
     max_score: int
 
 
+# ---------- Attempt sessions ----------
+class AttemptCreate(BaseModel):
+    count: Optional[int] = Field(default=None, ge=1, le=500)  # None — все вопросы
+    shuffle_choices: bool = True
+
+
+class AttemptRead(QuizRead):
+    session_id: str
+    expires_at: int  # epoch seconds
+    questions: List[QuestionAttempt] = []
+
+
 class ResultRead(BaseModel):
     id: int
     user_id: Optional[int] = None
     score: int
     max_score: int
+    quiz_version: Optional[int] = None  # версия квиза, по которой оценён результат
     created_at: int  # epoch seconds
+
+
+class MyResultRead(ResultRead):
+    quiz_id: int
+    quiz_title: Optional[str] = None  # None — квиз удалён
+
+
+class LeaderboardEntry(ResultRead):
+    rank: int
+    username: Optional[str] = None
+
+
+# ---------- Retention ----------
+class RetentionUpdate(BaseModel):
+    keep_last: Optional[int] = Field(default=None, ge=1, le=1_000_000)  # None — без лимита
+    keep_days: Optional[int] = Field(default=None, ge=1, le=3650)
+
+
+class RetentionRead(RetentionUpdate):
+    pass
+
+
+class ResultRollup(BaseModel):
+    day: str  # YYYY-MM-DD (UTC)
+    count: int
+    avg_score: float
+    histogram: Dict[int, int]  # score -> число результатов
+
+
+# ---------- Item analysis ----------
+class ChoiceAnalysis(BaseModel):
+    choice_id: int
+    is_correct: bool
+    picked: int
+    rate: float  # доля попыток, выбравших вариант
+    mean_score: Optional[float] = None  # средний балл выбравших (для дистракторов)
+
+
+class QuestionAnalysis(BaseModel):
+    question_id: int
+    type: QuestionType
+    answered: int
+    difficulty: Optional[float] = None  # доля верных ответов
+    discrimination: Optional[float] = None  # точечно-бисериальная, с суммой без вопроса
+    choices: List[ChoiceAnalysis]
+
+
+class ItemAnalysis(BaseModel):
+    submissions: int
+    questions: List[QuestionAnalysis]
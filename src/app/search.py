@@ -0,0 +1,169 @@
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from app import memory
+
+# === Полнотекстовый поиск: инвертированный индекс в памяти, отдельный на каждого владельца ===
+# Документы: заголовок квиза (ключ -quiz_id) и вопрос вместе с текстами вариантов
+# (ключ question_id). storage поддерживает индекс инкрементально, передавая тексты
+# при каждом изменении.
+
+_TOKEN_RE = re.compile(r"\w+")
+MAX_QUERY_TERMS = 8
+MAX_PREFIX_EXPANSION = 64  # сколько слов словаря максимум раскрывает один префикс
+MAX_MATCHED_QUESTIONS = 20
+TITLE_WEIGHT = 3.0
+PREFIX_WEIGHT = 0.5
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.casefold())
+
+
+class _OwnerIndex:
+    __slots__ = ("postings", "vocab", "docs")
+
+    def __init__(self) -> None:
+        self.postings: Dict[str, Dict[int, int]] = {}  # term -> {doc_key: tf}
+        self.vocab: List[str] = []  # отсортированный словарь для префиксного поиска
+        self.docs = 0
+
+    def add(self, key: int, text: str) -> None:
+        for term, n in Counter(tokenize(text)).items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = {}
+                insort(self.vocab, term)
+            posting[key] = posting.get(key, 0) + n
+
+    def remove(self, key: int, text: str) -> None:
+        for term, n in Counter(tokenize(text)).items():
+            posting = self.postings.get(term)
+            if posting is None or key not in posting:
+                continue
+            left = posting[key] - n
+            if left > 0:
+                posting[key] = left
+                continue
+            del posting[key]
+            if not posting:
+                del self.postings[term]
+                i = bisect_left(self.vocab, term)
+                if i < len(self.vocab) and self.vocab[i] == term:
+                    del self.vocab[i]
+
+    def expand(self, term: str) -> List[Tuple[str, float]]:
+        # точное совпадение весит больше, чем продолжение префикса
+        out = []
+        i = bisect_left(self.vocab, term)
+        while i < len(self.vocab) and len(out) < MAX_PREFIX_EXPANSION:
+            word = self.vocab[i]
+            if not word.startswith(term):
+                break
+            out.append((word, 1.0 if word == term else PREFIX_WEIGHT))
+            i += 1
+        return out
+
+
+_INDEXES: Dict[int, _OwnerIndex] = {}
+_QUESTION_QUIZ: Dict[int, int] = {}  # question_id -> quiz_id
+memory.register("search.indexes", lambda: _INDEXES)
+memory.register("search.question_quiz", lambda: _QUESTION_QUIZ, index=True)
+
+
+def _index(owner_id: int) -> _OwnerIndex:
+    idx = _INDEXES.get(owner_id)
+    if idx is None:
+        idx = _INDEXES[owner_id] = _OwnerIndex()
+    return idx
+
+
+# --- Quiz ---
+def index_quiz(owner_id: int, quiz_id: int, title: str) -> None:
+    idx = _index(owner_id)
+    idx.add(-quiz_id, title)
+    idx.docs += 1
+
+
+def retitle_quiz(owner_id: int, quiz_id: int, old_title: str, new_title: str) -> None:
+    idx = _index(owner_id)
+    idx.remove(-quiz_id, old_title)
+    idx.add(-quiz_id, new_title)
+
+
+def unindex_quiz(owner_id: int, quiz_id: int, title: str) -> None:
+    idx = _index(owner_id)
+    idx.remove(-quiz_id, title)
+    idx.docs -= 1
+
+
+# --- Question (+ тексты вариантов) ---
+def index_question(owner_id: int, quiz_id: int, question_id: int, text: str) -> None:
+    idx = _index(owner_id)
+    idx.add(question_id, text)
+    idx.docs += 1
+    _QUESTION_QUIZ[question_id] = quiz_id
+
+
+def add_question_text(owner_id: int, question_id: int, text: str) -> None:
+    if question_id in _QUESTION_QUIZ:
+        _index(owner_id).add(question_id, text)
+
+
+def remove_question_text(owner_id: int, question_id: int, text: str) -> None:
+    if question_id in _QUESTION_QUIZ:
+        _index(owner_id).remove(question_id, text)
+
+
+def unindex_question(owner_id: int, question_id: int, text: str) -> None:
+    if _QUESTION_QUIZ.pop(question_id, None) is None:
+        return
+    idx = _index(owner_id)
+    idx.remove(question_id, text)
+    idx.docs -= 1
+
+
+# --- Query ---
+def search(owner_id: int, query: str, limit: int, offset: int = 0) -> List[Tuple[int, float, list]]:
+    """
+    Ищет квизы владельца: каждое слово запроса — префикс, квиз должен содержать все слова
+    (в заголовке, вопросах или вариантах). Возвращает [(quiz_id, score, question_ids)]
+    по убыванию score; score = сумма tf * idf * вес (заголовок, точное/префиксное совпадение).
+    """
+    idx = _INDEXES.get(owner_id)
+    terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+    if idx is None or not terms:
+        return []
+
+    scores: Dict[int, float] = {}
+    matched: Dict[int, set] = {}
+    for n, term in enumerate(terms):
+        term_scores: Dict[int, float] = {}
+        for word, weight in idx.expand(term):
+            posting = idx.postings[word]
+            idf = math.log(1.0 + idx.docs / len(posting))
+            for key, tf in posting.items():
+                if key < 0:
+                    quiz_id, w = -key, TITLE_WEIGHT
+                else:
+                    quiz_id, w = _QUESTION_QUIZ[key], 1.0
+                    if n > 0 and quiz_id not in scores:
+                        continue
+                    matched.setdefault(quiz_id, set()).add(key)
+                term_scores[quiz_id] = term_scores.get(quiz_id, 0.0) + tf * idf * weight * w
+        if n == 0:
+            scores = term_scores
+        else:
+            scores = {q: s + term_scores[q] for q, s in scores.items() if q in term_scores}
+        if not scores:
+            return []
+
+    top = heapq.nsmallest(offset + limit, scores.items(), key=lambda kv: (-kv[1], kv[0]))
+    return [
+        (quiz_id, round(score, 4), sorted(matched.get(quiz_id, ()))[:MAX_MATCHED_QUESTIONS])
+        for quiz_id, score in top[offset:]
+    ]
@@ -1,5 +1,27 @@
+import functools
+import os
+import threading
 import time
-from typing import Dict, List, Optional
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+from app import leaderboard, live, memory, search
+
+# === Индексы владельцев: отсортированные списки id ===
+
+
+def _page_ids(ids: List[int], limit: int, offset: int, after_id: Optional[int]) -> List[int]:
+    # ids отсортированы (автоинкремент), поэтому keyset-страница — это bisect + срез
+    start = bisect_right(ids, after_id) if after_id is not None else offset
+    return ids[start : start + limit]
+
+
+def _drop_owned_id(ids: List[int], row_id: int) -> None:
+    i = bisect_left(ids, row_id)
+    if i < len(ids) and ids[i] == row_id:
+        del ids[i]
+
 
 # === USERS ===
 _next_user_id = 1
@@ -31,6 +53,8 @@ def get_user_by_id(user_id: int) -> Optional[dict]:
 # === ITEMS (демо для тестов курса) ===
 _next_item_id = 1
 ITEMS: List[dict] = []  # {"id": int, "name": str, "owner_id": int}
+ITEMS_BY_ID: Dict[int, dict] = {}
+ITEM_IDS_BY_OWNER: Dict[int, List[int]] = {}  # owner_id -> id по возрастанию
 
 
 def create_item(owner_id: int, name: str) -> dict:
@@ -39,20 +63,24 @@ def create_item(owner_id: int, name: str) -> dict:
     _next_item_id += 1
     item = {"id": iid, "name": name, "owner_id": owner_id}
     ITEMS.append(item)
+    ITEMS_BY_ID[iid] = item
+    ITEM_IDS_BY_OWNER.setdefault(owner_id, []).append(iid)
     return item
 
 
 def get_item(item_id: int) -> Optional[dict]:
-    return next((it for it in ITEMS if it["id"] == item_id), None)
+    return ITEMS_BY_ID.get(item_id)
 
 
 def list_items_all(limit: int, offset: int) -> List[dict]:
     return ITEMS[offset : offset + limit]
 
 
-def list_items_by_owner(owner_id: int, limit: int, offset: int) -> List[dict]:
-    owned = [it for it in ITEMS if it["owner_id"] == owner_id]
-    return owned[offset : offset + limit]
+def list_items_by_owner(
+    owner_id: int, limit: int, offset: int = 0, after_id: Optional[int] = None
+) -> List[dict]:
+    ids = _page_ids(ITEM_IDS_BY_OWNER.get(owner_id, []), limit, offset, after_id)
+    return [ITEMS_BY_ID[i] for i in ids]
 
 
 def update_item_name(item_id: int, new_name: str) -> Optional[dict]:
@@ -64,11 +92,12 @@ def update_item_name(item_id: int, new_name: str) -> Optional[dict]:
 
 
 def delete_item(item_id: int) -> bool:
-    for i, it in enumerate(ITEMS):
-        if it["id"] == item_id:
-            del ITEMS[i]
-            return True
-    return False
+    it = ITEMS_BY_ID.pop(item_id, None)
+    if not it:
+        return False
+    _drop_owned_id(ITEM_IDS_BY_OWNER.get(it["owner_id"], []), item_id)
+    ITEMS.remove(it)
+    return True
 
 
 # === QUIZZES / QUESTIONS / CHOICES ===
@@ -76,113 +105,691 @@ _next_quiz_id = 1
 _next_question_id = 1
 _next_choice_id = 1
 
-QUIZZES: List[dict] = []  # {"id", "title", "owner_id"}
-QUESTIONS: List[dict] = []  # {"id", "quiz_id", "text", "type"}
+QUIZZES: List[dict] = []  # {"id", "title", "owner_id", "version"}
+QUIZZES_BY_ID: Dict[int, dict] = {}
+QUIZ_IDS_BY_OWNER: Dict[int, List[int]] = {}  # owner_id -> id по возрастанию
+_DELETING: Dict[int, dict] = {}  # скрытые квизы, чьи вопросы ещё удаляются (hide_quiz)
+# Словари вопросов и вариантов после создания не меняются: правка вопроса подменяет его
+# новым словарём (copy-on-write), поэтому снимки версий ниже могут ссылаться на них напрямую.
+# {"id", "quiz_id", "text", "type", "accepted"}; порядок вставки — порядок создания
+QUESTIONS_BY_ID: Dict[int, dict] = {}
+QUESTIONS_BY_QUIZ: Dict[int, List[dict]] = {}  # quiz_id -> вопросы в порядке создания
 CHOICES: List[dict] = []  # {"id", "question_id", "text", "is_correct"}
+CHOICES_BY_QUESTION: Dict[int, List[dict]] = {}  # question_id -> варианты в порядке создания
+
+# Read-copy-update: все изменения квизов, вопросов и вариантов идут под _WRITE_LOCK, и в
+# конце внешней операции для каждого затронутого квиза собирается неизменяемый снимок
+# (QuizVersion) и публикуется одной заменой ссылки в _CURRENT. Читатели (quiz_version,
+# list_questions_by_quiz, list_choices_by_question) берут снимок из _CURRENT без блокировок
+# и видят квиз целиком до или целиком после правки — не промежуточное состояние списков.
+_WRITE_LOCK = threading.RLock()  # реентерабельная: delete_quiz -> delete_question -> ...
+_write_depth = 0
+# квиз -> id изменённых вопросов за текущую операцию; None в множестве — порядок или состав
+# вопросов изменился (снимок собирается заново, а не правкой предыдущего)
+_DIRTY: Dict[int, set] = {}
+_BUMPED: set = set()  # квизы, чья версия уже выросла за текущую операцию: одна правка — +1
+
+
+def _writer(fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        global _write_depth
+        with _WRITE_LOCK:
+            _write_depth += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _write_depth -= 1
+                if _write_depth == 0:
+                    _BUMPED.clear()
+                    while _DIRTY:
+                        _publish(*_DIRTY.popitem())
+
+    return wrapper
 
 
 # --- Quiz ---
+@_writer
 def create_quiz(owner_id: int, title: str) -> dict:
     global _next_quiz_id
     qid = _next_quiz_id
     _next_quiz_id += 1
-    quiz = {"id": qid, "title": title, "owner_id": owner_id}
+    # version растёт при каждом изменении вопросов/вариантов квиза
+    quiz = {"id": qid, "title": title, "owner_id": owner_id, "version": 1}
     QUIZZES.append(quiz)
+    QUIZZES_BY_ID[qid] = quiz
+    QUIZ_IDS_BY_OWNER.setdefault(owner_id, []).append(qid)
+    search.index_quiz(owner_id, qid, title)
+    _DIRTY.setdefault(qid, set()).add(None)
     return quiz
 
 
 def get_quiz(quiz_id: int) -> Optional[dict]:
-    return next((q for q in QUIZZES if q["id"] == quiz_id), None)
+    return QUIZZES_BY_ID.get(quiz_id)
 
 
-def list_quizzes_by_owner(owner_id: int, limit: int, offset: int) -> List[dict]:
-    owned = [q for q in QUIZZES if q["owner_id"] == owner_id]
-    return owned[offset : offset + limit]
+def list_quizzes_by_owner(
+    owner_id: int, limit: int, offset: int = 0, after_id: Optional[int] = None
+) -> List[dict]:
+    ids = _page_ids(QUIZ_IDS_BY_OWNER.get(owner_id, []), limit, offset, after_id)
+    return [QUIZZES_BY_ID[i] for i in ids]
 
 
+@_writer
 def update_quiz_title(quiz_id: int, title: str) -> Optional[dict]:
     q = get_quiz(quiz_id)
     if not q:
         return None
+    search.retitle_quiz(q["owner_id"], quiz_id, q["title"], title)
     q["title"] = title
     return q
 
 
+@_writer
+def hide_quiz(quiz_id: int) -> bool:
+    # первая половина удаления: квиз снимается с публикации и пропадает для всех читателей
+    # (get_quiz / quiz_version -> None), из списка владельца и поиска. Вопросы остаются до
+    # delete_quiz — сразу или после порций delete_quiz_questions (фоновая задача)
+    quiz = QUIZZES_BY_ID.pop(quiz_id, None)
+    if not quiz:
+        return False
+    _DELETING[quiz_id] = quiz
+    _drop_virtual(quiz_id)  # клон без правок: своих вопросов нет, удалять нечего
+    with _VERSIONS_LOCK:
+        for version in QUIZ_VERSIONS.pop(quiz_id, ()):
+            _VERSION_LEASES.pop((quiz_id, version), None)
+    _DIRTY.setdefault(quiz_id, set()).add(None)  # квиза нет — _publish снимет снимок
+    _drop_owned_id(QUIZ_IDS_BY_OWNER.get(quiz["owner_id"], []), quiz_id)
+    QUIZZES.remove(quiz)
+    search.unindex_quiz(quiz["owner_id"], quiz_id, quiz["title"])
+    leaderboard.drop(quiz_id)
+    return True
+
+
+@_writer
 def delete_quiz(quiz_id: int) -> bool:
-    # каскадно удаляем вопросы и варианты
-    to_delete_q = [qq["id"] for qq in QUESTIONS if qq["quiz_id"] == quiz_id]
-    for qid in to_delete_q:
-        delete_question(qid)
-    for i, q in enumerate(QUIZZES):
-        if q["id"] == quiz_id:
-            del QUIZZES[i]
-            return True
-    return False
+    if not hide_quiz(quiz_id) and quiz_id not in _DELETING:
+        return False
+    # каскадно удаляем вопросы и варианты — одним пакетом: глобальные списки пересобираются
+    # один раз, а не на каждый вопрос
+    to_delete_q = [qq["id"] for qq in QUESTIONS_BY_QUIZ.get(quiz_id, ())]
+    if to_delete_q:
+        apply_question_batch(quiz_id, [], {}, to_delete_q)
+    del _DELETING[quiz_id]
+    return True
+
+
+@_writer
+def delete_quiz_questions(quiz_id: int, limit: int) -> int:
+    # порция каскадного удаления скрытого квиза (hide_quiz): между порциями блокировка записи
+    # свободна; возвращает, сколько вопросов осталось
+    to_delete_q = [qq["id"] for qq in QUESTIONS_BY_QUIZ.get(quiz_id, ())[:limit]]
+    if to_delete_q:
+        apply_question_batch(quiz_id, [], {}, to_delete_q)
+    return len(QUESTIONS_BY_QUIZ.get(quiz_id, ()))
 
 
 # --- Question ---
-def create_question(quiz_id: int, text: str, qtype: str) -> dict:
-    global _next_question_id
-    qnid = _next_question_id
-    _next_question_id += 1
-    question = {"id": qnid, "quiz_id": quiz_id, "text": text, "type": qtype}
-    QUESTIONS.append(question)
+@_writer
+def create_question(
+    quiz_id: int,
+    text: str,
+    qtype: str,
+    accepted: Optional[List[dict]] = None,
+    choices: Sequence[Tuple[str, bool]] = (),  # (text, is_correct): в той же операции записи
+) -> dict:
+    _materialize(quiz_id)
+    # accepted — допустимые ответы text-вопроса: [{"mode", "value", "max_distance"}]
+    question = _new_question(quiz_id, text, qtype, accepted)
+    qnid = question["id"]
+    QUESTIONS_BY_QUIZ.setdefault(quiz_id, []).append(question)
+    owner_id = _quiz_owner(quiz_id)
+    if owner_id is not None:
+        search.index_question(owner_id, quiz_id, qnid, text)
+    _touch_quiz(quiz_id, qnid)
+    for choice_text, is_correct in choices:
+        create_choice(qnid, choice_text, is_correct)
     return question
 
 
 def get_question(question_id: int) -> Optional[dict]:
-    return next((q for q in QUESTIONS if q["id"] == question_id), None)
+    q = QUESTIONS_BY_ID.get(question_id)
+    return q if q is not None else _virtual_question(question_id)
+
+
+def _touch_quiz(quiz_id: int, question_id: Optional[int] = None) -> None:
+    # question_id — правка одного вопроса (или новый в конце), None — порядок/состав вопросов
+    quiz = QUIZZES_BY_ID.get(quiz_id)
+    if quiz:
+        if quiz_id not in _BUMPED:
+            quiz["version"] += 1
+            _BUMPED.add(quiz_id)
+        _DIRTY.setdefault(quiz_id, set()).add(question_id)
+
+
+def _quiz_owner(quiz_id: int) -> Optional[int]:
+    # скрытый квиз тоже: его вопросы при удалении убираются из поиска владельца
+    quiz = QUIZZES_BY_ID.get(quiz_id) or _DELETING.get(quiz_id)
+    return quiz["owner_id"] if quiz else None
+
+
+def _question_owner(question_id: int) -> Optional[int]:
+    q = get_question(question_id)
+    return _quiz_owner(q["quiz_id"]) if q else None
 
 
 def list_questions_by_quiz(quiz_id: int) -> List[dict]:
-    return [q for q in QUESTIONS if q["quiz_id"] == quiz_id]
+    snap = quiz_version(quiz_id)
+    return list(snap.rows()) if snap else []
+
+
+def _live_questions(quiz_id: int) -> List[dict]:
+    # текущие списки; только под _WRITE_LOCK (запись и сборка снимка)
+    virtual = _VIRTUAL.get(quiz_id)
+    if virtual is not None:
+        return [_clone_question(quiz_id, virtual, i) for i in range(len(virtual[0].questions))]
+    return list(QUESTIONS_BY_QUIZ.get(quiz_id, ()))
 
 
+def _replace_question(old: dict, new: dict) -> None:
+    QUESTIONS_BY_ID[new["id"]] = new
+    rows = QUESTIONS_BY_QUIZ.get(old["quiz_id"], [])
+    # позиция — из опубликованного снимка; проверяем, что он не отстал от списка
+    # (перестановка в той же операции записи), иначе — поиск по списку
+    snap = _CURRENT.get(old["quiz_id"])
+    pos = snap.positions().get(old["id"]) if snap is not None else None
+    if pos is None or pos >= len(rows) or rows[pos] is not old:
+        pos = next((i for i, row in enumerate(rows) if row is old), None)
+    if pos is not None:
+        rows[pos] = new
+
+
+@_writer
 def update_question(
-    question_id: int, *, text: Optional[str] = None, qtype: Optional[str] = None
+    question_id: int,
+    *,
+    text: Optional[str] = None,
+    qtype: Optional[str] = None,
+    accepted: Optional[List[dict]] = None,  # [] — очистить
+    choices: Optional[Sequence[Tuple[str, bool]]] = None,  # None — не трогать, иначе заменить
 ) -> Optional[dict]:
-    q = get_question(question_id)
-    if not q:
+    # вопрос и его варианты меняются одной операцией записи: читатели и попытки видят квиз
+    # до правки или после, а не вопрос без вариантов
+    _materialize_question(question_id)
+    old = QUESTIONS_BY_ID.get(question_id)
+    if not old:
         return None
+    q = dict(old)  # старый словарь остаётся в снимках прежних версий
     if text is not None:
+        owner_id = _quiz_owner(q["quiz_id"])
+        if owner_id is not None:
+            search.remove_question_text(owner_id, question_id, q["text"])
+            search.add_question_text(owner_id, question_id, text)
         q["text"] = text
     if qtype is not None:
         q["type"] = qtype
+    if accepted is not None:
+        q["accepted"] = accepted or None
+    _replace_question(old, q)
+    _touch_quiz(q["quiz_id"], question_id)
+    if choices is not None:
+        delete_choices_for_question(question_id)
+        for choice_text, is_correct in choices:
+            create_choice(question_id, choice_text, is_correct)
     return q
 
 
+@_writer
 def delete_question(question_id: int) -> bool:
     # удалить все choices вопроса
+    _materialize_question(question_id)
     delete_choices_for_question(question_id)
-    for i, q in enumerate(QUESTIONS):
-        if q["id"] == question_id:
-            del QUESTIONS[i]
-            return True
-    return False
+    q = QUESTIONS_BY_ID.pop(question_id, None)
+    if not q:
+        return False
+    _QUESTION_VERSIONS.pop(question_id, None)
+    owner_id = _quiz_owner(q["quiz_id"])
+    if owner_id is not None:
+        search.unindex_question(owner_id, question_id, q["text"])
+    siblings = QUESTIONS_BY_QUIZ.get(q["quiz_id"])
+    if siblings is not None:
+        siblings.remove(q)
+        if not siblings:
+            del QUESTIONS_BY_QUIZ[q["quiz_id"]]
+    _touch_quiz(q["quiz_id"])
+    return True
 
 
 # --- Choice ---
+@_writer
 def create_choice(question_id: int, text: str, is_correct: bool) -> dict:
     global _next_choice_id
+    _materialize_question(question_id)
     cid = _next_choice_id
     _next_choice_id += 1
     choice = {"id": cid, "question_id": question_id, "text": text, "is_correct": is_correct}
     CHOICES.append(choice)
+    CHOICES_BY_QUESTION.setdefault(question_id, []).append(choice)
+    _QUESTION_VERSIONS.pop(question_id, None)
+    owner_id = _question_owner(question_id)
+    if owner_id is not None:
+        search.add_question_text(owner_id, question_id, text)
+    q = QUESTIONS_BY_ID.get(question_id)
+    if q:
+        _touch_quiz(q["quiz_id"], question_id)
     return choice
 
 
 def list_choices_by_question(question_id: int) -> List[dict]:
-    return [c for c in CHOICES if c["question_id"] == question_id]
+    q = get_question(question_id)
+    snap = quiz_version(q["quiz_id"]) if q else None
+    qv = snap.question(question_id) if snap else None
+    return list(qv.choices) if qv else []
+
 
+def _live_choices(question_id: int) -> List[dict]:
+    choices = CHOICES_BY_QUESTION.get(question_id)
+    if choices is None and question_id not in QUESTIONS_BY_ID:
+        return _virtual_choices(question_id)
+    return list(choices or ())
 
+
+@_writer
 def delete_choices_for_question(question_id: int) -> None:
-    global CHOICES
-    CHOICES = [c for c in CHOICES if c["question_id"] != question_id]
+    _materialize_question(question_id)
+    owner_id = _question_owner(question_id)
+    kept = []
+    for c in CHOICES:
+        if c["question_id"] != question_id:
+            kept.append(c)
+        elif owner_id is not None:
+            search.remove_question_text(owner_id, question_id, c["text"])
+    q = QUESTIONS_BY_ID.get(question_id)
+    if q and len(kept) != len(CHOICES):
+        _touch_quiz(q["quiz_id"], question_id)
+    CHOICES[:] = kept  # на месте: список не подменяется под ногами у чужого обхода
+    CHOICES_BY_QUESTION.pop(question_id, None)
+    _QUESTION_VERSIONS.pop(question_id, None)
+
+
+# --- Bulk ---
+@_writer
+def apply_question_batch(
+    quiz_id: int,
+    create: List[dict],  # {"text", "type", "accepted", "choices": [(text, is_correct)], "position"}
+    update: Dict[int, dict],  # question_id -> {"text", "qtype", "accepted", "choices"}
+    delete: List[int],
+    order: Optional[List[int]] = None,  # новый порядок оставшихся вопросов
+) -> List[dict]:
+    """
+    Все правки вопросов квиза за один проход: глобальные списки пересобираются не больше
+    одного раза, версия квиза растёт один раз. Проверки (id из этого квиза, типы и
+    варианты, order — перестановка оставшихся) делает вызывающий до вызова.
+    choices в update: None — не трогать, список — заменить целиком.
+    """
+    _materialize(quiz_id)
+    owner_id = _quiz_owner(quiz_id)
+    deleted = set(delete)
+    replaced: Dict[int, dict] = {}
+    dropped = set(deleted)  # вопросы, чьи варианты уходят целиком
+
+    for qid, changes in update.items():
+        q = dict(QUESTIONS_BY_ID[qid])  # copy-on-write, как в update_question
+        if changes.get("text") is not None:
+            if owner_id is not None:
+                search.remove_question_text(owner_id, qid, q["text"])
+                search.add_question_text(owner_id, qid, changes["text"])
+            q["text"] = changes["text"]
+        if changes.get("qtype") is not None:
+            q["type"] = changes["qtype"]
+        if changes.get("accepted") is not None:
+            q["accepted"] = changes["accepted"] or None
+        QUESTIONS_BY_ID[qid] = replaced[qid] = q
+        if changes.get("choices") is not None:
+            dropped.add(qid)
+
+    for qid in dropped:
+        for c in CHOICES_BY_QUESTION.pop(qid, ()):
+            if owner_id is not None:
+                search.remove_question_text(owner_id, qid, c["text"])
+        _QUESTION_VERSIONS.pop(qid, None)
+    if dropped:
+        CHOICES[:] = [c for c in CHOICES if c["question_id"] not in dropped]
+    for qid in deleted:
+        q = QUESTIONS_BY_ID.pop(qid)
+        if owner_id is not None:
+            search.unindex_question(owner_id, qid, q["text"])
+
+    rows = [
+        replaced.get(q["id"], q)
+        for q in QUESTIONS_BY_QUIZ.get(quiz_id, ())
+        if q["id"] not in deleted
+    ]
+    if order is not None:
+        by_id = {q["id"]: q for q in rows}
+        rows = [by_id[qid] for qid in order]
+    for qid, changes in update.items():
+        if changes.get("choices"):
+            _add_choices(owner_id, qid, changes["choices"])
+    for item in create:
+        q = _new_question(quiz_id, item["text"], item["type"], item.get("accepted"))
+        if owner_id is not None:
+            search.index_question(owner_id, quiz_id, q["id"], q["text"])
+        _add_choices(owner_id, q["id"], item.get("choices") or ())
+        if item.get("position") is not None:
+            rows.insert(item["position"], q)
+        else:
+            rows.append(q)
+
+    if rows:
+        QUESTIONS_BY_QUIZ[quiz_id] = rows
+    else:
+        QUESTIONS_BY_QUIZ.pop(quiz_id, None)
+    _touch_quiz(quiz_id)
+    return list(rows)
+
+
+def _new_question(quiz_id: int, text: str, qtype: str, accepted: Optional[List[dict]]) -> dict:
+    global _next_question_id
+    qnid = _next_question_id
+    _next_question_id += 1
+    question = {"id": qnid, "quiz_id": quiz_id, "text": text, "type": qtype, "accepted": accepted}
+    QUESTIONS_BY_ID[qnid] = question
+    return question
+
+
+def _add_choices(owner_id: Optional[int], question_id: int, choices) -> None:
+    global _next_choice_id
+    rows = CHOICES_BY_QUESTION.setdefault(question_id, [])
+    for text, is_correct in choices:
+        choice = {
+            "id": _next_choice_id,
+            "question_id": question_id,
+            "text": text,
+            "is_correct": is_correct,
+        }
+        _next_choice_id += 1
+        CHOICES.append(choice)
+        rows.append(choice)
+        if owner_id is not None:
+            search.add_question_text(owner_id, question_id, text)
+    if not rows:
+        del CHOICES_BY_QUESTION[question_id]
+
+
+# === Версии квизов: неизменяемые снимки и клоны ===
+# quiz["version"] растёт при каждой правке; снимок текущей версии публикуется в _CURRENT в
+# конце операции записи (см. _writer). В историю QUIZ_VERSIONS версию кладёт pin_version — по
+# ней оценивают результат или начинают попытку; история квиза ограничена QUIZ_VERSIONS_KEEP
+# версиями (вытесняются давно закреплённые), но версии живых попыток не вытесняются до конца
+# их срока. Снимок — кортеж QuestionVersion; снимок неизменённого вопроса переиспользуют все
+# следующие версии, поэтому правка одного вопроса стоит кортежа указателей, а не копии квиза.
+
+QUIZ_VERSIONS_KEEP = int(os.getenv("QUIZ_VERSIONS_KEEP", "16"))  # прошлых версий на квиз
+
+
+class QuestionVersion:
+    __slots__ = ("question", "choices", "__weakref__")
+
+    def __init__(self, question: dict, choices: Tuple[dict, ...]) -> None:
+        self.question = question
+        self.choices = choices
+
+
+class QuizVersion:
+    __slots__ = ("quiz_id", "version", "questions", "_offsets", "_positions", "_rows")
+
+    def __init__(
+        self,
+        quiz_id: int,
+        version: int,
+        questions: Tuple[QuestionVersion, ...],
+        positions: Optional[Dict[int, int]] = None,  # question_id -> индекс, см. _publish
+    ) -> None:
+        self.quiz_id = quiz_id
+        self.version = version
+        self.questions = questions
+        self._offsets: Optional[Tuple[int, ...]] = None
+        self._positions = positions
+        self._rows: Optional[Tuple[dict, ...]] = None
+
+    # Ленивые поля ниже заполняют читатели без блокировки: гонка двух читателей безвредна,
+    # оба вычислят одно и то же по неизменяемому снимку.
+    def positions(self) -> Dict[int, int]:
+        if self._positions is None:
+            self._positions = {qv.question["id"]: i for i, qv in enumerate(self.questions)}
+        return self._positions
+
+    def question(self, question_id: int) -> Optional[QuestionVersion]:
+        pos = self.positions().get(question_id)
+        return self.questions[pos] if pos is not None and pos < len(self.questions) else None
+
+    def rows(self) -> Tuple[dict, ...]:
+        if self._rows is None:
+            self._rows = tuple(qv.question for qv in self.questions)
+        return self._rows
+
+    def choice_offsets(self) -> Tuple[int, ...]:
+        # номер первого варианта каждого вопроса (+ всего в конце); нужен только клонам
+        if self._offsets is None:
+            offsets, n = [], 0
+            for qv in self.questions:
+                offsets.append(n)
+                n += len(qv.choices)
+            self._offsets = (*offsets, n)
+        return self._offsets
+
+
+_CURRENT: Dict[int, QuizVersion] = {}  # quiz_id -> опубликованный снимок текущей версии
+# quiz_id -> version -> снимок; порядок — от давно закреплённых к недавним
+QUIZ_VERSIONS: Dict[int, "OrderedDict[int, QuizVersion]"] = {}
+_VERSION_LEASES: Dict[Tuple[int, int], int] = {}  # (quiz_id, version) -> срок попытки на ней
+_VERSIONS_LOCK = threading.Lock()
+_QUESTION_VERSIONS: Dict[int, QuestionVersion] = {}  # question_id -> снимок текущего вопроса
+
+
+def quiz_version(quiz_id: int, version: Optional[int] = None) -> Optional[QuizVersion]:
+    """Снимок квиза без блокировок; без version — текущий опубликованный."""
+    snap = _CURRENT.get(quiz_id)
+    if snap is None:
+        snap = _publish_missing(quiz_id)
+        if snap is None:
+            return None
+    if version is not None and version != snap.version:
+        versions = QUIZ_VERSIONS.get(quiz_id)
+        return versions.get(version) if versions is not None else None
+    return snap
+
+
+def pin_version(snap: QuizVersion, until: Optional[int] = None) -> None:
+    # сохранить версию в истории: по ней оценён результат или (until — срок) идёт попытка
+    key = (snap.quiz_id, snap.version)
+    with _VERSIONS_LOCK:
+        versions = QUIZ_VERSIONS.get(snap.quiz_id)
+        if versions is None:
+            return  # квиз удалён
+        versions[snap.version] = snap
+        versions.move_to_end(snap.version)
+        if until is not None and until > _VERSION_LEASES.get(key, 0):
+            _VERSION_LEASES[key] = until
+        excess = len(versions) - QUIZ_VERSIONS_KEEP
+        if excess <= 0:
+            return
+        now = int(time.time())
+        for version in list(versions):
+            lease = _VERSION_LEASES.get((snap.quiz_id, version))
+            if lease is not None and lease > now:
+                continue  # на версии идёт попытка
+            _VERSION_LEASES.pop((snap.quiz_id, version), None)
+            del versions[version]
+            excess -= 1
+            if excess == 0:
+                break
+
+
+def _publish(quiz_id: int, changed: set) -> None:
+    # под _WRITE_LOCK: собрать снимок из текущих списков и подменить ссылку
+    quiz = QUIZZES_BY_ID.get(quiz_id)
+    if quiz is None:
+        _CURRENT.pop(quiz_id, None)
+        return
+    QUIZ_VERSIONS.setdefault(quiz_id, OrderedDict())
+    if quiz_id in _VIRTUAL:
+        return  # клон без правок: снимок соберётся при первом чтении (_publish_missing)
+    prev = _CURRENT.get(quiz_id)
+    live = QUESTIONS_BY_QUIZ.get(quiz_id, [])  # клоны без правок отсеяны выше
+    if prev is None or None in changed or len(live) < len(prev.questions):
+        questions = tuple(_question_version(q) for q in live)
+        _CURRENT[quiz_id] = QuizVersion(quiz_id, quiz["version"], questions)
+        return
+    # порядок прежний: заменить изменённые вопросы, новые дописать в конец. Остальное —
+    # срезы кортежа указателей, без прохода по вопросам в Python
+    questions = prev.questions
+    n = len(questions)
+    positions = prev.positions()
+    for qid in changed:
+        pos = positions.get(qid)
+        if pos is not None and pos < n:
+            questions = questions[:pos] + (_question_version(live[pos]),) + questions[pos + 1 :]
+    if len(live) > n:
+        questions += tuple(_question_version(q) for q in live[n:])
+        # positions только дополняется: у прежних снимков новые индексы >= их длины
+        for pos in range(n, len(live)):
+            positions[live[pos]["id"]] = pos
+    _CURRENT[quiz_id] = QuizVersion(quiz_id, quiz["version"], questions, positions)
+
+
+def _publish_missing(quiz_id: int) -> Optional[QuizVersion]:
+    # медленный путь, один раз на клон: его вопросы собираются из снимка-источника
+    if quiz_id not in QUIZZES_BY_ID:
+        return None
+    with _WRITE_LOCK:
+        snap = _CURRENT.get(quiz_id)
+        if snap is None and quiz_id in QUIZZES_BY_ID:
+            quiz = QUIZZES_BY_ID[quiz_id]
+            questions = tuple(_question_version(q) for q in _live_questions(quiz_id))
+            snap = _CURRENT[quiz_id] = QuizVersion(quiz_id, quiz["version"], questions)
+            QUIZ_VERSIONS.setdefault(quiz_id, OrderedDict())
+        return snap
+
+
+def _question_version(q: dict) -> QuestionVersion:
+    qv = _QUESTION_VERSIONS.get(q["id"])
+    if qv is None or qv.question is not q:
+        qv = QuestionVersion(q, tuple(_live_choices(q["id"])))
+        if q["id"] in QUESTIONS_BY_ID:  # вопросы клона до первой правки не кешируем
+            _QUESTION_VERSIONS[q["id"]] = qv
+    return qv
+
+
+# --- Clone ---
+# Клон ссылается на снимок исходного квиза и резервирует блоки id под вопросы и варианты;
+# словари вопросов клона собираются на лету при чтении, а свои копии (с теми же id)
+# появляются только при первой правке клона. До неё в поиске индексируется только заголовок.
+_VIRTUAL: Dict[int, Tuple[QuizVersion, int, int]] = {}  # клон -> (снимок, 1-й id вопроса, варианта)
+_VIRTUAL_BASES: List[int] = []  # первые id вопросов клонов по возрастанию
+_VIRTUAL_QUIZZES: List[int] = []  # id клонов, параллельно _VIRTUAL_BASES
+
+
+@_writer
+def clone_quiz(quiz_id: int, owner_id: int, title: Optional[str] = None) -> Optional[dict]:
+    global _next_question_id, _next_choice_id
+    source = quiz_version(quiz_id)
+    if source is None:
+        return None
+    quiz = create_quiz(owner_id, title or QUIZZES_BY_ID[quiz_id]["title"])
+    qbase, cbase = _next_question_id, _next_choice_id
+    _next_question_id += len(source.questions)
+    _next_choice_id += source.choice_offsets()[-1]
+    if source.questions:
+        _VIRTUAL[quiz["id"]] = (source, qbase, cbase)
+        _VIRTUAL_BASES.append(qbase)
+        _VIRTUAL_QUIZZES.append(quiz["id"])
+    return quiz
+
+
+def _virtual_slot(question_id: int) -> Optional[Tuple[int, tuple, int]]:
+    i = bisect_right(_VIRTUAL_BASES, question_id) - 1
+    if i < 0:
+        return None
+    clone_id = _VIRTUAL_QUIZZES[i]
+    virtual = _VIRTUAL[clone_id]
+    pos = question_id - virtual[1]
+    return (clone_id, virtual, pos) if pos < len(virtual[0].questions) else None
+
+
+def _clone_question(clone_id: int, virtual: tuple, pos: int) -> dict:
+    source, qbase, _ = virtual
+    return {**source.questions[pos].question, "id": qbase + pos, "quiz_id": clone_id}
+
+
+def _virtual_question(question_id: int) -> Optional[dict]:
+    slot = _virtual_slot(question_id)
+    return _clone_question(*slot) if slot else None
+
+
+def _virtual_choices(question_id: int) -> List[dict]:
+    slot = _virtual_slot(question_id)
+    if slot is None:
+        return []
+    _, (source, _, cbase), pos = slot
+    first = cbase + source.choice_offsets()[pos]
+    return [
+        {**c, "id": first + j, "question_id": question_id}
+        for j, c in enumerate(source.questions[pos].choices)
+    ]
+
+
+def _drop_virtual(quiz_id: int) -> None:
+    virtual = _VIRTUAL.pop(quiz_id, None)
+    if virtual is not None:
+        i = bisect_left(_VIRTUAL_BASES, virtual[1])
+        del _VIRTUAL_BASES[i]
+        del _VIRTUAL_QUIZZES[i]
+
+
+def _materialize(quiz_id: int) -> None:
+    # первая правка клона: собственные вопросы и варианты с зарезервированными id
+    if quiz_id not in _VIRTUAL:
+        return
+    rows = [(q, _virtual_choices(q["id"])) for q in _live_questions(quiz_id)]
+    _drop_virtual(quiz_id)
+    _DIRTY.setdefault(quiz_id, set()).add(None)  # словари вопросов теперь свои, не из снимка
+    owner_id = _quiz_owner(quiz_id)
+    for q, choices in rows:
+        QUESTIONS_BY_ID[q["id"]] = q
+        QUESTIONS_BY_QUIZ.setdefault(quiz_id, []).append(q)
+        if choices:
+            CHOICES.extend(choices)
+            CHOICES_BY_QUESTION[q["id"]] = choices
+        if owner_id is not None:
+            search.index_question(owner_id, quiz_id, q["id"], q["text"])
+            for c in choices:
+                search.add_question_text(owner_id, q["id"], c["text"])
+
+
+def _materialize_question(question_id: int) -> None:
+    if question_id not in QUESTIONS_BY_ID:
+        slot = _virtual_slot(question_id)
+        if slot is not None:
+            _materialize(slot[0])
 
 
 # === RESULTS (in-memory) ===
 _next_result_id = 1
-RESULTS: List[dict] = []  # {"id","quiz_id","user_id","score","max_score","answers","created_at"}
+# id -> {"id","quiz_id","user_id","score","max_score","answers","quiz_version","created_at"}
+RESULTS: Dict[int, dict] = {}
+_RESULT_IDS_BY_QUIZ: Dict[int, Deque[int]] = {}  # quiz_id -> id в порядке поступления
+_RESULT_IDS_BY_USER: Dict[int, List[int]] = {}  # user_id -> id по возрастанию (все квизы)
+_RESULTS_LOCK = threading.Lock()
+
+# Ретенция: сырые результаты сверх лимита сворачиваются в дневные агрегаты (ROLLUPS).
+# None — хранить всё; значения по умолчанию для всех квизов берутся из env.
+_DEFAULT_KEEP_LAST = int(os.getenv("RESULTS_KEEP_LAST", "0")) or None
+_DEFAULT_KEEP_DAYS = int(os.getenv("RESULTS_KEEP_DAYS", "0")) or None
+RETENTION: Dict[int, dict] = {}  # quiz_id -> {"keep_last", "keep_days"}
+ROLLUPS: Dict[int, Dict[int, dict]] = {}  # quiz_id -> day -> {"count","score_sum","histogram"}
+_COMPACT_PENDING: set = set()  # квизы, где превышен keep_last
 
 
 def save_result(
@@ -191,26 +798,170 @@ def save_result(
     score: int,
     max_score: int,
     answers: list,
+    quiz_version: Optional[int] = None,  # версия квиза, по ключу которой оценено
 ) -> dict:
     global _next_result_id
-    rid = _next_result_id
-    _next_result_id += 1
-    rec = {
-        "id": rid,
-        "quiz_id": quiz_id,
-        "user_id": user_id,
-        "score": score,
-        "max_score": max_score,
-        "answers": answers,
-        "created_at": int(time.time()),
-    }
-    RESULTS.append(rec)
+    with _RESULTS_LOCK:
+        rid = _next_result_id
+        _next_result_id += 1
+        rec = {
+            "id": rid,
+            "quiz_id": quiz_id,
+            "user_id": user_id,
+            "score": score,
+            "max_score": max_score,
+            "answers": answers,
+            "quiz_version": quiz_version,
+            "created_at": int(time.time()),
+        }
+        RESULTS[rid] = rec
+        ids = _RESULT_IDS_BY_QUIZ.get(quiz_id)
+        if ids is None:
+            ids = _RESULT_IDS_BY_QUIZ[quiz_id] = deque()
+        ids.append(rid)
+        if user_id is not None:
+            _RESULT_IDS_BY_USER.setdefault(user_id, []).append(rid)  # rid растёт под локом
+        keep_last = get_retention(quiz_id)["keep_last"]
+        if keep_last is not None and len(ids) > keep_last:
+            _COMPACT_PENDING.add(quiz_id)  # сворачивает фоновый компактор, не запрос
+    leaderboard.record(rec)
+    live.publish(rec)
     return rec
 
 
 def list_results_for_quiz(quiz_id: int, user_id: Optional[int] = None) -> List[dict]:
-    rows = [r for r in RESULTS if r["quiz_id"] == quiz_id]
+    with _RESULTS_LOCK:
+        ids = list(_RESULT_IDS_BY_QUIZ.get(quiz_id, ()))
+    # последние сверху: id растут вместе с created_at
+    rows = [RESULTS[rid] for rid in reversed(ids) if rid in RESULTS]
     if user_id is not None:
         rows = [r for r in rows if r["user_id"] == user_id]
-    # последние сверху
-    return sorted(rows, key=lambda r: r["created_at"], reverse=True)
+    return rows
+
+
+def list_results_for_user(user_id: int, limit: int, before_id: Optional[int] = None) -> List[dict]:
+    # результаты пользователя по всем квизам, последние сверху; keyset — id строго меньше
+    # before_id. Индекс пользователя: bisect + срез, O(limit) при любом объёме RESULTS
+    with _RESULTS_LOCK:
+        ids = _RESULT_IDS_BY_USER.get(user_id, [])
+        end = bisect_left(ids, before_id) if before_id is not None else len(ids)
+        return [RESULTS[rid] for rid in reversed(ids[max(end - limit, 0) : end])]
+
+
+def get_quiz_titles(quiz_ids) -> Dict[int, str]:
+    # заголовки пачкой, один раз на каждый квиз (удалённые квизы — без ключа)
+    return {qid: q["title"] for qid in set(quiz_ids) if (q := QUIZZES_BY_ID.get(qid)) is not None}
+
+
+def results_signature(quiz_id: int) -> tuple:
+    # меняется при каждом новом результате и при компакции: (число, последний id)
+    with _RESULTS_LOCK:
+        ids = _RESULT_IDS_BY_QUIZ.get(quiz_id)
+        return (len(ids), ids[-1]) if ids else (0, 0)
+
+
+# --- Retention / roll-up ---
+def get_retention(quiz_id: int) -> dict:
+    return RETENTION.get(quiz_id) or {
+        "keep_last": _DEFAULT_KEEP_LAST,
+        "keep_days": _DEFAULT_KEEP_DAYS,
+    }
+
+
+def set_retention(quiz_id: int, keep_last: Optional[int], keep_days: Optional[int]) -> dict:
+    cfg = {"keep_last": keep_last, "keep_days": keep_days}
+    with _RESULTS_LOCK:
+        RETENTION[quiz_id] = cfg
+        _COMPACT_PENDING.add(quiz_id)
+    return cfg
+
+
+def list_result_rollups(quiz_id: int) -> List[dict]:
+    with _RESULTS_LOCK:
+        days = sorted(ROLLUPS.get(quiz_id, {}).items())
+        return [
+            {
+                "day": day,
+                "count": agg["count"],
+                "score_sum": agg["score_sum"],
+                "histogram": dict(agg["histogram"]),
+            }
+            for day, agg in days
+        ]
+
+
+def _expired(quiz_id: int, rec: dict, ids_left: int, now: int) -> bool:
+    cfg = get_retention(quiz_id)
+    if cfg["keep_last"] is not None and ids_left > cfg["keep_last"]:
+        return True
+    return cfg["keep_days"] is not None and rec["created_at"] < now - cfg["keep_days"] * 86400
+
+
+def compact_results(budget: int = 500) -> int:
+    """
+    Сворачивает не больше budget самых старых результатов, вышедших за ретенцию,
+    в дневные агрегаты. Блокировка держится только на одну порцию, поэтому
+    save_result/list_results не ждут всю компакцию. Возвращает число свёрнутых строк.
+    """
+    now = int(time.time())
+    done = 0
+    with _RESULTS_LOCK:
+        candidates = list(_COMPACT_PENDING)
+        candidates += [qid for qid, cfg in RETENTION.items() if cfg["keep_days"] is not None]
+        if _DEFAULT_KEEP_DAYS is not None:
+            candidates += [qid for qid in _RESULT_IDS_BY_QUIZ if qid not in RETENTION]
+        for quiz_id in dict.fromkeys(candidates):
+            ids = _RESULT_IDS_BY_QUIZ.get(quiz_id)
+            while ids and done < budget:
+                rec = RESULTS.get(ids[0])
+                if rec is not None and not _expired(quiz_id, rec, len(ids), now):
+                    break
+                ids.popleft()
+                if rec is None:
+                    continue
+                del RESULTS[rec["id"]]
+                if rec["user_id"] is not None:
+                    _drop_owned_id(_RESULT_IDS_BY_USER.get(rec["user_id"], []), rec["id"])
+                _roll_up(rec)
+                done += 1
+            if done >= budget:
+                break
+            _COMPACT_PENDING.discard(quiz_id)
+    return done
+
+
+def _roll_up(rec: dict) -> None:
+    days = ROLLUPS.get(rec["quiz_id"])
+    if days is None:
+        days = ROLLUPS[rec["quiz_id"]] = {}
+    day = rec["created_at"] // 86400
+    agg = days.get(day)
+    if agg is None:
+        agg = days[day] = {"count": 0, "score_sum": 0, "histogram": {}}
+    agg["count"] += 1
+    agg["score_sum"] += rec["score"]
+    agg["histogram"][rec["score"]] = agg["histogram"].get(rec["score"], 0) + 1
+
+
+# === Учёт памяти (GET /api/v1/admin/memory) ===
+# порядок важен для exact: общие строки засчитываются таблице, а не индексам и снимкам
+memory.register("storage.users", lambda: USERS)
+memory.register("storage.users_by_username", lambda: USERS_BY_USERNAME, index=True)
+memory.register("storage.items", lambda: ITEMS)
+memory.register("storage.items_by_id", lambda: ITEMS_BY_ID, index=True)
+memory.register("storage.item_ids_by_owner", lambda: ITEM_IDS_BY_OWNER, index=True)
+memory.register("storage.quizzes", lambda: QUIZZES)
+memory.register("storage.quizzes_by_id", lambda: QUIZZES_BY_ID, index=True)
+memory.register("storage.quiz_ids_by_owner", lambda: QUIZ_IDS_BY_OWNER, index=True)
+memory.register("storage.questions", lambda: QUESTIONS_BY_ID)
+memory.register("storage.questions_by_quiz", lambda: QUESTIONS_BY_QUIZ, index=True)
+memory.register("storage.choices", lambda: CHOICES)
+memory.register("storage.choices_by_question", lambda: CHOICES_BY_QUESTION, index=True)
+memory.register("storage.snapshots", lambda: _CURRENT)
+memory.register("storage.quiz_versions", lambda: QUIZ_VERSIONS)
+memory.register("storage.clones", lambda: _VIRTUAL)
+memory.register("storage.results", lambda: RESULTS)
+memory.register("storage.result_ids_by_quiz", lambda: _RESULT_IDS_BY_QUIZ, index=True)
+memory.register("storage.result_ids_by_user", lambda: _RESULT_IDS_BY_USER, index=True)
+memory.register("storage.rollups", lambda: ROLLUPS)
+memory.register("storage.retention", lambda: RETENTION)
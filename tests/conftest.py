@@ -5,3 +5,20 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]  # корень репозитория
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+import uuid  # noqa: E402
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture
+def auth_headers():
+    # новый пользователь на каждый тест: storage общий на весь процесс
+    client = TestClient(app)
+    creds = {"username": f"user_{uuid.uuid4().hex[:12]}", "password": "secret123"}
+    assert client.post("/api/v1/auth/register", json=creds).status_code == 200
+    token = client.post("/api/v1/auth/login", json=creds).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
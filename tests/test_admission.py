@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import admission
+from app.admission import Limiter, Rejected
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_limiter_queues_within_budget_and_sheds_beyond():
+    async def scenario():
+        limiter = Limiter("t", limit=1, max_wait=0.5)
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.stats()["queued"] == 1
+        limiter.release()  # слот переходит ожидающему
+        await waiter
+        assert limiter.active == 1
+
+        limiter.observe(2.0)  # обработка дольше бюджета: ждать бессмысленно
+        with pytest.raises(Rejected) as exc:
+            await limiter.acquire()
+        assert exc.value.retry_after == 2.0
+
+        limiter.service_time = 0.01
+        with pytest.raises(Rejected):
+            await limiter.acquire()  # слот так и не освободился за max_wait
+        limiter.release()
+        assert limiter.active == 0 and not limiter.waiters
+        assert (limiter.admitted, limiter.rejected) == (2, 2)
+
+    asyncio.run(scenario())
+
+
+def test_overloaded_submit_gets_503_while_owner_reads_work(auth_headers, monkeypatch):
+    quiz = client.post("/api/v1/quizzes", json={"title": "Spike"}, headers=auth_headers).json()
+    busy = Limiter("submit", limit=1, max_wait=0.1)
+    busy.active, busy.service_time = 1, 3.2
+    monkeypatch.setitem(admission.limiters, "submit", busy)
+
+    r = client.post(f"/api/v1/public/quizzes/{quiz['id']}/submit", json={"answers": []})
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == "4"
+    assert r.json()["error"]["code"] == "overloaded"
+
+    assert client.get(f"/api/v1/quizzes/{quiz['id']}", headers=auth_headers).status_code == 200
+    assert client.get("/health/ready").json()["admission"]["submit"]["rejected"] == 1
+
+    busy.active = 0
+    r = client.post(f"/api/v1/public/quizzes/{quiz['id']}/submit", json={"answers": []})
+    assert r.status_code == 200
+    assert busy.active == 0 and busy.admitted == 1
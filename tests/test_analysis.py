@@ -0,0 +1,106 @@
+import math
+import random
+
+from fastapi.testclient import TestClient
+
+from app import analysis, storage
+from app.main import app
+
+client = TestClient(app)
+
+
+def _question(quiz_id, headers, qtype, correct):
+    body = {
+        "quiz_id": quiz_id,
+        "text": f"{qtype} question",
+        "type": qtype,
+        "choices": [{"text": f"c{i}", "is_correct": i in correct} for i in range(3)],
+    }
+    r = client.post("/api/v1/questions", json=body, headers=headers)
+    return r.json()["id"], [c["id"] for c in r.json()["choices"]]
+
+
+def _pearson(xs, ys):
+    n = len(xs)
+    mx, my = sum(xs) / n, sum(ys) / n
+    cov = sum((x - mx) * (y - my) for x, y in zip(xs, ys))
+    sx = math.sqrt(sum((x - mx) ** 2 for x in xs))
+    sy = math.sqrt(sum((y - my) ** 2 for y in ys))
+    return cov / (sx * sy)
+
+
+def test_item_analysis_matches_reference(auth_headers):
+    quiz = client.post("/api/v1/quizzes", json={"title": "Items"}, headers=auth_headers).json()
+    q1, c1 = _question(quiz["id"], auth_headers, "single", {0})
+    q2, c2 = _question(quiz["id"], auth_headers, "multiple", {0, 2})
+    q3, c3 = _question(quiz["id"], auth_headers, "single", {1})
+
+    rnd = random.Random(7)
+    rows = []
+    for _ in range(40):
+        a1, a3 = rnd.randrange(3), rnd.randrange(3)
+        a2 = sorted(rnd.sample(range(3), rnd.randint(1, 2)))
+        answers = [
+            {"question_id": q1, "choice_id": c1[a1]},
+            {"question_id": q2, "choice_ids": [c2[i] for i in a2]},
+            {"question_id": q3, "choice_id": c3[a3]},
+            {"question_id": q1, "choice_id": c1[0]},  # повтор не учитывается, как в grade
+        ]
+        r = client.post(f"/api/v1/public/quizzes/{quiz['id']}/submit", json={"answers": answers})
+        assert r.status_code == 200
+        rows.append((a1 == 0, a2 == [0, 2], a3 == 1, a1))
+
+    r = client.get(f"/api/v1/quizzes/{quiz['id']}/analysis", headers=auth_headers)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["submissions"] == 40
+    assert [q["question_id"] for q in body["questions"]] == [q1, q2, q3]
+
+    totals = [sum(row[:3]) for row in rows]
+    for j, q in enumerate(body["questions"]):
+        xs = [int(row[j]) for row in rows]
+        assert q["answered"] == 40
+        assert q["difficulty"] == round(sum(xs) / 40, 4)
+        rest = [t - x for t, x in zip(totals, xs)]
+        assert math.isclose(q["discrimination"], _pearson(xs, rest), abs_tol=1e-4)
+
+    picks = [c["picked"] for c in body["questions"][0]["choices"]]
+    assert picks == [sum(row[3] == i for row in rows) for i in range(3)]
+    assert [c["is_correct"] for c in body["questions"][0]["choices"]] == [True, False, False]
+
+
+def test_analysis_cached_until_new_submission(auth_headers):
+    quiz = client.post("/api/v1/quizzes", json={"title": "Cache"}, headers=auth_headers).json()
+    q1, c1 = _question(quiz["id"], auth_headers, "single", {0})
+    submit = f"/api/v1/public/quizzes/{quiz['id']}/submit"
+    client.post(submit, json={"answers": [{"question_id": q1, "choice_id": c1[0]}]})
+
+    first = analysis.item_analysis(quiz["id"])
+    assert analysis.item_analysis(quiz["id"]) is first
+    assert first["questions"][0]["discrimination"] is None  # одна попытка: дисперсии нет
+
+    client.post(submit, json={"answers": [{"question_id": q1, "choice_id": c1[1]}]})
+    second = analysis.item_analysis(quiz["id"])  # досчитано инкрементально
+    assert second is not first
+    assert second["submissions"] == 2
+    assert second["questions"][0]["difficulty"] == 0.5
+    full = analysis.analyze(
+        analysis.build_layout(storage.quiz_version(quiz["id"])),
+        storage.list_results_for_quiz(quiz["id"]),
+    )
+    assert full.finish() == second
+
+    storage.set_retention(quiz["id"], keep_last=1, keep_days=None)
+    storage.compact_results()
+    third = analysis.item_analysis(quiz["id"])
+    assert third["submissions"] == 1
+    assert third["questions"][0]["difficulty"] == 0.0
+
+
+def test_analysis_requires_owner(auth_headers):
+    quiz = client.post("/api/v1/quizzes", json={"title": "Own"}, headers=auth_headers).json()
+    assert client.get(f"/api/v1/quizzes/{quiz['id']}/analysis").status_code == 401
+    r = client.get("/api/v1/quizzes/999999/analysis", headers=auth_headers)
+    assert r.status_code == 404
+    r = client.get(f"/api/v1/quizzes/{quiz['id']}/analysis", headers=auth_headers)
+    assert r.json() == {"submissions": 0, "questions": []}
@@ -0,0 +1,61 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def _quiz_with_questions(headers, n):
+    quiz = client.post("/api/v1/quizzes", json={"title": "Attempts"}, headers=headers).json()
+    for i in range(n):
+        body = {
+            "quiz_id": quiz["id"],
+            "text": f"Q{i}",
+            "type": "single",
+            "choices": [{"text": "right", "is_correct": True}, {"text": "wrong"}],
+        }
+        assert client.post("/api/v1/questions", json=body, headers=headers).status_code == 200
+    return quiz["id"]
+
+
+def _answers(questions, pick):
+    return [
+        {"question_id": q["id"], "choice_id": next(c["id"] for c in q["choices"] if pick(c))}
+        for q in questions
+    ]
+
+
+def test_start_samples_and_submit_grades_variant(auth_headers):
+    quiz_id = _quiz_with_questions(auth_headers, 5)
+    r = client.post(f"/api/v1/public/quizzes/{quiz_id}/start", json={"count": 3})
+    assert r.status_code == 200
+    att = r.json()
+    assert len(att["questions"]) == 3
+
+    answers = _answers(att["questions"], lambda c: c["text"] == "right")
+    submit = f"/api/v1/public/attempts/{att['session_id']}/submit"
+    r = client.post(submit, json={"answers": answers})
+    assert r.json() == {"score": 3, "max_score": 3}
+
+    # сессия одноразовая
+    r = client.post(submit, json={"answers": []})
+    assert r.status_code == 404
+
+
+def test_submit_after_quiz_edit_grades_started_version(auth_headers):
+    quiz_id = _quiz_with_questions(auth_headers, 2)
+    att = client.post(f"/api/v1/public/quizzes/{quiz_id}/start").json()
+    answers = _answers(att["questions"], lambda c: c["text"] == "right")
+    qid = att["questions"][0]["id"]
+    # правка меняет правильный вариант, но попытка оценивается по своей версии
+    choices = [{"text": "right", "is_correct": False}, {"text": "wrong", "is_correct": True}]
+    client.patch(f"/api/v1/questions/{qid}", json={"choices": choices}, headers=auth_headers)
+
+    submit = f"/api/v1/public/attempts/{att['session_id']}/submit"
+    r = client.post(submit, json={"answers": answers})
+    assert r.json() == {"score": 2, "max_score": 2}
+
+
+def test_unknown_attempt():
+    r = client.post("/api/v1/public/attempts/nope/submit", json={"answers": []})
+    assert r.status_code == 404
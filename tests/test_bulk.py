@@ -0,0 +1,84 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def _quiz(headers, n=3):
+    quiz = client.post("/api/v1/quizzes", json={"title": "Bulk"}, headers=headers).json()
+    ids = []
+    for i in range(n):
+        body = {
+            "quiz_id": quiz["id"],
+            "text": f"Q{i}",
+            "type": "single",
+            "choices": [{"text": "yes", "is_correct": True}, {"text": "no"}],
+        }
+        ids.append(client.post("/api/v1/questions", json=body, headers=headers).json()["id"])
+    return quiz["id"], ids
+
+
+def _detail(quiz_id, headers):
+    return client.get(f"/api/v1/quizzes/{quiz_id}", headers=headers).json()
+
+
+def test_bulk_applies_all_ops_as_one_version(auth_headers):
+    quiz_id, (q0, q1, q2) = _quiz(auth_headers)
+    before = _detail(quiz_id, auth_headers)
+
+    body = {
+        "create": [
+            {"text": "New first", "type": "text", "position": 0},
+            {
+                "text": "New last",
+                "type": "multiple",
+                "choices": [{"text": "a", "is_correct": True}, {"text": "b", "is_correct": True}],
+            },
+        ],
+        "update": [
+            {
+                "id": q0,
+                "text": "Q0 renamed",
+                "choices": [{"text": "one"}, {"text": "two", "is_correct": True}],
+            },
+            {"id": q2, "type": "text"},
+        ],
+        "delete": [q1],
+        "order": [q2, q0],
+    }
+    r = client.post(f"/api/v1/quizzes/{quiz_id}/questions/bulk", json=body, headers=auth_headers)
+    assert r.status_code == 200
+    out = r.json()
+    assert out["version"] == before["version"] + 1
+    assert [q["text"] for q in out["questions"]] == ["New first", "Q2", "Q0 renamed", "New last"]
+    assert out["questions"][1]["type"] == "text" and out["questions"][1]["choices"] is None
+    assert [c["text"] for c in out["questions"][2]["choices"]] == ["one", "two"]
+    assert out == _detail(quiz_id, auth_headers)
+    assert client.get(f"/api/v1/questions/{q1}", headers=auth_headers).status_code == 404
+
+    hits = client.get("/api/v1/quizzes/search?q=renamed", headers=auth_headers).json()
+    assert [(h["id"], h["question_ids"]) for h in hits] == [(quiz_id, [q0])]
+    key = {"answers": [{"question_id": q0, "choice_id": out["questions"][2]["choices"][1]["id"]}]}
+    r = client.post(f"/api/v1/quizzes/{quiz_id}/submit", json=key, headers=auth_headers)
+    assert r.json()["score"] == 1
+
+
+def test_bulk_is_all_or_nothing(auth_headers):
+    quiz_id, (q0, q1, q2) = _quiz(auth_headers)
+    before = _detail(quiz_id, auth_headers)
+    url = f"/api/v1/quizzes/{quiz_id}/questions/bulk"
+
+    two_correct = [{"text": "a", "is_correct": True}, {"text": "b", "is_correct": True}]
+    bad = [
+        ({"update": [{"id": q0, "text": "ok"}, {"id": q1, "choices": two_correct}]}, 400),
+        ({"update": [{"id": q0, "text": "x"}], "delete": [q0]}, 400),
+        ({"delete": [q1, 999_999]}, 404),
+        ({"delete": [q1], "order": [q0, q1, q2]}, 400),
+        ({"create": [{"text": "t", "type": "text", "choices": two_correct}]}, 400),
+    ]
+    for body, status in bad:
+        assert client.post(url, json=body, headers=auth_headers).status_code == status
+    assert _detail(quiz_id, auth_headers) == before
+
+    assert client.post(url, json={"delete": [q0]}).status_code == 401
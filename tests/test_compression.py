@@ -0,0 +1,112 @@
+import asyncio
+import gzip
+import zlib
+
+from fastapi.testclient import TestClient
+
+from app import compression
+from app.compression import CompressionMiddleware, accepts_gzip
+from app.main import app
+
+client = TestClient(app)
+
+
+def _quiz(headers, n=60):
+    quiz = client.post("/api/v1/quizzes", json={"title": "Big"}, headers=headers).json()
+    for i in range(n):
+        body = {
+            "quiz_id": quiz["id"],
+            "text": f"Question number {i} about something",
+            "type": "single",
+            "choices": [{"text": "first answer", "is_correct": True}, {"text": "second answer"}],
+        }
+        client.post("/api/v1/questions", json=body, headers=headers)
+    return quiz["id"]
+
+
+def test_large_json_is_gzipped_small_is_not(auth_headers):
+    quiz_id = _quiz(auth_headers)
+    gz = {**auth_headers, "Accept-Encoding": "gzip"}
+    r = client.get(f"/api/v1/quizzes/{quiz_id}", headers=gz)
+    assert r.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in r.headers["vary"]
+    assert int(r.headers["content-length"]) < len(r.content) / 3
+    assert len(r.json()["questions"]) == 60
+
+    plain = client.get(
+        f"/api/v1/quizzes/{quiz_id}", headers={**auth_headers, "Accept-Encoding": "identity"}
+    )
+    assert "content-encoding" not in plain.headers
+    assert plain.json() == r.json()
+
+    assert "content-encoding" not in client.get("/health", headers=gz).headers
+
+
+def test_public_preview_reuses_compressed_body(auth_headers):
+    quiz_id = _quiz(auth_headers)
+    url = f"/api/v1/public/quizzes/{quiz_id}/preview"
+    gz = {"Accept-Encoding": "gzip"}
+
+    first = client.get(url, headers=gz)
+    assert first.headers["content-encoding"] == "gzip"
+    stats = compression.cache_stats()
+    again = client.get(url, headers=gz)
+    assert compression.cache_stats() == stats  # второй раз не собирали и не сжимали
+    assert again.content == first.content
+    assert client.get(url, headers={"Accept-Encoding": "identity"}).json() == first.json()
+
+    qid = first.json()["questions"][0]["id"]
+    client.patch(f"/api/v1/questions/{qid}", json={"text": "edited"}, headers=auth_headers)
+    assert client.get(url, headers=gz).json()["questions"][0]["text"] == "edited"
+
+
+def _run(inner, accept="gzip"):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "headers": [(b"accept-encoding", accept.encode())]}
+    asyncio.run(CompressionMiddleware(inner, minimum_size=10)(scope, receive, send))
+    return sent
+
+
+def _streaming(content_type, chunks):
+    async def inner(scope, receive, send):
+        headers = [(b"content-type", content_type.encode())]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        for i, chunk in enumerate(chunks):
+            await send(
+                {"type": "http.response.body", "body": chunk, "more_body": i < len(chunks) - 1}
+            )
+
+    return inner
+
+
+def test_streaming_chunks_are_flushed_and_event_stream_skipped():
+    chunks = [b'{"n": %d}\n' % i for i in range(3)]
+    start, *bodies = _run(_streaming("application/json", chunks))
+    assert (b"content-encoding", b"gzip") in start["headers"]
+    decoder = zlib.decompressobj(31)
+    # каждый кусок декодируется сразу — ничего не застряло в буфере компрессора
+    assert [decoder.decompress(m["body"]) for m in bodies] == chunks
+    assert gzip.decompress(b"".join(m["body"] for m in bodies)) == b"".join(chunks)
+
+    start, *bodies = _run(_streaming("text/event-stream", [b"data: 1\n\n", b"data: 2\n\n"]))
+    assert not any(k == b"content-encoding" for k, _ in start["headers"])
+    assert [m["body"] for m in bodies] == [b"data: 1\n\n", b"data: 2\n\n"]
+
+    start, body = _run(_streaming("application/json", [b"x" * 100]), accept="identity")
+    assert body["body"] == b"x" * 100
+
+
+def test_accept_encoding_parsing():
+    assert accepts_gzip("gzip, deflate, br")
+    assert accepts_gzip("br;q=1.0, gzip;q=0.5")
+    assert accepts_gzip("*")
+    assert not accepts_gzip("gzip;q=0, *")
+    assert not accepts_gzip("identity")
+    assert not accepts_gzip("")
@@ -0,0 +1,62 @@
+from fastapi.testclient import TestClient
+
+from app.grading import TextMatcher, within_distance
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_text_matcher_modes():
+    m = TextMatcher(
+        [
+            {"mode": "exact", "value": "H2O"},
+            {"mode": "normalized", "value": "Carbon dioxide"},
+            {"mode": "regex", "value": r"\d{4}"},
+            {"mode": "regex", "value": r"(ab)\1"},
+            {"mode": "fuzzy", "value": "Tchaikovsky", "max_distance": 2},
+        ]
+    )
+    assert m.match("H2O") and not m.match("h2o")
+    assert m.match("  carbon   DIOXIDE!! ")
+    assert m.match("1961") and not m.match("19611")
+    assert m.match("abab")
+    assert m.match("chaikovsky") and not m.match("chykovsky")
+
+
+def test_within_distance():
+    assert within_distance("kitten", "sitting", 3)
+    assert not within_distance("kitten", "sitting", 2)
+    assert within_distance("", "ab", 2)
+
+
+def test_text_question_is_graded(auth_headers):
+    quiz = client.post("/api/v1/quizzes", json={"title": "Text"}, headers=auth_headers).json()
+    body = {
+        "quiz_id": quiz["id"],
+        "text": "Capital of France?",
+        "type": "text",
+        "accepted_answers": [{"mode": "normalized", "value": "Paris"}],
+    }
+    r = client.post("/api/v1/questions", json=body, headers=auth_headers)
+    assert r.json()["accepted_answers"][0]["value"] == "Paris"
+    qid = r.json()["id"]
+
+    submit = f"/api/v1/public/quizzes/{quiz['id']}/submit"
+    r = client.post(submit, json={"answers": [{"question_id": qid, "text": "paris."}]})
+    assert r.json() == {"score": 1, "max_score": 1}
+
+    # preview не раскрывает допустимые ответы
+    preview = client.get(f"/api/v1/public/quizzes/{quiz['id']}/preview").json()
+    assert "accepted_answers" not in preview["questions"][0]
+
+
+def test_invalid_regex_rejected(auth_headers):
+    quiz = client.post("/api/v1/quizzes", json={"title": "Bad"}, headers=auth_headers).json()
+    body = {
+        "quiz_id": quiz["id"],
+        "text": "?",
+        "type": "text",
+        "accepted_answers": [{"mode": "regex", "value": "("}],
+    }
+    r = client.post("/api/v1/questions", json=body, headers=auth_headers)
+    assert r.status_code == 400
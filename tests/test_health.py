@@ -1,5 +1,11 @@
+import threading
+import time
+
+import uvicorn
 from fastapi.testclient import TestClient
 
+from app import __main__ as launcher
+from app import runtime
 from app.main import app
 
 client = TestClient(app)
@@ -9,3 +15,73 @@ def test_health_ok():
     r = client.get("/health")
     assert r.status_code == 200
     assert r.json() == {"status": "ok"}
+
+
+def test_ready_reports_runtime():
+    client.post("/api/v1/auth/login", json={"username": "nobody", "password": "secret123"})
+    r = client.get("/health/ready")
+    assert r.status_code == 200
+    body = r.json()
+    assert body["status"] == "ok"
+    assert body["threadpool"]["size"] >= 1
+    assert body["requests"]["observed"] >= 1
+    assert body["requests"]["thread_wait_ms"]["p95"] is not None
+
+
+def test_ready_degraded_returns_503(monkeypatch):
+    monkeypatch.setattr(runtime, "HEALTH_MAX_THREAD_WAIT_MS", -1.0)
+    client.post("/api/v1/auth/login", json={"username": "nobody", "password": "secret123"})
+    r = client.get("/health/ready")
+    assert r.status_code == 503
+    assert r.json()["reasons"] == ["threadpool_wait"]
+
+
+def test_openapi_keeps_sync_handler_params():
+    schema = client.get("/openapi.json").json()
+    params = schema["paths"]["/api/v1/quizzes/search"]["get"]["parameters"]
+    assert {"q", "limit", "offset"} <= {p["name"] for p in params}
+
+
+def test_ready_with_lifespan_monitors_loop():
+    with TestClient(app) as c:
+        body = c.get("/health/ready").json()
+        assert body["event_loop"]["monitored"] is True
+        assert body["threadpool"]["size"] == runtime.THREADPOOL_SIZE
+
+
+def test_async_reads_skip_threadpool(auth_headers):
+    quiz = client.post("/api/v1/quizzes", json={"title": "Async"}, headers=auth_headers).json()
+    before = runtime.thread_timings.total
+    assert client.get(f"/api/v1/quizzes/{quiz['id']}", headers=auth_headers).status_code == 200
+    assert client.get(f"/api/v1/public/quizzes/{quiz['id']}/preview").status_code == 200
+    assert client.get("/api/v1/quizzes", headers=auth_headers).status_code == 200
+    assert runtime.thread_timings.total == before
+
+
+def test_ready_is_503_until_warm_up_finishes():
+    release = threading.Event()
+    with TestClient(app) as c:
+        c.portal.call(runtime.warmup.start, [release.wait])
+        r = c.get("/health/ready")
+        assert r.status_code == 503
+        assert r.json()["reasons"] == ["warming_up"]
+        release.set()
+        for _ in range(100):
+            if not c.get("/health/ready").json()["warmup"]["pending"]:
+                break
+            time.sleep(0.01)
+        body = c.get("/health/ready").json()
+        assert "warming_up" not in body["reasons"]
+        assert body["warmup"]["seconds"] is not None
+
+
+def test_launcher_config(monkeypatch):
+    calls = []
+    monkeypatch.setattr(uvicorn, "run", lambda app, **kw: calls.append((app, kw)))
+    launcher.main(["--port", "9001", "--workers", "2", "--keepalive", "30"])
+    target, config = calls[0]
+    assert target == "app.main:app"
+    assert config["port"] == 9001 and config["workers"] == 2
+    assert config["timeout_keep_alive"] == 30
+    assert config["timeout_graceful_shutdown"] == launcher.GRACEFUL_TIMEOUT
+    assert config["loop"] in ("uvloop", "asyncio") and config["http"] in ("httptools", "h11")
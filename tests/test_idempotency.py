@@ -0,0 +1,111 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import idempotency, storage
+from app.main import app
+
+client = TestClient(app)
+
+
+def _quiz(headers):
+    quiz = client.post("/api/v1/quizzes", json={"title": "Retry"}, headers=headers).json()
+    body = {
+        "quiz_id": quiz["id"],
+        "text": "Q",
+        "type": "single",
+        "choices": [{"text": "yes", "is_correct": True}, {"text": "no"}],
+    }
+    q = client.post("/api/v1/questions", json=body, headers=headers).json()
+    return quiz["id"], q
+
+
+def _answer(q, n):
+    return {"answers": [{"question_id": q["id"], "choice_id": q["choices"][n]["id"]}]}
+
+
+def test_retry_with_same_key_replays_first_result(auth_headers):
+    quiz_id, q = _quiz(auth_headers)
+    url = f"/api/v1/quizzes/{quiz_id}/submit"
+    headers = {**auth_headers, "Idempotency-Key": "attempt-1"}
+
+    first = client.post(url, json=_answer(q, 0), headers=headers)
+    again = client.post(url, json=_answer(q, 0), headers=headers)
+    assert first.json() == again.json() == {"score": 1, "max_score": 1}
+    assert "Idempotency-Replayed" not in first.headers
+    assert again.headers["Idempotency-Replayed"] == "true"
+    assert len(storage.list_results_for_quiz(quiz_id)) == 1
+
+    r = client.post(url, json=_answer(q, 1), headers=headers)
+    assert r.status_code == 409
+    r = client.post(url, json=_answer(q, 0), headers={**auth_headers, "Idempotency-Key": ""})
+    assert r.status_code == 400
+
+    # без ключа и с другим ключом — новые попытки
+    client.post(url, json=_answer(q, 1), headers=auth_headers)
+    client.post(url, json=_answer(q, 1), headers={**auth_headers, "Idempotency-Key": "attempt-2"})
+    assert len(storage.list_results_for_quiz(quiz_id)) == 3
+
+
+def test_public_and_owner_keys_do_not_collide(auth_headers):
+    quiz_id, q = _quiz(auth_headers)
+    headers = {"Idempotency-Key": "same"}
+    client.post(f"/api/v1/public/quizzes/{quiz_id}/submit", json=_answer(q, 1), headers=headers)
+    r = client.post(
+        f"/api/v1/quizzes/{quiz_id}/submit",
+        json=_answer(q, 0),
+        headers={**auth_headers, **headers},
+    )
+    assert r.status_code == 200 and r.json()["score"] == 1
+    assert len(storage.list_results_for_quiz(quiz_id)) == 2
+
+
+def test_concurrent_duplicates_run_once():
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return object()
+
+    fp = idempotency.fingerprint(b"body")
+    out = []
+    threads = [
+        threading.Thread(target=lambda: out.append(idempotency.run("t", "k", fp, slow)))
+        for _ in range(8)
+    ]
+    threads[0].start()
+    started.wait(5)
+    for t in threads[1:]:
+        t.start()
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert len({id(result) for result, _ in out}) == 1
+    assert sorted(replayed for _, replayed in out) == [False] + [True] * 7
+
+
+def test_failure_is_not_cached():
+    fp = idempotency.fingerprint(b"body")
+
+    def boom():
+        raise RuntimeError("grading failed")
+
+    with pytest.raises(RuntimeError):
+        idempotency.run("t", "fail", fp, boom)
+    assert idempotency.run("t", "fail", fp, lambda: 42) == (42, False)
+
+
+def test_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(idempotency, "IDEMPOTENCY_MAX_KEYS", 3)
+    monkeypatch.setattr(idempotency, "_ENTRIES", type(idempotency._ENTRIES)())
+    fp = idempotency.fingerprint(b"")
+    for i in range(5):
+        idempotency.run("t", str(i), fp, lambda: i)
+    assert idempotency.size() == 3
+    assert idempotency.run("t", "0", fp, lambda: "again") == ("again", False)
@@ -0,0 +1,180 @@
+import csv
+import io
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app import jobs, storage
+from app.main import app
+
+client = TestClient(app)
+
+
+def _wait(url, headers, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        body = client.get(url, headers=headers).json()
+        if body["status"] not in (jobs.QUEUED, jobs.RUNNING) or time.monotonic() > deadline:
+            return body
+        time.sleep(0.01)
+
+
+def _quiz(headers, questions=0):
+    quiz = client.post("/api/v1/quizzes", json={"title": "Jobs"}, headers=headers).json()
+    for i in range(questions):
+        q = storage.create_question(quiz["id"], f"question {i}", "single")
+        storage.create_choice(q["id"], "a", is_correct=True)
+    return quiz["id"]
+
+
+def test_delete_quiz_respond_async(auth_headers, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_CHUNK", 7)
+    quiz_id = _quiz(auth_headers, questions=30)
+    r = client.delete(
+        f"/api/v1/quizzes/{quiz_id}", headers={**auth_headers, "Prefer": "respond-async"}
+    )
+    assert r.status_code == 202
+    assert r.headers["Location"] == f"/api/v1/jobs/{r.json()['id']}"
+    job = _wait(r.headers["Location"], auth_headers)
+    assert job["status"] == "succeeded"
+    assert job["progress"] == {"done": 30, "total": 30}
+    assert client.get(job["result_url"], headers=auth_headers).json() == {"deleted": True}
+    assert storage.get_quiz(quiz_id) is None
+    assert storage.list_questions_by_quiz(quiz_id) == []
+
+
+def test_delete_quiz_without_prefer_is_inline(auth_headers):
+    quiz_id = _quiz(auth_headers, questions=3)
+    r = client.delete(f"/api/v1/quizzes/{quiz_id}", headers=auth_headers)
+    assert r.status_code == 200
+    assert r.json() == {"deleted": True}
+
+
+def test_export_results_csv(auth_headers):
+    quiz_id = _quiz(auth_headers)
+    for i in range(12):
+        storage.save_result(quiz_id, None, i % 4, 3, [])
+    r = client.post(f"/api/v1/quizzes/{quiz_id}/results/export", headers=auth_headers)
+    assert r.status_code == 202
+    job = _wait(r.headers["Location"], auth_headers)
+    assert job["status"] == "succeeded"
+    result = client.get(job["result_url"], headers=auth_headers)
+    assert result.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(result.text)))
+    assert rows[0] == ["id", "user_id", "score", "max_score", "quiz_version", "created_at"]
+    assert len(rows) == 13
+
+
+def test_analysis_respond_async(auth_headers):
+    quiz_id = _quiz(auth_headers, questions=2)
+    headers = {**auth_headers, "Prefer": "respond-async"}
+    r = client.get(f"/api/v1/quizzes/{quiz_id}/analysis", headers=headers)
+    assert r.status_code == 202
+    job = _wait(r.headers["Location"], auth_headers)
+    inline = client.get(f"/api/v1/quizzes/{quiz_id}/analysis", headers=auth_headers).json()
+    assert client.get(job["result_url"], headers=auth_headers).json() == inline
+
+
+def test_job_visible_only_to_owner(auth_headers):
+    quiz_id = _quiz(auth_headers)
+    r = client.post(f"/api/v1/quizzes/{quiz_id}/results/export", headers=auth_headers)
+    url = r.headers["Location"]
+    creds = {"username": "jobs_stranger", "password": "secret123"}
+    client.post("/api/v1/auth/register", json=creds)
+    token = client.post("/api/v1/auth/login", json=creds).json()["access_token"]
+    stranger = {"Authorization": f"Bearer {token}"}
+    assert client.get(url, headers=stranger).status_code == 403
+    assert client.delete(url, headers=stranger).status_code == 403
+    assert client.get("/api/v1/jobs/nope", headers=auth_headers).status_code == 404
+
+
+def test_priority_and_cancel():
+    runner = jobs.JobRunner(workers=1)
+    gate = threading.Event()
+    order = []
+
+    def blocker(job):
+        while not gate.wait(0.01):
+            job.step()
+
+    def record(name):
+        return lambda job: order.append(name)
+
+    try:
+        first = runner.submit("block", 1, blocker)
+        while first.status != jobs.RUNNING:
+            time.sleep(0.001)
+        low = runner.submit("low", 1, record("low"), priority=9)
+        dropped = runner.submit("dropped", 1, record("dropped"), priority=1)
+        high = runner.submit("high", 1, record("high"), priority=1)
+        assert runner.cancel(dropped).status == jobs.CANCELLED
+        assert runner.stats()["queued"] == 2
+        gate.set()
+        deadline = time.monotonic() + 5
+        while not low.finished and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert order == ["high", "low"]
+        assert first.status == high.status == jobs.SUCCEEDED
+    finally:
+        runner.stop()
+
+
+def test_cancel_running_job():
+    runner = jobs.JobRunner(workers=1)
+
+    def slow(job):
+        for i in range(5000):
+            job.step(i, 5000)
+            time.sleep(0.001)
+
+    try:
+        job = runner.submit("loop", 1, slow)
+        while job.status != jobs.RUNNING:
+            time.sleep(0.001)
+        runner.cancel(job)
+        deadline = time.monotonic() + 5
+        while not job.finished and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert job.status == jobs.CANCELLED
+        assert job.done < 4999
+    finally:
+        runner.stop()
+
+
+def test_quiz_hidden_while_delete_job_runs(auth_headers, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_CHUNK", 5)
+    quiz_id = _quiz(auth_headers, questions=20)
+    owner_id = storage.get_quiz(quiz_id)["owner_id"]
+    gate = threading.Event()
+    seen = []
+    chunk = storage.delete_quiz_questions
+
+    def paused_chunk(qid, limit):
+        left = chunk(qid, limit)
+        seen.append(
+            (
+                client.get(f"/api/v1/quizzes/{quiz_id}", headers=auth_headers).status_code,
+                storage.get_quiz(quiz_id),
+                storage.quiz_version(quiz_id),
+                quiz_id in storage.QUIZ_IDS_BY_OWNER.get(owner_id, []),
+            )
+        )
+        gate.wait(5)
+        return left
+
+    monkeypatch.setattr("app.routers.quizzes.delete_quiz_questions", paused_chunk)
+    r = client.delete(
+        f"/api/v1/quizzes/{quiz_id}", headers={**auth_headers, "Prefer": "respond-async"}
+    )
+    assert r.status_code == 202
+    assert client.get(f"/api/v1/quizzes/{quiz_id}", headers=auth_headers).status_code == 404
+    while not seen:
+        time.sleep(0.005)
+    assert client.delete(r.headers["Location"], headers=auth_headers).status_code == 409
+    gate.set()
+    job = _wait(r.headers["Location"], auth_headers)
+    assert job["status"] == "succeeded"
+    assert job["progress"] == {"done": 20, "total": 20}
+    assert all(s == (404, None, None, False) for s in seen)
+    assert storage.list_questions_by_quiz(quiz_id) == []
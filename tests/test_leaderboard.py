@@ -0,0 +1,61 @@
+from fastapi.testclient import TestClient
+
+from app import leaderboard
+from app.main import app
+
+client = TestClient(app)
+
+
+def _rec(rid, user_id, score, created_at, quiz_id=10_000):
+    return {
+        "id": rid,
+        "quiz_id": quiz_id,
+        "user_id": user_id,
+        "score": score,
+        "max_score": 5,
+        "created_at": created_at,
+    }
+
+
+def test_best_attempt_per_user_and_order():
+    leaderboard.record(_rec(1, 1, 3, 100))
+    leaderboard.record(_rec(2, 2, 4, 101))
+    leaderboard.record(_rec(3, 1, 2, 102))  # хуже прежней — игнорируется
+    leaderboard.record(_rec(4, 3, 4, 99))  # тот же score, но раньше
+    leaderboard.record(_rec(5, 1, 5, 103))
+    leaderboard.record(_rec(6, None, 3, 104))
+
+    assert [e[2] for e in leaderboard.top(10_000, 10)] == [5, 4, 2, 6]
+    assert [e[2] for e in leaderboard.top(10_000, 2)] == [5, 4]
+
+
+def test_board_keeps_only_top_k(monkeypatch):
+    monkeypatch.setattr(leaderboard, "LEADERBOARD_SIZE", 3)
+    for rid in range(1, 11):
+        leaderboard.record(_rec(rid, None, rid, 100, quiz_id=10_001))
+    assert [e[2] for e in leaderboard.top(10_001, 10)] == [10, 9, 8]
+
+
+def test_leaderboard_endpoint(auth_headers):
+    quiz = client.post("/api/v1/quizzes", json={"title": "Top"}, headers=auth_headers).json()
+    body = {
+        "quiz_id": quiz["id"],
+        "text": "2+2?",
+        "type": "single",
+        "choices": [{"text": "4", "is_correct": True}, {"text": "5"}],
+    }
+    q = client.post("/api/v1/questions", json=body, headers=auth_headers).json()
+    right = q["choices"][0]["id"]
+    submit = f"/api/v1/quizzes/{quiz['id']}/submit"
+    client.post(submit, json={"answers": []}, headers=auth_headers)
+    client.post(
+        submit,
+        json={"answers": [{"question_id": q["id"], "choice_id": right}]},
+        headers=auth_headers,
+    )
+
+    r = client.get(f"/api/v1/quizzes/{quiz['id']}/leaderboard?limit=5", headers=auth_headers)
+    assert r.status_code == 200
+    rows = r.json()
+    assert len(rows) == 1 and rows[0]["rank"] == 1 and rows[0]["score"] == 1
+    assert rows[0]["username"].startswith("user_")
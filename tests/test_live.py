@@ -0,0 +1,118 @@
+import asyncio
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app import live
+from app.main import app
+
+client = TestClient(app)
+
+
+def _quiz(headers):
+    quiz = client.post("/api/v1/quizzes", json={"title": "Live"}, headers=headers).json()
+    body = {
+        "quiz_id": quiz["id"],
+        "text": "Q",
+        "type": "single",
+        "choices": [{"text": "yes", "is_correct": True}, {"text": "no"}],
+    }
+    q = client.post("/api/v1/questions", json=body, headers=headers).json()
+    return quiz["id"], {"answers": [{"question_id": q["id"], "choice_id": q["choices"][0]["id"]}]}
+
+
+async def _stream(path, headers, scenario):
+    # SSE бесконечный: гоняем ASGI-приложение напрямую и отключаемся, когда сценарий закончен
+    disconnect = asyncio.Event()
+    received = bytearray()
+
+    async def receive():
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            received.extend(message.get("body", b""))
+
+    async def wait_for(marker: bytes, count: int = 1):
+        for _ in range(500):
+            if received.count(marker) >= count:
+                return
+            await asyncio.sleep(0.01)
+        raise AssertionError(f"no {marker!r} in {bytes(received)!r}")
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("test", 1),
+        "server": ("test", 80),
+    }
+    task = asyncio.create_task(app(scope, receive, send))
+    try:
+        await scenario(wait_for)
+    finally:
+        disconnect.set()
+        await asyncio.wait_for(task, 5)
+    return bytes(received)
+
+
+def test_live_stream_pushes_results_and_stats(auth_headers):
+    quiz_id, right = _quiz(auth_headers)
+    url = f"/api/v1/quizzes/{quiz_id}/submit"
+    client.post(url, json=right, headers=auth_headers)  # до подписки: попадёт в агрегаты
+
+    async def scenario(wait_for):
+        await wait_for(b"event: stats")
+        assert live.subscriber_count() >= 1
+        # submit идёт в другом потоке и другом event loop, как из threadpool
+        await asyncio.to_thread(client.post, url, json={"answers": []}, headers=auth_headers)
+        await wait_for(b"event: result")
+
+    body = asyncio.run(_stream(f"/api/v1/quizzes/{quiz_id}/results/live", auth_headers, scenario))
+    frames = body.decode().split("\n\n")
+    assert '"count": 1, "mean_score": 1.0, "best_score": 1' in frames[1]
+    result = next(f for f in frames if "event: result" in f)
+    assert '"score":0' in result and '"max_score":1' in result
+    assert '"count": 2, "mean_score": 0.5' in body.decode()
+    assert live.subscriber_count() == 0
+
+
+def test_live_heartbeat_and_owner_only(auth_headers, monkeypatch):
+    quiz_id, _ = _quiz(auth_headers)
+    monkeypatch.setattr(live, "LIVE_HEARTBEAT", 0.05)
+
+    async def scenario(wait_for):
+        await wait_for(b": ping", count=2)
+
+    asyncio.run(_stream(f"/api/v1/quizzes/{quiz_id}/results/live", auth_headers, scenario))
+
+    creds = {"username": f"u_{uuid.uuid4().hex[:8]}", "password": "secret123"}
+    client.post("/api/v1/auth/register", json=creds)
+    token = client.post("/api/v1/auth/login", json=creds).json()["access_token"]
+    r = client.get(
+        f"/api/v1/quizzes/{quiz_id}/results/live", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert r.status_code == 403
+
+
+def test_slow_subscriber_drops_oldest_and_coalesces_stats(monkeypatch):
+    monkeypatch.setattr(live, "LIVE_QUEUE_SIZE", 3)
+
+    async def scenario():
+        sub = live.Subscriber(asyncio.get_running_loop(), b"stats 0\n\n")
+        for i in range(1, 11):
+            sub.push(f"result {i}\n\n".encode(), f"stats {i}\n\n".encode())
+        return sub.drain()
+
+    out = asyncio.run(scenario()).decode()
+    assert out.split("\n\n")[:3] == ["result 8", "result 9", "result 10"]
+    assert 'event: dropped\ndata: {"count": 7}' in out
+    assert out.count("stats") == 1 and "stats 10" in out
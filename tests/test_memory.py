@@ -0,0 +1,72 @@
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app import memory, storage
+from app.main import app
+from app.security import hash_password
+
+client = TestClient(app)
+
+
+def _admin_headers():
+    username = f"admin_{uuid.uuid4().hex[:12]}"
+    storage.create_user(username, hash_password("secret123"), role="admin")
+    creds = {"username": username, "password": "secret123"}
+    token = client.post("/api/v1/auth/login", json=creds).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_memory_requires_admin(auth_headers):
+    assert client.get("/api/v1/admin/memory").status_code == 401
+    r = client.get("/api/v1/admin/memory", headers=auth_headers)
+    assert r.status_code == 403
+    assert r.json()["error"]["code"] == "forbidden"
+
+
+def test_memory_reports_tables():
+    quiz = storage.create_quiz(1, "memory")
+    for i in range(500):
+        storage.save_result(quiz["id"], i, i % 5, 5, [{"question_id": 1, "choice_id": i}])
+    r = client.get("/api/v1/admin/memory", headers=_admin_headers())
+    assert r.status_code == 200
+    body = r.json()
+    assert body["mode"] == "sampled"
+    tables = {t["name"]: t for t in body["tables"]}
+    assert {"storage.results", "storage.users", "main.demo_items", "search.indexes"} <= set(tables)
+    results = tables["storage.results"]
+    assert results["rows"] >= 500
+    assert results["sampled_rows"] <= memory.MEMORY_SAMPLE
+    assert results["bytes"] > results["rows"] * 100
+    assert body["total_bytes"] == sum(t["bytes"] for t in body["tables"])
+    assert "tracemalloc" not in body
+
+
+def test_sampled_estimate_close_to_exact():
+    rows = {i: {"id": i, "text": "x" * (i % 50)} for i in range(5000)}
+    memory.register("test.rows", lambda: rows)
+    try:
+        table = memory._TABLES["test.rows"]
+        sampled = memory._measure(table, False, set())["bytes"]
+        exact = memory._measure(table, True, set())["bytes"]
+    finally:
+        del memory._TABLES["test.rows"]
+    assert abs(sampled - exact) / exact < 0.1
+
+
+def test_index_does_not_count_rows():
+    rows = [{"id": i, "text": "y" * 200} for i in range(100)]
+    by_id = {r["id"]: r for r in rows}
+    table = memory._Table("test.by_id", lambda: by_id, index=True)
+    assert memory._measure(table, True, set())["bytes"] < 100 * 200
+
+
+def test_memory_trace_window():
+    r = client.get(
+        "/api/v1/admin/memory", params={"trace_seconds": 0.05, "top": 5}, headers=_admin_headers()
+    )
+    assert r.status_code == 200
+    trace = r.json()["tracemalloc"]
+    assert trace["seconds"] == 0.05
+    assert len(trace["top"]) <= 5
+    assert all(":" in s["site"] for s in trace["top"])
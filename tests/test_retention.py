@@ -0,0 +1,40 @@
+from fastapi.testclient import TestClient
+
+from app import storage
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_keep_last_rolls_older_results_up(auth_headers):
+    quiz = client.post("/api/v1/quizzes", json={"title": "Ret"}, headers=auth_headers).json()
+    base = f"/api/v1/quizzes/{quiz['id']}"
+    r = client.put(f"{base}/retention", json={"keep_last": 2}, headers=auth_headers)
+    assert r.json() == {"keep_last": 2, "keep_days": None}
+
+    for _ in range(5):
+        client.post(f"{base}/submit", json={"answers": []}, headers=auth_headers)
+    assert len(client.get(f"{base}/results", headers=auth_headers).json()) == 5
+
+    # фоновый компактор в TestClient не запущен — вызываем порцию напрямую
+    storage.compact_results()
+    assert len(client.get(f"{base}/results", headers=auth_headers).json()) == 2
+    mine = client.get("/api/v1/me/results", headers=auth_headers).json()
+    assert len([r for r in mine if r["quiz_id"] == quiz["id"]]) == 2  # индекс тоже свёрнут
+    rollup = client.get(f"{base}/results/rollup", headers=auth_headers).json()
+    assert [(d["count"], d["histogram"]) for d in rollup] == [(3, {"0": 3})]
+
+
+def test_keep_days_and_batch_budget():
+    quiz_id = 9_999
+    old = [storage.save_result(quiz_id, None, s, 3, []) for s in (1, 2, 3)]
+    for rec in old:
+        rec["created_at"] -= 10 * 86400
+    fresh = storage.save_result(quiz_id, None, 3, 3, [])
+    storage.set_retention(quiz_id, keep_last=None, keep_days=7)
+
+    assert storage.compact_results(budget=2) == 2
+    assert storage.compact_results(budget=2) == 1
+    assert [r["id"] for r in storage.list_results_for_quiz(quiz_id)] == [fresh["id"]]
+    (day,) = storage.list_result_rollups(quiz_id)
+    assert day["count"] == 3 and day["score_sum"] == 6
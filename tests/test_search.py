@@ -0,0 +1,56 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def _question(headers, quiz_id, text, choices):
+    body = {
+        "quiz_id": quiz_id,
+        "text": text,
+        "type": "single",
+        "choices": [{"text": c, "is_correct": i == 0} for i, c in enumerate(choices)],
+    }
+    r = client.post("/api/v1/questions", json=body, headers=headers)
+    assert r.status_code == 200
+    return r.json()["id"]
+
+
+def test_search_title_question_and_choice_prefix(auth_headers):
+    geo = client.post("/api/v1/quizzes", json={"title": "Geography"}, headers=auth_headers).json()
+    hist = client.post("/api/v1/quizzes", json={"title": "History"}, headers=auth_headers).json()
+    qn = _question(auth_headers, hist["id"], "Who crossed the Alps?", ["Hannibal", "Caesar"])
+    _question(auth_headers, geo["id"], "Highest peak in the ALPS?", ["Mont Blanc", "Etna"])
+
+    r = client.get("/api/v1/quizzes/search?q=alp", headers=auth_headers)
+    assert {h["id"] for h in r.json()} == {geo["id"], hist["id"]}
+
+    r = client.get("/api/v1/quizzes/search?q=hannib", headers=auth_headers)
+    assert [(h["id"], h["question_ids"]) for h in r.json()] == [(hist["id"], [qn])]
+
+    r = client.get("/api/v1/quizzes/search?q=geo alps", headers=auth_headers)
+    assert [h["id"] for h in r.json()] == [geo["id"]]
+
+
+def test_search_follows_updates_and_deletes(auth_headers):
+    quiz = client.post("/api/v1/quizzes", json={"title": "Draft"}, headers=auth_headers).json()
+    qn = _question(auth_headers, quiz["id"], "Old wording", ["Alpha", "Beta"])
+
+    client.patch(f"/api/v1/quizzes/{quiz['id']}", json={"title": "Final"}, headers=auth_headers)
+    client.patch(f"/api/v1/questions/{qn}", json={"text": "New wording"}, headers=auth_headers)
+    assert client.get("/api/v1/quizzes/search?q=draft", headers=auth_headers).json() == []
+    assert client.get("/api/v1/quizzes/search?q=old", headers=auth_headers).json() == []
+    assert len(client.get("/api/v1/quizzes/search?q=final", headers=auth_headers).json()) == 1
+
+    client.delete(f"/api/v1/quizzes/{quiz['id']}", headers=auth_headers)
+    assert client.get("/api/v1/quizzes/search?q=alpha", headers=auth_headers).json() == []
+
+
+def test_search_is_owner_scoped(auth_headers):
+    client.post("/api/v1/quizzes", json={"title": "Zoology private"}, headers=auth_headers)
+    creds = {"username": "search_other", "password": "secret123"}
+    client.post("/api/v1/auth/register", json=creds)
+    token = client.post("/api/v1/auth/login", json=creds).json()["access_token"]
+    r = client.get("/api/v1/quizzes/search?q=zoology", headers={"Authorization": f"Bearer {token}"})
+    assert r.status_code == 200 and r.json() == []
@@ -0,0 +1,233 @@
+import threading
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app import grading, storage
+from app.main import app
+
+client = TestClient(app)
+
+
+def _quiz(headers, n=3, title="Versions"):
+    quiz = client.post("/api/v1/quizzes", json={"title": title}, headers=headers).json()
+    questions = []
+    for i in range(n):
+        body = {
+            "quiz_id": quiz["id"],
+            "text": f"Q{i}",
+            "type": "single",
+            "choices": [{"text": "right", "is_correct": True}, {"text": "wrong"}],
+        }
+        questions.append(client.post("/api/v1/questions", json=body, headers=headers).json())
+    return quiz["id"], questions
+
+
+def _right(questions):
+    return {
+        "answers": [{"question_id": q["id"], "choice_id": q["choices"][0]["id"]} for q in questions]
+    }
+
+
+def test_result_keeps_version_it_was_graded_against(auth_headers):
+    quiz_id, questions = _quiz(auth_headers)
+    r = client.post(
+        f"/api/v1/quizzes/{quiz_id}/submit", json=_right(questions), headers=auth_headers
+    )
+    assert r.json() == {"score": 3, "max_score": 3}
+    graded = client.get(f"/api/v1/quizzes/{quiz_id}", headers=auth_headers).json()["version"]
+
+    qid = questions[0]["id"]
+    client.patch(f"/api/v1/questions/{qid}", json={"text": "Q0 edited"}, headers=auth_headers)
+    detail = client.get(f"/api/v1/quizzes/{quiz_id}", headers=auth_headers).json()
+    assert detail["version"] > graded
+
+    results = client.get(f"/api/v1/quizzes/{quiz_id}/results", headers=auth_headers).json()
+    assert results[0]["quiz_version"] == graded
+    old = client.get(f"/api/v1/quizzes/{quiz_id}/versions/{graded}", headers=auth_headers).json()
+    assert old["questions"][0]["text"] == "Q0"
+    assert detail["questions"][0]["text"] == "Q0 edited"
+
+    r = client.get(f"/api/v1/quizzes/{quiz_id}/versions/{graded - 1}", headers=auth_headers)
+    assert r.status_code == 404
+
+
+def test_new_version_shares_unchanged_questions(auth_headers):
+    quiz_id, questions = _quiz(auth_headers)
+    before = storage.quiz_version(quiz_id)
+    key_before = grading.answer_key(quiz_id)
+
+    client.patch(
+        f"/api/v1/questions/{questions[1]['id']}", json={"text": "changed"}, headers=auth_headers
+    )
+    after = storage.quiz_version(quiz_id)
+    assert after.version != before.version
+    assert after.questions[0] is before.questions[0]
+    assert after.questions[2] is before.questions[2]
+    assert after.questions[1] is not before.questions[1]
+    assert before.questions[1].question["text"] == "Q1"  # старый снимок не изменился
+
+    key_after = grading.answer_key(quiz_id)
+    qid0 = questions[0]["id"]
+    assert key_after.questions[qid0] is key_before.questions[qid0]
+
+
+def test_clone_shares_source_until_edited(auth_headers):
+    quiz_id, questions = _quiz(auth_headers, title="Source")
+    r = client.post(f"/api/v1/quizzes/{quiz_id}/clone", headers=auth_headers)
+    assert r.status_code == 200
+    clone_id = r.json()["id"]
+    assert r.json()["title"] == "Source"
+
+    clone = client.get(f"/api/v1/quizzes/{clone_id}", headers=auth_headers).json()
+    clone_qids = [q["id"] for q in clone["questions"]]
+    assert [q["text"] for q in clone["questions"]] == ["Q0", "Q1", "Q2"]
+    assert not set(clone_qids) & {q["id"] for q in questions}
+    assert not set(clone_qids) & set(storage.QUESTIONS_BY_ID)  # копий ещё нет
+
+    # правка исходного квиза клон не меняет; клон оценивается по своим id
+    client.patch(
+        f"/api/v1/questions/{questions[0]['id']}", json={"text": "src"}, headers=auth_headers
+    )
+    r = client.post(f"/api/v1/public/quizzes/{clone_id}/submit", json=_right(clone["questions"]))
+    assert r.json() == {"score": 3, "max_score": 3}
+
+    r = client.patch(
+        f"/api/v1/questions/{clone_qids[1]}", json={"text": "clone edit"}, headers=auth_headers
+    )
+    assert r.status_code == 200
+    assert set(clone_qids) <= set(storage.QUESTIONS_BY_ID)
+    after = client.get(f"/api/v1/quizzes/{clone_id}", headers=auth_headers).json()
+    assert [q["id"] for q in after["questions"]] == clone_qids
+    assert [q["text"] for q in after["questions"]] == ["Q0", "clone edit", "Q2"]
+    assert after["questions"][0]["choices"] == clone["questions"][0]["choices"]
+    src = client.get(f"/api/v1/quizzes/{quiz_id}", headers=auth_headers).json()
+    assert [q["text"] for q in src["questions"]] == ["src", "Q1", "Q2"]
+
+
+def test_clone_requires_owner_and_can_be_deleted(auth_headers):
+    quiz_id, _ = _quiz(auth_headers)
+    creds = {"username": f"u_{uuid.uuid4().hex[:8]}", "password": "secret123"}
+    client.post("/api/v1/auth/register", json=creds)
+    token = client.post("/api/v1/auth/login", json=creds).json()["access_token"]
+    other = {"Authorization": f"Bearer {token}"}
+    assert client.post(f"/api/v1/quizzes/{quiz_id}/clone", headers=other).status_code == 403
+
+    r = client.post(
+        f"/api/v1/quizzes/{quiz_id}/clone", json={"title": "Copy"}, headers=auth_headers
+    )
+    clone_id = r.json()["id"]
+    assert r.json()["title"] == "Copy"
+    qid = client.get(f"/api/v1/quizzes/{clone_id}", headers=auth_headers).json()["questions"][0]
+    assert client.delete(f"/api/v1/quizzes/{clone_id}", headers=auth_headers).status_code == 200
+    r = client.get(f"/api/v1/questions/{qid['id']}", headers=auth_headers)
+    assert r.status_code == 404
+
+
+def test_readers_see_whole_batches_without_locking():
+    quiz = storage.create_quiz(1, "rcu")
+    for i in range(20):
+        q = storage.create_question(quiz["id"], f"q{i}", "single")
+        for c in range(4):
+            storage.create_choice(q["id"], f"c{c}", is_correct=c == 0)
+    ids = [q["id"] for q in storage.list_questions_by_quiz(quiz["id"])]
+    stop = threading.Event()
+
+    def writer():
+        # замена всех вариантов вопроса: удаление и вставка — одна операция записи
+        i = 0
+        while not stop.is_set():
+            qid = ids[i % len(ids)]
+            choices = [(f"v{i}-{c}", c == 0) for c in range(4)]
+            storage.apply_question_batch(quiz["id"], [], {qid: {"choices": choices}}, [])
+            i += 1
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    torn = 0
+    try:
+        deadline = time.monotonic() + 0.3
+        while time.monotonic() < deadline:
+            snap = storage.quiz_version(quiz["id"])
+            torn += sum(len(qv.choices) != 4 for qv in snap.questions)
+            torn += sum(len(storage.list_choices_by_question(qid)) != 4 for qid in ids[:3])
+    finally:
+        stop.set()
+        thread.join()
+    assert torn == 0
+    assert [q["id"] for q in storage.list_questions_by_quiz(quiz["id"])] == ids
+
+
+def test_reads_do_not_wait_for_writer():
+    quiz = storage.create_quiz(1, "rcu-lock")
+    q = storage.create_question(quiz["id"], "q", "single")
+    storage.create_choice(q["id"], "c", is_correct=True)
+    with storage._WRITE_LOCK:
+        # писатель держит блокировку — читатель из другого потока всё равно отвечает
+        out = []
+        reader = threading.Thread(
+            target=lambda: out.append(storage.list_choices_by_question(q["id"]))
+        )
+        reader.start()
+        reader.join(1.0)
+        assert not reader.is_alive()
+    assert [c["text"] for c in out[0]] == ["c"]
+    snap = storage.quiz_version(quiz["id"])
+    storage.update_question(q["id"], text="edited")
+    assert snap.questions[0].question["text"] == "q"  # опубликованный снимок не меняется
+    assert storage.list_questions_by_quiz(quiz["id"])[0]["text"] == "edited"
+
+
+def test_version_history_is_bounded_but_keeps_live_attempts(auth_headers, monkeypatch):
+    monkeypatch.setattr(storage, "QUIZ_VERSIONS_KEEP", 3)
+    quiz_id, questions = _quiz(auth_headers, n=1)
+    started = client.post(f"/api/v1/public/quizzes/{quiz_id}/start").json()
+    pinned = storage.quiz_version(quiz_id).version
+    qid = questions[0]["id"]
+    for i in range(10):
+        client.patch(f"/api/v1/questions/{qid}", json={"text": f"v{i}"}, headers=auth_headers)
+        client.post(f"/api/v1/quizzes/{quiz_id}/submit", json={"answers": []}, headers=auth_headers)
+        storage.quiz_version(quiz_id)  # чтение текущей версии историю не пополняет
+
+    versions = storage.QUIZ_VERSIONS[quiz_id]
+    assert len(versions) == 3  # версия живой попытки + 2 последних оценённых
+    assert pinned in versions
+    answers = {"answers": [{"question_id": qid, "choice_id": questions[0]["choices"][0]["id"]}]}
+    r = client.post(f"/api/v1/public/attempts/{started['session_id']}/submit", json=answers)
+    assert r.json() == {"score": 1, "max_score": 1}
+
+
+def test_update_question_does_not_scan_all_questions(auth_headers):
+    quiz_id, questions = _quiz(auth_headers)
+    qid = questions[1]["id"]
+    client.patch(f"/api/v1/questions/{qid}", json={"text": "moved"}, headers=auth_headers)
+    rows = storage.QUESTIONS_BY_QUIZ[quiz_id]
+    assert [q["text"] for q in rows] == ["Q0", "moved", "Q2"]
+    assert storage.QUESTIONS_BY_ID[qid] is rows[1]
+
+
+def test_question_edit_publishes_one_whole_version(auth_headers, monkeypatch):
+    quiz_id, questions = _quiz(auth_headers, n=2)
+    published = []
+    publish = storage._publish
+
+    def record(qid, changed):
+        publish(qid, changed)
+        if qid == quiz_id:
+            snap = storage._CURRENT[quiz_id]
+            published.append((snap.version, [len(qv.choices) for qv in snap.questions]))
+
+    monkeypatch.setattr(storage, "_publish", record)
+    before = storage.quiz_version(quiz_id).version
+    choices = [{"text": "x", "is_correct": True}, {"text": "y"}, {"text": "z"}]
+    r = client.patch(
+        f"/api/v1/questions/{questions[0]['id']}", json={"choices": choices}, headers=auth_headers
+    )
+    assert r.status_code == 200
+    assert published == [(before + 1, [3, 2])]
+
+    published.clear()
+    body = {"quiz_id": quiz_id, "text": "Q2", "type": "single", "choices": choices}
+    client.post("/api/v1/questions", json=body, headers=auth_headers)
+    assert published == [(before + 2, [3, 2, 3])]